@@ -0,0 +1,140 @@
+"""
+Benchmark for memory and construction time of ecFlow client messages.
+
+Compare slot-based ``EcflowClientMessage`` with lazy time fields and a copy of
+the previous ``__dict__`` based message which parses time fields in ``__init__``,
+with synthetic documents of ecFlow client commands.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/message_memory_benchmark.py
+    PYTHONPATH=. python benchmarks/message_memory_benchmark.py --counts 100000 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import pandas as pd
+
+from nwpc_message_tool.source.ecflow_client import load_message
+
+
+class DictEcflowClientMessage(object):
+    """
+    ecFlow client message before using ``__slots__``, time fields are parsed eagerly.
+    """
+    def __init__(
+            self,
+            message_type=None,
+            time=None,
+            command=None,
+            arguments=None,
+            envs=None,
+            ecflow_host=None,
+            ecflow_port=None,
+            node_name=None,
+            node_rid=None,
+            try_no=None,
+            ecf_date=None,
+    ):
+        self.message_type = message_type
+        self.time = time
+        self.command = command
+        self.arguments = arguments
+        self.envs = envs
+        self.ecflow_host = ecflow_host
+        self.ecflow_port = ecflow_port
+        self.node_name = node_name
+        self.node_rid = node_rid
+        if try_no.isdigit():
+            self.try_no = int(try_no)
+        self.ecf_date = pd.to_datetime(ecf_date, format="%Y%m%d").tz_localize('UTC')
+
+
+def load_dict_message(doc):
+    data = doc["data"]
+    return DictEcflowClientMessage(
+        message_type=doc["type"],
+        time=pd.Timestamp(doc["time"]),
+        command=data["command"],
+        arguments=data.get("args"),
+        envs=data.get("envs"),
+        ecflow_host=data["ecf_host"],
+        ecflow_port=data["ecf_port"],
+        node_name=data["ecf_name"],
+        node_rid=data["ecf_rid"],
+        try_no=data["ecf_tryno"],
+        ecf_date=data["ecf_date"],
+    )
+
+
+LOADERS = {
+    "dict": load_dict_message,
+    "slots": load_message,
+}
+
+
+def generate_docs(count: int):
+    commands = ("submit", "init", "complete")
+    start = pd.Timestamp("2021-01-01", tz="UTC")
+    docs = []
+    for i in range(count):
+        time = start + pd.Timedelta(seconds=i * 7)
+        docs.append({
+            "type": "ecflow_client",
+            "time": time.isoformat(),
+            "data": {
+                "command": commands[i % 3],
+                "ecf_host": "login_b01",
+                "ecf_port": "31067",
+                "ecf_name": f"/grapes_gfs_gmf/gmf_00/model/task_{i // 3 % 100}",
+                "ecf_rid": str(1000 + i),
+                "ecf_tryno": "1",
+                "ecf_date": time.strftime("%Y%m%d"),
+            },
+        })
+    return docs
+
+
+def run(loader, docs):
+    gc.collect()
+    start = time.perf_counter()
+    messages = [loader(doc) for doc in docs]
+    seconds = time.perf_counter() - start
+
+    # time of parsing time fields used by SituationCalculator, which is paid lazily by slot messages.
+    start = time.perf_counter()
+    for message in messages:
+        message.time, message.ecf_date
+    access_seconds = time.perf_counter() - start
+    del messages
+
+    # measure memory in a separate run, since tracemalloc slows down construction.
+    gc.collect()
+    tracemalloc.start()
+    messages = [loader(doc) for doc in docs]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del messages
+    return seconds, access_seconds, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark for message memory")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 50_000])
+    args = parser.parse_args()
+
+    print(f"{'count':>10} {'message':>10} {'seconds':>10} {'access':>10} {'MiB':>10} {'bytes/msg':>10}")
+    for count in args.counts:
+        docs = generate_docs(count)
+        for name, loader in LOADERS.items():
+            seconds, access_seconds, memory = run(loader, docs)
+            print(
+                f"{count:>10} {name:>10} {seconds:>10.3f} {access_seconds:>10.3f} "
+                f"{memory / 2**20:>10.1f} {memory / count:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
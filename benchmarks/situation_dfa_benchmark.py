@@ -0,0 +1,100 @@
+"""
+Benchmark for DFA engines of SituationCalculator.
+
+Compare ``TaskStatusChangeDFA`` (transitions) and ``TaskStatusChangeFastDFA`` (table-driven)
+with synthetic ecFlow client messages of one task (submit, init, complete per day).
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/situation_dfa_benchmark.py
+    PYTHONPATH=. python benchmarks/situation_dfa_benchmark.py --days 1000 --repeat 5
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from nwpc_message_tool.message.ecflow_client import EcflowClientMessage
+from nwpc_message_tool.analytics.calculator import SituationCalculator
+from nwpc_message_tool.analytics.record import StatusChangeEntry
+from nwpc_message_tool.analytics.situation_type import TaskSituationType
+from nwpc_message_tool.analytics.task_status_change_dfa import TaskStatusChangeDFA
+from nwpc_message_tool.analytics.task_status_change_fast_dfa import TaskStatusChangeFastDFA
+
+
+NODE_PATH = "/grapes_gfs_gmf/gmf_00/model/fcst"
+
+STOP_STATES = (
+    TaskSituationType.Complete,
+    TaskSituationType.Error,
+    TaskSituationType.Unknown,
+)
+
+DFA_ENGINES = {
+    "transitions": TaskStatusChangeDFA,
+    "table": TaskStatusChangeFastDFA,
+}
+
+
+def generate_records(days: int):
+    records = []
+    for date in pd.date_range("2021-01-01", periods=days, freq="D", tz="UTC"):
+        for minutes, command in ((10, "submit"), (11, "init"), (120, "complete")):
+            records.append(EcflowClientMessage(
+                message_type="ecflow_client",
+                time=date + pd.Timedelta(minutes=minutes),
+                command=command,
+                node_name=NODE_PATH,
+                try_no="1",
+                ecf_date=date.strftime("%Y%m%d"),
+            ))
+    return records
+
+
+def run_dfa(dfa_engine, status_changes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for index in range(0, len(status_changes), 3):
+            dfa = dfa_engine(name=index)
+            for s in status_changes[index:index + 3]:
+                dfa.trigger(s.status.value, node_data=s)
+    return time.perf_counter() - start
+
+
+def run_calculator(dfa_engine, records, days: int) -> float:
+    calculator = SituationCalculator(
+        dfa_engine=dfa_engine,
+        stop_states=STOP_STATES,
+    )
+    start_date = pd.Timestamp("2021-01-01", tz="UTC")
+    start = time.perf_counter()
+    calculator.get_situations(
+        records=records,
+        node_path=NODE_PATH,
+        start_date=start_date,
+        end_date=start_date + pd.Timedelta(days=days),
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark for DFA engines")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=10, help="repeat count for DFA only benchmark.")
+    args = parser.parse_args()
+
+    from loguru import logger
+    logger.disable("nwpc_message_tool")
+
+    records = generate_records(args.days)
+    status_changes = [StatusChangeEntry(r) for r in records]
+
+    print(f"{'benchmark':>12} {'engine':>12} {'seconds':>10}")
+    for name, dfa_engine in DFA_ENGINES.items():
+        print(f"{'dfa':>12} {name:>12} {run_dfa(dfa_engine, status_changes, args.repeat):>10.3f}")
+    for name, dfa_engine in DFA_ENGINES.items():
+        print(f"{'calculator':>12} {name:>12} {run_calculator(dfa_engine, records, args.days):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
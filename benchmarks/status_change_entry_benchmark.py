@@ -0,0 +1,116 @@
+"""
+Micro-benchmark for status changes in the inner loop of ``SituationCalculator.get_situations``.
+
+Compare status change entries which resolve status and time on every property access,
+``StatusChangeEntry`` which resolves them once when created, and ``get_batch_status_changes``
+which resolves them in bulk for ``EcflowClientMessageBatch``.
+Each benchmark creates status changes for records of one day and runs ``TaskStatusChangeFastDFA`` with them.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/status_change_entry_benchmark.py
+    PYTHONPATH=. python benchmarks/status_change_entry_benchmark.py --days 3650 --repeat 5
+"""
+import argparse
+import datetime
+import time
+
+import pandas as pd
+
+from nwpc_message_tool.message import EcflowClientMessage, EcflowClientMessageBatch
+from nwpc_message_tool.analytics.node_status_change_data import StatusChangeType
+from nwpc_message_tool.analytics.record import StatusChangeEntry, get_batch_status_changes
+from nwpc_message_tool.analytics.situation_type import TaskSituationType
+from nwpc_message_tool.analytics.task_status_change_fast_dfa import TaskStatusChangeFastDFA
+
+
+NODE_PATH = "/grapes_gfs_gmf/gmf_00/model/fcst"
+
+STOP_STATES = (
+    TaskSituationType.Complete,
+    TaskSituationType.Error,
+    TaskSituationType.Unknown,
+)
+
+
+class PropertyStatusChangeEntry(object):
+    """
+    Status change entry before precomputing, status and time are resolved on every access.
+    """
+    def __init__(self, record: EcflowClientMessage):
+        self._record = record
+
+    @property
+    def status(self) -> StatusChangeType:
+        status_map = {
+            "submit": StatusChangeType.Submit,
+            "init": StatusChangeType.Initial,
+            "complete": StatusChangeType.Complete,
+            "abort": StatusChangeType.Abort,
+        }
+        return status_map.get(self._record.command, StatusChangeType.Unknown)
+
+    @property
+    def date_time(self) -> datetime.datetime:
+        return self._record.time.ceil("S").to_pydatetime()
+
+
+def generate_date_records(days: int):
+    date_records = []
+    for date in pd.date_range("2021-01-01", periods=days, freq="D", tz="UTC"):
+        records = []
+        for minutes, command in ((10, "submit"), (11, "init"), (120, "complete")):
+            records.append(EcflowClientMessage(
+                message_type="ecflow_client",
+                time=date + pd.Timedelta(minutes=minutes, microseconds=500),
+                command=command,
+                node_name=NODE_PATH,
+                try_no="1",
+                ecf_date=date.strftime("%Y%m%d"),
+            ))
+        date_records.append(records)
+    return date_records
+
+
+def run_dfa(status_changes):
+    dfa = TaskStatusChangeFastDFA(name=NODE_PATH)
+    for s in status_changes:
+        dfa.trigger(s.status.value, node_data=s)
+        if dfa.state in STOP_STATES:
+            break
+
+
+def run(get_status_changes, date_records, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for records in date_records:
+            run_dfa(get_status_changes(records))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="micro-benchmark for status change entries")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    date_records = generate_date_records(args.days)
+    date_batches = [EcflowClientMessageBatch.from_messages(records) for records in date_records]
+    # parse lazy time fields before benchmark.
+    for records in date_records:
+        for record in records:
+            record.time
+
+    benchmarks = {
+        "property": (lambda records: [PropertyStatusChangeEntry(r) for r in records], date_records),
+        "entry": (lambda records: [StatusChangeEntry(r) for r in records], date_records),
+        "batch": (get_batch_status_changes, date_batches),
+    }
+
+    print(f"{'entry':>10} {'seconds':>10}")
+    for name, (get_status_changes, inputs) in benchmarks.items():
+        print(f"{name:>10} {run(get_status_changes, inputs, args.repeat):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
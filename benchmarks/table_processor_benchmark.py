@@ -0,0 +1,75 @@
+"""
+Benchmark for TableProcessor.
+
+Compare ``row``, ``columnar`` and ``streaming`` mode with synthetic messages of grapes_meso_3km
+(8 cycles x 37 steps per day).
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/table_processor_benchmark.py
+    PYTHONPATH=. python benchmarks/table_processor_benchmark.py --counts 10000 100000 1000000 --row-limit 10000
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from nwpc_message_tool.message import ProductionEventMessage, EventStatus
+from nwpc_message_tool.processor import TableProcessor
+
+
+def generate_messages(count: int):
+    forecast_hours = np.arange(0, 37)
+    start_times = pd.date_range("2020-01-01", periods=count // len(forecast_hours) + 1, freq="3H", tz="UTC")
+    rng = np.random.default_rng(0)
+    delays = rng.integers(4 * 3600, 6 * 3600, size=count)
+    messages = []
+    for i in range(count):
+        start_time = start_times[i // len(forecast_hours)]
+        forecast_hour = forecast_hours[i % len(forecast_hours)]
+        messages.append(ProductionEventMessage(
+            message_type="production",
+            time=start_time + pd.Timedelta(seconds=int(delays[i]), microseconds=i % 1000),
+            system="grapes_meso_3km",
+            stream="oper",
+            production_type="grib2",
+            production_name="orig",
+            event="storage",
+            status=EventStatus.Complete,
+            start_time=start_time,
+            forecast_time=pd.Timedelta(f"{forecast_hour:03}h"),
+        ))
+    return messages
+
+
+def run(mode: str, messages) -> float:
+    processor = TableProcessor(mode=mode)
+    start = time.perf_counter()
+    processor.process_messages(messages)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark for TableProcessor")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--row-limit", type=int, default=10_000, help="max message count to run row mode.")
+    args = parser.parse_args()
+
+    from loguru import logger
+    logger.disable("nwpc_message_tool")
+    warnings.simplefilter("ignore", FutureWarning)
+
+    print(f"{'count':>10} {'mode':>10} {'seconds':>10}")
+    for count in args.counts:
+        messages = generate_messages(count)
+        modes = ["columnar", "streaming"]
+        if count <= args.row_limit:
+            modes.insert(0, "row")
+        for mode in modes:
+            print(f"{count:>10} {mode:>10} {run(mode, messages):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import click
 from nwpc_message_tool.cli.production import production
+from nwpc_message_tool.cli.standard_time import standard_time
 
 
 @click.group()
@@ -9,6 +10,7 @@ def cli():
 
 def main():
     cli.add_command(production, name="production")
+    cli.add_command(standard_time, name="standard-time")
     cli()
 
 
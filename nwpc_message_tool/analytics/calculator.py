@@ -1,14 +1,26 @@
 import typing
 import datetime
+from concurrent.futures import ProcessPoolExecutor
 
 from loguru import logger
+import numpy as np
 import pandas as pd
 
 from .situation_type import TaskSituationType
-from .node_situation import NodeSituation
-from .record import StatusChangeEntry
+from .node_situation import NodeSituation, TimePeriodType
+from .record import StatusChangeEntry, get_batch_status_changes
+from .vectorized_situation import get_vectorized_situations, get_period_durations, get_situation_dates
 
 from nwpc_message_tool.message.ecflow_client import EcflowClientMessage
+from nwpc_message_tool.message.ecflow_client_batch import EcflowClientMessageBatch
+
+
+RecordsType = typing.Union[typing.List[EcflowClientMessage], EcflowClientMessageBatch]
+
+STATUS_COMMANDS = ("submit", "init", "complete", "abort")
+
+# missing duration, ``pd.NaT`` makes columns with only missing durations datetime.
+NAT_DURATION = np.timedelta64("NaT", "ns")
 
 
 class SituationRecord(object):
@@ -17,7 +29,7 @@ class SituationRecord(object):
             date,
             state: TaskSituationType,
             node_situation: NodeSituation,
-            records: typing.List[EcflowClientMessage],
+            records: RecordsType,
     ):
         self.date = date
         self.state = state
@@ -32,7 +44,7 @@ class SituationCalculator(object):
     Attributes
     ----------
     _dfa_engine:
-        用于计算节点运行状态的DFA类
+        用于计算节点运行状态的DFA类，例如 ``TaskStatusChangeDFA`` 或 ``TaskStatusChangeFastDFA``
     _stop_states: typing.Tuple
         停止计算DFA的运行状态
     _dfa_kwargs: dict
@@ -52,17 +64,21 @@ class SituationCalculator(object):
 
     def get_situations(
             self,
-            records: typing.List[EcflowClientMessage],
+            records: RecordsType,
             node_path: str,
             start_date: datetime.datetime,
             end_date: datetime.datetime,
     ) -> typing.List[SituationRecord]:
         """
-        Get situations for some node in date range [start_date, end_date).
+        Get situations for some node in date range [start_date, end_date). Naive dates are treated as UTC.
+
+        Records of the node are grouped by ``ecf_date`` in one pass before running DFA for each date.
 
         Parameters
         ----------
         records
+            list of messages, or ``EcflowClientMessageBatch`` which is filtered and grouped with array operations.
+            ``records`` of each ``SituationRecord`` has the same type.
         node_path
         start_date
         end_date
@@ -73,37 +89,157 @@ class SituationCalculator(object):
 
         """
         logger.info("Finding StatusLogRecord for {}", node_path)
-        record_list = []
-        for record in records:
-            if record.node_name == node_path and record.command in ("submit", "init", "complete", "abort"):
-                record_list.append(record)
+        if isinstance(records, EcflowClientMessageBatch):
+            date_records = records.filter(node_paths=[node_path], commands=STATUS_COMMANDS).group_by_date()
+        else:
+            date_records = dict()
+            for record in records:
+                if record.node_name == node_path and record.command in STATUS_COMMANDS:
+                    date_records.setdefault(record.ecf_date, []).append(record)
 
         logger.info("Calculating node status change using DFA...")
-        situations = []
-        for current_date in pd.date_range(start=start_date, end=end_date, closed="left"):
-            current_records = list(filter(lambda x: x.ecf_date == current_date, record_list))
+        situations = self._get_date_situations(date_records, start_date, end_date)
+        logger.info("Calculating node status change using DFA...Done")
+        return situations
 
-            status_changes = [StatusChangeEntry(r) for r in current_records]
+    def get_situations_for_nodes(
+            self,
+            records: RecordsType,
+            node_paths: typing.List[str],
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            jobs: int = 1,
+            mode: str = "dfa",
+    ) -> pd.DataFrame:
+        """
+        Get situations for many nodes in date range [start_date, end_date). Naive dates are treated as UTC.
 
-            dfa = self._dfa_engine(
-                name=current_date,
-                **self._dfa_kwargs,
-            )
+        Records are partitioned by ``(node_name, ecf_date)`` in one pass,
+        and DFAs of each node are run in a process pool when ``jobs`` is larger than 1.
 
-            for s in status_changes:
-                dfa.trigger(
-                    s.status.value,
-                    node_data=s,
-                )
-                if dfa.state in self._stop_states:
-                    break
-
-            situations.append(SituationRecord(
-                date=current_date,
-                state=dfa.state,
-                node_situation=dfa.node_situation,
-                records=current_records,
-            ))
+        Parameters
+        ----------
+        records
+            list of messages, or ``EcflowClientMessageBatch``.
+        node_paths
+        start_date
+        end_date
+        jobs
+            process count, only for ``dfa`` mode.
+        mode
+            - ``dfa``: run DFA for each node and date.
+            - ``vectorized``: resolve common task lifecycles for all nodes with array operations,
+              and run DFA only for irregular ones, see ``get_vectorized_situations``.
+              ``records`` are converted to ``EcflowClientMessageBatch`` if needed.
 
+        Returns
+        -------
+        pd.DataFrame
+            one row for each node and date with columns:
+
+            - ``node``: node path
+            - ``date``: ecf date
+            - ``state``: value of ``TaskSituationType``
+            - ``in_all``, ``in_submitted``, ``in_active``: durations of time periods, ``NaT`` if not found.
+        """
+        if mode == "vectorized":
+            if not isinstance(records, EcflowClientMessageBatch):
+                records = EcflowClientMessageBatch.from_messages(records)
+            logger.info("Calculating situations for {} nodes using array operations...", len(node_paths))
+            return get_vectorized_situations(self, records, node_paths, start_date, end_date)
+        elif mode != "dfa":
+            raise ValueError(f"mode is not supported: {mode}")
+
+        logger.info("Partitioning records for {} nodes...", len(node_paths))
+        node_records = {node_path: dict() for node_path in node_paths}
+        if isinstance(records, EcflowClientMessageBatch):
+            node_batches = records.filter(node_paths=node_paths, commands=STATUS_COMMANDS).group_by_node()
+            for node_path, node_batch in node_batches.items():
+                node_records[node_path] = node_batch.group_by_date()
+        else:
+            for record in records:
+                date_records = node_records.get(record.node_name)
+                if date_records is not None and record.command in STATUS_COMMANDS:
+                    date_records.setdefault(record.ecf_date, []).append(record)
+
+        logger.info("Calculating node status change using DFA...")
+        tasks = [
+            (self, node_path, node_records[node_path], start_date, end_date)
+            for node_path in node_paths
+        ]
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(
+                    _get_situation_rows_task,
+                    tasks,
+                    chunksize=max(1, len(tasks) // (jobs * 4))
+                ))
+        else:
+            results = [_get_situation_rows_task(task) for task in tasks]
         logger.info("Calculating node status change using DFA...Done")
-        return situations
+
+        df = pd.DataFrame(
+            [row for rows in results for row in rows],
+            columns=["node", "date", "state", "in_all", "in_submitted", "in_active"],
+        )
+        # keep duration dtype when there is no row.
+        duration_columns = ["in_all", "in_submitted", "in_active"]
+        df[duration_columns] = df[duration_columns].astype("timedelta64[ns]")
+        return df
+
+    def _get_date_situations(
+            self,
+            date_records: typing.Dict[pd.Timestamp, RecordsType],
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+    ) -> typing.List[SituationRecord]:
+        return [
+            self._get_situation(current_date, date_records.get(current_date, []))
+            for current_date in get_situation_dates(start_date, end_date)
+        ]
+
+    def _get_situation(
+            self,
+            current_date: pd.Timestamp,
+            current_records: RecordsType,
+    ) -> SituationRecord:
+        if isinstance(current_records, EcflowClientMessageBatch):
+            status_changes = get_batch_status_changes(current_records)
+        else:
+            status_changes = [StatusChangeEntry(r) for r in current_records]
+
+        dfa = self._dfa_engine(
+            name=current_date,
+            **self._dfa_kwargs,
+        )
+
+        for s in status_changes:
+            dfa.trigger(
+                s.status.value,
+                node_data=s,
+            )
+            if dfa.state in self._stop_states:
+                break
+
+        return SituationRecord(
+            date=current_date,
+            state=dfa.state,
+            node_situation=dfa.node_situation,
+            records=current_records,
+        )
+
+
+def _get_situation_rows_task(task: typing.Tuple) -> typing.List[typing.Dict]:
+    calculator, node_path, date_records, start_date, end_date = task
+    rows = []
+    for situation in calculator._get_date_situations(date_records, start_date, end_date):
+        durations = get_period_durations(situation.node_situation)
+        rows.append({
+            "node": node_path,
+            "date": situation.date,
+            "state": situation.state.value,
+            "in_all": durations.get(TimePeriodType.InAll, NAT_DURATION),
+            "in_submitted": durations.get(TimePeriodType.InSubmitted, NAT_DURATION),
+            "in_active": durations.get(TimePeriodType.InActive, NAT_DURATION),
+        })
+    return rows
@@ -1,29 +1,68 @@
 import datetime
+import typing
+
+import numpy as np
+import pandas as pd
 
 from .node_status_change_data import NodeStatusChangeData, StatusChangeType
 from nwpc_message_tool.message.ecflow_client import EcflowClientMessage
+from nwpc_message_tool.message.ecflow_client_batch import EcflowClientMessageBatch
 
 
 @NodeStatusChangeData.register
-class StatusChangeEntry(object):
+class StatusChange(object):
+    """
+    Status change with resolved status and time.
+    """
+    __slots__ = ("status", "date_time")
+
+    def __init__(self, status: StatusChangeType, date_time: datetime.datetime):
+        self.status = status
+        self.date_time = date_time
+
+
+class StatusChangeEntry(StatusChange):
+    """
+    Status change of an ecFlow client message.
+
+    Status and time ceiled to seconds are resolved once when the entry is created,
+    see ``get_batch_status_changes`` to resolve them in bulk for ``EcflowClientMessageBatch``.
+    """
+    __slots__ = ("_record", )
+
     def __init__(self, record: EcflowClientMessage):
+        super(StatusChangeEntry, self).__init__(
+            status=convert_command_toStatus_change_type(record.command),
+            date_time=record.time.ceil("S").to_pydatetime(),
+        )
         self._record = record
 
-    @property
-    def status(self) -> StatusChangeType:
-        return convert_command_toStatus_change_type(self._record.command)
 
-    @property
-    def date_time(self) -> datetime.datetime:
-        return self._record.time.ceil("S").to_pydatetime()
+def get_batch_status_changes(batch: EcflowClientMessageBatch) -> typing.List[StatusChange]:
+    """
+    Get status changes of all messages in batch.
+
+    Status of each command and times ceiled to seconds are resolved with array operations,
+    same as ``StatusChangeEntry``.
+    """
+    command_status = np.array(
+        [convert_command_toStatus_change_type(command) for command in batch.commands],
+        dtype=object,
+    )
+    statuses = command_status[batch.command_codes]
+    # ceil to seconds
+    times = -(-batch.times // 1_000_000_000) * 1_000_000_000
+    date_times = pd.to_datetime(times, utc=True).to_pydatetime()
+    return [StatusChange(status, date_time) for status, date_time in zip(statuses, date_times)]
+
+
+_STATUS_MAP = {
+    "submit": StatusChangeType.Submit,
+    "init": StatusChangeType.Initial,
+    "complete": StatusChangeType.Complete,
+    "abort": StatusChangeType.Abort,
+}
 
 
 def convert_command_toStatus_change_type(command: str) -> StatusChangeType:
-    status_map = {
-        "submit": StatusChangeType.Submit,
-        "init": StatusChangeType.Initial,
-        "complete": StatusChangeType.Complete,
-        "abort": StatusChangeType.Abort,
-    }
-
-    return status_map.get(command, StatusChangeType.Unknown)
+    return _STATUS_MAP.get(command, StatusChangeType.Unknown)
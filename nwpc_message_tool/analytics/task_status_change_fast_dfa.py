@@ -0,0 +1,144 @@
+from transitions import MachineError
+
+from .status_change_type import StatusChangeType
+
+from .node_situation import (
+    NodeSituation,
+    TimePoint,
+    TimePeriodType,
+    TimePeriod,
+)
+from .situation_type import TaskSituationType
+from .node_status_change_data import NodeStatusChangeData
+
+
+_STATES = (
+    TaskSituationType.Initial,
+    TaskSituationType.Submit,
+    TaskSituationType.Active,
+    TaskSituationType.Complete,
+    TaskSituationType.Error,
+    TaskSituationType.Unknown,
+)
+_INITIAL, _SUBMIT, _ACTIVE, _COMPLETE, _ERROR, _UNKNOWN = range(len(_STATES))
+
+_EVENTS = {
+    StatusChangeType.Submit.value: 0,
+    StatusChangeType.Initial.value: 1,
+    StatusChangeType.Complete.value: 2,
+    StatusChangeType.Abort.value: 3,
+}
+
+_INVALID = -1
+
+# next state for each state x event (submit, init, complete, abort).
+_TRANSITION_TABLE = (
+    (_SUBMIT, _UNKNOWN, _UNKNOWN, _UNKNOWN),  # Initial
+    (_UNKNOWN, _ACTIVE, _UNKNOWN, _ERROR),  # Submit
+    (_UNKNOWN, _UNKNOWN, _COMPLETE, _ERROR),  # Active
+    (_INVALID, _INVALID, _INVALID, _INVALID),  # Complete
+    (_INVALID, _INVALID, _INVALID, _INVALID),  # Error
+    (_INVALID, _INVALID, _INVALID, _INVALID),  # Unknown
+)
+
+_NO_ACTION = 0
+_ACTION_NEW_CYCLE = 1
+_ACTION_SET_TIME_POINT = 2
+_ACTION_END_CYCLE = 3
+
+# callbacks for each state x event, same as transitions of TaskStatusChangeDFA.
+_ACTION_TABLE = (
+    (_ACTION_NEW_CYCLE, _NO_ACTION, _NO_ACTION, _NO_ACTION),  # Initial
+    (_NO_ACTION, _ACTION_SET_TIME_POINT, _NO_ACTION, _ACTION_SET_TIME_POINT),  # Submit
+    (_NO_ACTION, _NO_ACTION, _ACTION_END_CYCLE, _ACTION_SET_TIME_POINT),  # Active
+    (_NO_ACTION, _NO_ACTION, _NO_ACTION, _NO_ACTION),  # Complete
+    (_NO_ACTION, _NO_ACTION, _NO_ACTION, _NO_ACTION),  # Error
+    (_NO_ACTION, _NO_ACTION, _NO_ACTION, _NO_ACTION),  # Unknown
+)
+
+
+class TaskStatusChangeFastDFA(object):
+    """
+    Table-driven version of ``TaskStatusChangeDFA``.
+
+    Transitions and callbacks are looked up from precomputed state x event tables
+    instead of creating a ``transitions.Machine`` for each DFA,
+    which produces the same ``NodeSituation`` and can be used as ``dfa_engine`` of ``SituationCalculator``.
+    Same as ``TaskStatusChangeDFA``, ``transitions.MachineError`` is raised when triggering any event
+    in ``Complete``, ``Error`` or ``Unknown`` state.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.node_situation = NodeSituation()
+        self._state = _INITIAL
+
+        # time of submit, init, complete, abort in current cycle
+        self._current_cycle = [None, None, None, None]
+
+    @property
+    def state(self) -> TaskSituationType:
+        return _STATES[self._state]
+
+    def trigger(self, trigger_name: str, node_data: NodeStatusChangeData = None) -> bool:
+        event = _EVENTS.get(trigger_name)
+        if event is None:
+            raise AttributeError(f"Do not know event named '{trigger_name}'.")
+
+        dest = _TRANSITION_TABLE[self._state][event]
+        if dest == _INVALID:
+            raise MachineError(f"Can't trigger event {trigger_name} from state {_STATES[self._state].name}!")
+
+        action = _ACTION_TABLE[self._state][event]
+        if action != _NO_ACTION and node_data is not None:
+            self.node_situation.time_points.append(
+                TimePoint(
+                    status=node_data.status,
+                    time=node_data.date_time,
+                )
+            )
+
+        self._state = dest
+        self.node_situation.situation = _STATES[dest]
+
+        if action != _NO_ACTION and node_data is not None:
+            if action == _ACTION_NEW_CYCLE:
+                self._current_cycle = [None, None, None, None]
+            self._current_cycle[event] = node_data.date_time
+
+        if action == _ACTION_END_CYCLE:
+            self.calculate_time_period()
+        return True
+
+    def calculate_time_period(self):
+        submitted_time, initial_time, complete_time, _ = self._current_cycle
+        in_active = TimePeriod(
+            period_type=TimePeriodType.InActive,
+            start_time=initial_time,
+            end_time=complete_time,
+        )
+        if submitted_time is None:
+            in_all = TimePeriod(
+                period_type=TimePeriodType.InAll,
+                start_time=initial_time,
+                end_time=complete_time,
+            )
+            self.node_situation.time_periods.extend([
+                in_all,
+                in_active,
+            ])
+        else:
+            in_all = TimePeriod(
+                period_type=TimePeriodType.InAll,
+                start_time=submitted_time,
+                end_time=complete_time,
+            )
+            in_submitted = TimePeriod(
+                period_type=TimePeriodType.InSubmitted,
+                start_time=submitted_time,
+                end_time=initial_time,
+            )
+            self.node_situation.time_periods.extend([
+                in_all,
+                in_submitted,
+                in_active,
+            ])
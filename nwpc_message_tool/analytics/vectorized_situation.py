@@ -0,0 +1,201 @@
+"""
+Vectorized situation extraction for task lifecycles.
+
+Situations of ``TaskStatusChangeDFA`` only depend on the first three status changes of each (node, ecf_date) group
+when the DFA stops at ``Complete``, ``Error`` and ``Unknown``:
+
+=================================  ============  ===============================
+status changes                     situation     time periods
+=================================  ============  ===============================
+(none)                             Initial
+submit                             Submit
+submit, init                       Active
+submit, init, complete, ...        Complete      InAll, InSubmitted, InActive
+submit, abort, ...                 Error
+submit, init, abort, ...           Error
+=================================  ============  ===============================
+
+These regular groups are resolved with array operations for the whole batch.
+Other groups, which end in ``Unknown``, are calculated with the DFA engine of ``SituationCalculator``.
+"""
+import datetime
+import typing
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from nwpc_message_tool.message.ecflow_client_batch import EcflowClientMessageBatch, NANOSECONDS_PER_DAY
+from .situation_type import TaskSituationType
+from .node_situation import NodeSituation, TimePeriodType
+
+if typing.TYPE_CHECKING:
+    from .calculator import SituationCalculator
+
+
+VECTORIZED_STOP_STATES = frozenset([
+    TaskSituationType.Complete,
+    TaskSituationType.Error,
+    TaskSituationType.Unknown,
+])
+
+_NONE = -1
+_SUBMIT = 0
+_INIT = 1
+_COMPLETE = 2
+_ABORT = 3
+
+_EVENTS = {
+    "submit": _SUBMIT,
+    "init": _INIT,
+    "complete": _COMPLETE,
+    "abort": _ABORT,
+}
+
+_NAT = np.iinfo(np.int64).min
+
+
+def get_vectorized_situations(
+        calculator: "SituationCalculator",
+        batch: EcflowClientMessageBatch,
+        node_paths: typing.List[str],
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+) -> pd.DataFrame:
+    """
+    Get situations for many nodes in date range [start_date, end_date) with array operations.
+
+    Parameters
+    ----------
+    calculator
+        calculator whose DFA engine is used for irregular groups.
+        All groups are calculated with DFA if its stop states are not ``VECTORIZED_STOP_STATES``.
+    batch
+    node_paths
+    start_date
+    end_date
+
+    Returns
+    -------
+    pd.DataFrame
+        same as ``SituationCalculator.get_situations_for_nodes``.
+    """
+    dates = get_situation_dates(start_date, end_date)
+    date_count = len(dates)
+
+    # situations are calculated once for each unique node path, and copied to rows of duplicated node paths.
+    unique_node_paths = list(dict.fromkeys(node_paths))
+    node_positions = {node_path: i for i, node_path in enumerate(unique_node_paths)}
+    cell_count = len(unique_node_paths) * date_count
+
+    states = np.full(cell_count, TaskSituationType.Initial.value, dtype=object)
+    periods = {
+        period_type: np.full(cell_count, _NAT, dtype=np.int64)
+        for period_type in (TimePeriodType.InAll, TimePeriodType.InSubmitted, TimePeriodType.InActive)
+    }
+
+    batch = batch.filter(node_paths=unique_node_paths, commands=_EVENTS.keys())
+
+    # cell of each message: node position x date position
+    code_positions = np.array([node_positions.get(name, -1) for name in batch.node_names], dtype=np.int64)
+    date_values = dates.asi8
+    message_dates = batch.ecf_dates.astype(np.int64) * NANOSECONDS_PER_DAY
+    date_positions = np.searchsorted(date_values, message_dates)
+    valid = date_positions < date_count
+    valid[valid] = date_values[date_positions[valid]] == message_dates[valid]
+    batch = batch[valid]
+    cells = code_positions[batch.node_codes] * date_count + date_positions[valid]
+
+    # groups of messages in each cell, keeping message order.
+    order = np.argsort(cells, kind="stable")
+    group_cells, group_starts, group_counts = np.unique(cells[order], return_index=True, return_counts=True)
+    group_count = len(group_cells)
+    group_ids = np.repeat(np.arange(group_count), group_counts)
+    group_positions = np.arange(len(order)) - group_starts[group_ids]
+
+    command_events = np.array([_EVENTS.get(command, _NONE) for command in batch.commands], dtype=np.int8)
+    events = command_events[batch.command_codes[order]]
+    # same as ``StatusChangeEntry.date_time``, ceil to seconds.
+    times = -(-batch.times[order] // 1_000_000_000) * 1_000_000_000
+
+    # first three events and times of each group
+    first_events = np.full((3, group_count), _NONE, dtype=np.int8)
+    first_times = np.full((3, group_count), _NAT, dtype=np.int64)
+    for k in range(3):
+        mask = group_positions == k
+        first_events[k, group_ids[mask]] = events[mask]
+        first_times[k, group_ids[mask]] = times[mask]
+    e0, e1, e2 = first_events
+    t0, t1, t2 = first_times
+
+    submitted = e0 == _SUBMIT
+    regular_states = {
+        TaskSituationType.Submit: submitted & (e1 == _NONE),
+        TaskSituationType.Active: submitted & (e1 == _INIT) & (e2 == _NONE),
+        TaskSituationType.Complete: submitted & (e1 == _INIT) & (e2 == _COMPLETE),
+        TaskSituationType.Error: submitted & ((e1 == _ABORT) | ((e1 == _INIT) & (e2 == _ABORT))),
+    }
+    if frozenset(calculator._stop_states) != VECTORIZED_STOP_STATES:
+        regular_states = {state: np.zeros(group_count, dtype=bool) for state in regular_states}
+
+    for state, mask in regular_states.items():
+        states[group_cells[mask]] = state.value
+
+    complete_cells = group_cells[regular_states[TaskSituationType.Complete]]
+    complete_mask = regular_states[TaskSituationType.Complete]
+    periods[TimePeriodType.InAll][complete_cells] = t2[complete_mask] - t0[complete_mask]
+    periods[TimePeriodType.InSubmitted][complete_cells] = t1[complete_mask] - t0[complete_mask]
+    periods[TimePeriodType.InActive][complete_cells] = t2[complete_mask] - t1[complete_mask]
+
+    # fall back to DFA for irregular groups
+    irregular = ~np.logical_or.reduce(list(regular_states.values()))
+    irregular_groups = np.flatnonzero(irregular)
+    logger.debug("{} of {} groups are calculated with DFA", len(irregular_groups), group_count)
+    for group_id in irregular_groups:
+        cell = group_cells[group_id]
+        current_date = dates[cell % date_count]
+        indices = order[group_starts[group_id]:group_starts[group_id] + group_counts[group_id]]
+        situation = calculator._get_situation(current_date, batch[indices])
+        states[cell] = situation.state.value
+        for period_type, duration in get_period_durations(situation.node_situation).items():
+            periods[period_type][cell] = duration.value
+
+    date_positions = np.tile(np.arange(date_count), len(node_paths))
+    rows = np.repeat(
+        np.array([node_positions[node_path] for node_path in node_paths], dtype=np.int64),
+        date_count,
+    ) * date_count + date_positions
+    return pd.DataFrame({
+        "node": np.repeat(np.array(node_paths, dtype=object), date_count),
+        "date": dates[date_positions],
+        "state": states[rows],
+        "in_all": pd.to_timedelta(periods[TimePeriodType.InAll][rows]),
+        "in_submitted": pd.to_timedelta(periods[TimePeriodType.InSubmitted][rows]),
+        "in_active": pd.to_timedelta(periods[TimePeriodType.InActive][rows]),
+    })
+
+
+def get_situation_dates(
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+) -> pd.DatetimeIndex:
+    """
+    Get dates in [start_date, end_date) for situations.
+
+    Naive dates are localized to UTC, same as ``EcflowClientMessage.ecf_date``.
+    """
+    dates = pd.date_range(start=start_date, end=end_date, inclusive="left")
+    if dates.tz is None:
+        dates = dates.tz_localize("UTC")
+    return dates
+
+
+def get_period_durations(node_situation: NodeSituation) -> typing.Dict[TimePeriodType, pd.Timedelta]:
+    """
+    Get durations of complete time periods in node situation.
+    """
+    return {
+        period.period_type: pd.Timedelta(period.end_time - period.start_time)
+        for period in node_situation.time_periods
+        if period.start_time is not None and period.end_time is not None
+    }
@@ -0,0 +1,474 @@
+import asyncio
+import typing
+from abc import ABC, abstractmethod
+
+from elasticsearch import AsyncElasticsearch
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import nwpc_message_tool.source.production.nwpc_message
+import nwpc_message_tool.source.ecflow_client
+from nwpc_message_tool._type import StartTimeType
+from nwpc_message_tool.processor import TableProcessor
+from nwpc_message_tool.storage import (
+    BaseSearchSession,
+    get_scroll_search_body,
+    get_point_in_time_search_body,
+    get_hits_total,
+)
+
+from nwpc_message_tool.message import (
+    ProductionEventMessage,
+    EcflowClientMessage,
+    ProductionStandardTimeMessage,
+)
+
+
+class AsyncSearchSession(BaseSearchSession, ABC):
+    """
+    Paginated search on one index with ``AsyncElasticsearch``, same as ``SearchSession``.
+
+    ``pages()`` requests the next page before yielding current page,
+    so the next request is in flight while current page is being decoded.
+    See ``BaseSearchSession`` for attributes.
+    """
+    def __init__(
+            self,
+            client: AsyncElasticsearch,
+            index: str,
+            query_body: typing.Dict,
+            size: typing.Optional[int] = None,
+    ):
+        super(AsyncSearchSession, self).__init__(
+            client=client,
+            index=index,
+            query_body=query_body,
+            size=size,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def pages(self) -> typing.AsyncIterator[typing.List[typing.Dict]]:
+        """
+        Yield hits of each page with one page prefetched, and close the session when exits.
+        """
+        task = None
+        try:
+            if not self.finished:
+                task = asyncio.ensure_future(self.next_page())
+            while task is not None:
+                hits = await task
+                task = None
+                if not self.finished:
+                    task = asyncio.ensure_future(self.next_page())
+                if len(hits) > 0:
+                    yield hits
+        finally:
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+            await self.close()
+
+    async def next_page(self) -> typing.List[typing.Dict]:
+        request_size = self._get_request_size()
+        hits, total = await self._search(request_size)
+        self._receive_page(hits, total, request_size)
+        if self.finished:
+            await self.close()
+        return hits
+
+    @abstractmethod
+    async def _search(self, size: int) -> typing.Tuple[typing.List[typing.Dict], typing.Optional[int]]:
+        """
+        Request next page, same as ``SearchSession._search``.
+        """
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
+
+
+class AsyncScrollSession(AsyncSearchSession):
+    """
+    Search session using scroll API, same as ``ScrollSession``.
+    """
+    def __init__(
+            self,
+            client: AsyncElasticsearch,
+            index: str,
+            query_body: typing.Dict,
+            size: typing.Optional[int] = None,
+            scroll: str = "1m",
+    ):
+        super(AsyncScrollSession, self).__init__(
+            client=client,
+            index=index,
+            query_body=query_body,
+            size=size,
+        )
+        self.scroll = scroll
+        self.scroll_id = None
+        self._started = False
+
+    async def _search(self, size: int) -> typing.Tuple[typing.List[typing.Dict], typing.Optional[int]]:
+        if not self._started:
+            self._started = True
+            res = await self.client.search(
+                index=self.index,
+                body=get_scroll_search_body(self.query_body, size),
+                scroll=self.scroll,
+            )
+        else:
+            res = await self.client.scroll(
+                scroll=self.scroll,
+                scroll_id=self.scroll_id,
+            )
+        self.scroll_id = res["_scroll_id"]
+        return res["hits"]["hits"], get_hits_total(res)
+
+    async def close(self):
+        if self.scroll_id is not None:
+            scroll_id = self.scroll_id
+            self.scroll_id = None
+            await self.client.clear_scroll(scroll_id=scroll_id)
+
+
+class AsyncPointInTimeSession(AsyncSearchSession):
+    """
+    Search session using point in time and ``search_after``, same as ``PointInTimeSession``.
+    """
+    def __init__(
+            self,
+            client: AsyncElasticsearch,
+            index: str,
+            query_body: typing.Dict,
+            size: typing.Optional[int] = None,
+            keep_alive: str = "1m",
+    ):
+        super(AsyncPointInTimeSession, self).__init__(
+            client=client,
+            index=index,
+            query_body=query_body,
+            size=size,
+        )
+        self.keep_alive = keep_alive
+        self.pit_id = None
+        self.search_after = None
+
+    async def _search(self, size: int) -> typing.Tuple[typing.List[typing.Dict], typing.Optional[int]]:
+        if self.pit_id is None:
+            self.pit_id = (await self.client.open_point_in_time(
+                index=self.index,
+                keep_alive=self.keep_alive,
+            ))["id"]
+
+        res = await self.client.search(body=get_point_in_time_search_body(
+            self.query_body,
+            size,
+            pit_id=self.pit_id,
+            keep_alive=self.keep_alive,
+            search_after=self.search_after,
+        ))
+        self.pit_id = res.get("pit_id", self.pit_id)
+
+        hits = res["hits"]["hits"]
+        if len(hits) > 0:
+            self.search_after = hits[-1]["sort"]
+        return hits, get_hits_total(res)
+
+    async def close(self):
+        if self.pit_id is not None:
+            pit_id = self.pit_id
+            self.pit_id = None
+            await self.client.close_point_in_time(body={"id": pit_id})
+
+
+class AsyncEsMessageStorage(object):
+    """
+    Message storage on ``AsyncElasticsearch``, which has same query methods as ``EsMessageStorage``
+    in async generators.
+
+    Requests share connection pools of the client, so queries for many systems can run
+    concurrently in one event loop.
+    Async client requires ``aiohttp``, install with ``pip install elasticsearch[async]``.
+
+    Examples
+    --------
+
+    >>> import asyncio
+    >>> import pandas as pd
+    >>> from nwpc_message_tool.async_storage import AsyncEsMessageStorage
+    >>> async def get_tables(systems):
+    ...     async with AsyncEsMessageStorage(hosts=["localhost:9200"]) as storage:
+    ...         return await asyncio.gather(*[
+    ...             storage.get_production_table(
+    ...                 system=system,
+    ...                 start_time=pd.to_datetime("2021-04-01 00:00"),
+    ...             ) for system in systems
+    ...         ])
+    >>> tables = asyncio.run(get_tables(["grapes_gfs_gmf", "grapes_meso_3km"]))
+    """
+    def __init__(
+            self,
+            hosts: typing.List,
+            debug: bool = True,
+            maxsize: int = 10,
+    ):
+        """
+        Parameters
+        ----------
+        hosts :
+            ElasticSearch hosts
+        debug :
+            print debug messages
+        maxsize :
+            max connection count to each host.
+        """
+        self.client = AsyncElasticsearch(hosts=hosts, maxsize=maxsize)
+        self.debug: bool = debug
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Close connections of the client.
+        """
+        await self.client.close()
+
+    async def get_production_messages(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            start_time: StartTimeType = None,
+            forecast_time: str = None,
+            engine = None,
+            size: typing.Optional[int] = None,
+            pagination: str = "scroll",
+    ) -> typing.AsyncIterator[ProductionEventMessage]:
+        """
+        Get production messages from ElasticSearch, same as ``EsMessageStorage.get_production_messages``.
+
+        Returns
+        -------
+        typing.AsyncIterator[ProductionEventMessage]
+            production event messages
+        """
+        if engine is None:
+            engine = nwpc_message_tool.source.production.nwpc_message.production
+
+        async for hits in self._get_production_pages(
+            system=system,
+            production_type=production_type,
+            production_stream=production_stream,
+            production_name=production_name,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            engine=engine,
+            size=size,
+            pagination=pagination,
+            consumer="message",
+        ):
+            for hit in hits:
+                yield engine.load_message(hit["_source"])
+
+    async def get_production_table(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            start_time: StartTimeType = None,
+            forecast_time: str = None,
+            engine = None,
+            size: typing.Optional[int] = None,
+            processor: TableProcessor = None,
+            pagination: str = "scroll",
+    ) -> pd.DataFrame:
+        """
+        Get production message table from ElasticSearch, same as ``EsMessageStorage.get_production_table``.
+
+        Returns
+        -------
+        pd.DataFrame
+            production message table, see ``TableProcessor.process_columns``.
+        """
+        if engine is None:
+            engine = nwpc_message_tool.source.production.nwpc_message.production
+        if processor is None:
+            processor = TableProcessor()
+
+        pages = []
+        async for hits in self._get_production_pages(
+            system=system,
+            production_type=production_type,
+            production_stream=production_stream,
+            production_name=production_name,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            engine=engine,
+            size=size,
+            pagination=pagination,
+            consumer="table",
+        ):
+            pages.append(engine.load_columns([hit["_source"] for hit in hits]))
+
+        if len(pages) == 0:
+            pages.append(engine.load_columns([]))
+        columns = {
+            key: np.concatenate([page[key] for page in pages])
+            for key in pages[0]
+        }
+        return processor.process_columns(columns)
+
+    async def _get_production_pages(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            start_time: StartTimeType = None,
+            forecast_time: str = None,
+            engine = None,
+            size: typing.Optional[int] = None,
+            pagination: str = "scroll",
+            consumer: str = None,
+    ) -> typing.AsyncIterator[typing.List[typing.Dict]]:
+        query_body = engine.get_query_body(
+            system=system,
+            production_stream=production_stream,
+            production_type=production_type,
+            production_name=production_name,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            consumer=consumer,
+        )
+
+        for index in sorted(set(engine.get_index(start_time))):
+            async with self._create_session(index, query_body, size, pagination) as session:
+                async for hits in session.pages():
+                    if session.fetched == len(hits) and self.debug:
+                        logger.info(f"[{system}] found results in {index}: {session.total}")
+                    yield hits
+
+    def _create_session(
+            self,
+            index: str,
+            query_body: typing.Dict,
+            size: typing.Optional[int],
+            pagination: str,
+    ) -> AsyncSearchSession:
+        if pagination == "scroll":
+            return AsyncScrollSession(self.client, index, query_body, size=size)
+        elif pagination == "search_after":
+            return AsyncPointInTimeSession(self.client, index, query_body, size=size)
+        else:
+            raise ValueError(f"pagination is not supported: {pagination}")
+
+    async def get_ecflow_client_messages(
+            self,
+            node_name: typing.Union[str, typing.List[str]] = None,
+            ecflow_host: str = None,
+            ecflow_port: str = None,
+            ecf_date: StartTimeType = None,
+            index_ecf_date: StartTimeType = None,
+            engine = None,
+            size: typing.Optional[int] = None,
+            pagination: str = "search_after",
+            node_path_prefix: str = None,
+            consumer: str = "message",
+    ) -> typing.AsyncIterator[EcflowClientMessage]:
+        """
+        Get ecflow client command messages from ElasticSearch,
+        same as ``EsMessageStorage.get_ecflow_client_messages``.
+
+        Returns
+        -------
+        typing.AsyncIterator[EcflowClientMessage]
+            ecflow client command messages.
+        """
+        if engine is None:
+            engine = nwpc_message_tool.source.ecflow_client
+
+        if index_ecf_date is None:
+            index_ecf_date = ecf_date
+
+        query_body = engine.get_query_body(
+            node_name=node_name,
+            ecflow_host=ecflow_host,
+            ecflow_port=ecflow_port,
+            ecf_date=ecf_date,
+            node_path_prefix=node_path_prefix,
+            consumer=consumer,
+        )
+
+        index = ",".join(engine.get_index(index_ecf_date))
+
+        async with self._create_session(index, query_body, size, pagination) as session:
+            async for hits in session.pages():
+                if session.fetched == len(hits) and self.debug:
+                    logger.info(f"found results: {session.total}")
+                for hit in hits:
+                    yield engine.load_message(hit["_source"])
+
+    async def get_production_standard_time_message(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            engine = nwpc_message_tool.source.production.nwpc_message.production_standard_time
+    ) -> typing.AsyncIterator[ProductionStandardTimeMessage]:
+        """
+        Get standard time message for production from ElasticSearch,
+        same as ``EsMessageStorage.get_production_standard_time_message``.
+
+        Returns
+        -------
+        typing.AsyncIterator[ProductionStandardTimeMessage]
+            production stardard time messages
+        """
+        query_body = engine.get_query_body(
+            system=system,
+            production_stream=production_stream,
+            production_type=production_type,
+            production_name=production_name,
+        )
+
+        index = engine.get_index()
+        search_from = 0
+        total = np.iinfo(np.int16).max
+        while search_from < total:
+            res = await self.client.search(
+                index=index,
+                body={
+                    "size": 10,
+                    "from": search_from,
+                    **query_body,
+                },
+            )
+            current_total = res['hits']['total']['value']
+            if current_total < total:
+                total = current_total
+                if self.debug:
+                    logger.info(f"[{system}] found results: {total}")
+            hits = res['hits']['hits']
+            if len(hits) == 0:
+                break
+            search_from += len(hits)
+            for hit in hits:
+                yield engine.load_message(hit["_source"])
@@ -0,0 +1,284 @@
+import os
+import pathlib
+import typing
+import datetime
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import nwpc_message_tool.source.production.nwpc_message
+from nwpc_message_tool._type import StartTimeType
+from nwpc_message_tool.processor import TableProcessor
+from nwpc_message_tool.storage import EsMessageStorage
+
+
+class ProductionTableCache(object):
+    """
+    Local disk cache in front of ``EsMessageStorage`` for production message tables.
+
+    Message columns are saved as one Parquet file per month of start time under ``cache_dir``::
+
+        {cache_dir}/{engine}/{system}/{stream}/{type}/{name}/{YYYY-MM}.parquet
+        {cache_dir}/{engine}/{system}/{stream}/{type}/{name}/{YYYY-MM}.open.parquet
+
+    A closed month (``.parquet``) is never fetched again.
+    An open month (``.open.parquet``) is refreshed by fetching messages whose time is
+    later than the max time in the file (high-water mark).
+
+    Parquet support requires ``pyarrow``.
+
+    Attributes
+    ----------
+    storage : EsMessageStorage
+        storage to fetch messages
+    cache_dir : pathlib.Path
+        root directory for cache files
+    max_size : int
+        max total size of cache files in bytes.
+        Least recently used files are removed when exceeded.
+    closed_delay : pd.Timedelta
+        a month is closed when this delay has passed after its end.
+    overlap : pd.Timedelta
+        fetch messages from high-water mark minus this time to tolerate delayed messages.
+    """
+    def __init__(
+            self,
+            storage: EsMessageStorage,
+            cache_dir: typing.Union[str, pathlib.Path],
+            max_size: int = 1024 * 1024 * 1024,
+            closed_delay: pd.Timedelta = pd.Timedelta(days=2),
+            overlap: pd.Timedelta = pd.Timedelta(minutes=5),
+    ):
+        self.storage = storage
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.max_size = max_size
+        self.closed_delay = closed_delay
+        self.overlap = overlap
+
+    def get_production_table(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            start_time: StartTimeType = None,
+            forecast_time: str = None,
+            engine=None,
+            processor: TableProcessor = None,
+    ) -> pd.DataFrame:
+        """
+        Get production message table, same as ``EsMessageStorage.get_production_table``.
+        """
+        if processor is None:
+            processor = TableProcessor()
+        columns = self.get_production_columns(
+            system=system,
+            production_type=production_type,
+            production_stream=production_stream,
+            production_name=production_name,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            engine=engine,
+        )
+        return processor.process_columns(columns)
+
+    def get_production_columns(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            start_time: StartTimeType = None,
+            forecast_time: str = None,
+            engine=None,
+    ) -> typing.Dict[str, np.ndarray]:
+        """
+        Get production message columns from cached month partitions.
+
+        Months which are not cached or still open are fetched from ``storage``.
+        Columns are filtered by ``start_time`` and ``forecast_time`` locally.
+
+        Returns
+        -------
+        typing.Dict[str, np.ndarray]
+            message columns, see ``nwpc_message_tool.processor.table_processor.get_message_columns``.
+        """
+        if engine is None:
+            engine = nwpc_message_tool.source.production.nwpc_message.production
+        if start_time is None:
+            raise ValueError("start_time is required for cache")
+
+        months = _get_months(start_time)
+
+        frames = []
+        for month in months:
+            df = self._get_month(
+                month=month,
+                system=system,
+                production_type=production_type,
+                production_stream=production_stream,
+                production_name=production_name,
+                engine=engine,
+            )
+            frames.append(df)
+
+        self.evict()
+
+        if len(frames) == 0:
+            df = pd.DataFrame(engine.load_columns([]))
+        else:
+            df = pd.concat(frames, ignore_index=True)
+
+        mask = _get_start_time_mask(df["start_time"].to_numpy(), start_time)
+        if forecast_time is not None:
+            mask &= df["forecast_time"].to_numpy() == pd.Timedelta(forecast_time).value
+        df = df[mask]
+
+        return {key: df[key].to_numpy() for key in df.columns}
+
+    def evict(self):
+        """
+        Remove least recently used cache files until total size is not larger than ``max_size``.
+        """
+        files = [(f, f.stat()) for f in self.cache_dir.rglob("*.parquet")]
+        total_size = sum(stat.st_size for _, stat in files)
+        if total_size <= self.max_size:
+            return
+        files.sort(key=lambda item: item[1].st_mtime)
+        for f, stat in files:
+            if total_size <= self.max_size:
+                break
+            logger.debug(f"remove cache file: {f}")
+            f.unlink()
+            total_size -= stat.st_size
+
+    def _get_month(
+            self,
+            month: str,
+            system: str,
+            production_type: str,
+            production_stream: str,
+            production_name: str,
+            engine,
+    ) -> pd.DataFrame:
+        partition_dir = pathlib.Path(
+            self.cache_dir,
+            engine.__name__.split(".")[-2],
+            system,
+            _get_key_name(production_stream),
+            _get_key_name(production_type),
+            _get_key_name(production_name),
+        )
+        closed_path = pathlib.Path(partition_dir, f"{month}.parquet")
+        open_path = pathlib.Path(partition_dir, f"{month}.open.parquet")
+
+        if closed_path.exists():
+            _touch(closed_path)
+            return pd.read_parquet(closed_path)
+
+        month_start = pd.Timestamp(f"{month}-01")
+        month_end = month_start + pd.offsets.MonthBegin(1)
+        is_closed = pd.Timestamp.utcnow().tz_localize(None) > month_end + self.closed_delay
+
+        time_after = None
+        df = None
+        if open_path.exists():
+            df = pd.read_parquet(open_path)
+            if len(df) > 0:
+                time_after = pd.Timestamp(df["time"].max(), tz="UTC") - self.overlap
+
+        logger.info(f"[{system}] fetching {month} after {time_after}...")
+        columns = self.storage.get_production_columns(
+            system=system,
+            production_type=production_type,
+            production_stream=production_stream,
+            production_name=production_name,
+            start_time=(month_start, month_end - pd.Timedelta(seconds=1)),
+            engine=engine,
+            time_after=time_after,
+        )
+        new_df = pd.DataFrame(columns)
+        if df is not None:
+            df = pd.concat([df, new_df], ignore_index=True).drop_duplicates(ignore_index=True)
+        else:
+            df = new_df
+
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        if is_closed:
+            _write_parquet(df, closed_path)
+            if open_path.exists():
+                open_path.unlink()
+        else:
+            _write_parquet(df, open_path)
+        return df
+
+
+def _get_key_name(value: typing.Optional[str]) -> str:
+    if value is None:
+        return "_all"
+    return value
+
+
+def _touch(path: pathlib.Path):
+    os.utime(path)
+
+
+def _write_parquet(df: pd.DataFrame, path: pathlib.Path):
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    df.to_parquet(temp_path, index=False)
+    os.replace(temp_path, path)
+
+
+def _get_months(start_time: StartTimeType) -> typing.List[str]:
+    """
+    Get months (``YYYY-MM``) of start time condition.
+    Ranges use normalized bounds, so every month between start and end is included.
+    """
+    def to_naive(t) -> pd.Timestamp:
+        t = pd.Timestamp(t)
+        if t.tzinfo is not None:
+            t = t.tz_localize(None)
+        return t
+
+    if isinstance(start_time, typing.Tuple):
+        periods = pd.period_range(
+            start=to_naive(start_time[0]),
+            end=to_naive(start_time[1]),
+            freq="M",
+        )
+        return [p.strftime("%Y-%m") for p in periods]
+    elif (
+            isinstance(start_time, typing.List)
+            or isinstance(start_time, np.ndarray)
+            or isinstance(start_time, pd.DatetimeIndex)
+    ):
+        return sorted(set(pd.Timestamp(t).strftime("%Y-%m") for t in start_time))
+    return [pd.Timestamp(start_time).strftime("%Y-%m")]
+
+
+def _get_start_time_mask(
+        values: np.ndarray,
+        start_time: StartTimeType
+) -> np.ndarray:
+    """
+    Get mask of start time column (int64 nanoseconds, UTC) for start time condition.
+    Naive times are regarded as UTC, same as ElasticSearch.
+    """
+    def to_value(t) -> int:
+        t = pd.Timestamp(t)
+        if t.tzinfo is None:
+            t = t.tz_localize("UTC")
+        return t.value
+
+    if isinstance(start_time, typing.Tuple):
+        return (values >= to_value(start_time[0])) & (values <= to_value(start_time[1]))
+    elif (
+            isinstance(start_time, typing.List)
+            or isinstance(start_time, np.ndarray)
+            or isinstance(start_time, pd.DatetimeIndex)
+    ):
+        return np.isin(values, [to_value(t) for t in start_time])
+    elif isinstance(start_time, datetime.datetime):
+        return values == to_value(start_time)
+    return np.ones(len(values), dtype=bool)
@@ -4,11 +4,11 @@ from loguru import logger
 from nwpc_message_tool._util import get_engine
 from nwpc_message_tool.cli._util import parse_start_time
 from nwpc_message_tool.storage import EsMessageStorage, get_es_message_storage
+from nwpc_message_tool.cache import ProductionTableCache
 from nwpc_message_tool.presenter import (
     PrintPresenter,
     TableStorePresenter,
 )
-from nwpc_message_tool.processor import TableProcessor
 
 
 @click.command("table")
@@ -47,6 +47,11 @@ from nwpc_message_tool.processor import TableProcessor
     "--output-file",
     help="output file path",
 )
+@click.option(
+    "--cache-dir",
+    default=None,
+    help="local cache directory for production messages. Messages are fetched from ElasticSearch if not set."
+)
 @click.option("--config-file", default=None, help="config file path, default is ``${HOME}/.config/nwpc-oper/nwpc-message-tool.yaml``.")
 def table_cli(
         elastic_server,
@@ -60,6 +65,7 @@ def table_cli(
         engine,
         output_type,
         output_file,
+        cache_dir,
         config_file,
 ):
     """
@@ -87,17 +93,25 @@ def table_cli(
             show_progress=True,
         )
 
-    results = client.get_production_messages(
-        system=system,
-        production_stream=production_stream,
-        production_type=production_type,
-        production_name=production_name,
-        start_time=start_time,
-        engine=engine.production,
-    )
-
-    processor = TableProcessor()
-    table = processor.process_messages(results)
+    if cache_dir is not None:
+        cache = ProductionTableCache(client, cache_dir)
+        table = cache.get_production_table(
+            system=system,
+            production_stream=production_stream,
+            production_type=production_type,
+            production_name=production_name,
+            start_time=start_time,
+            engine=engine.production,
+        )
+    else:
+        table = client.get_production_table(
+            system=system,
+            production_stream=production_stream,
+            production_type=production_type,
+            production_name=production_name,
+            start_time=start_time,
+            engine=engine.production,
+        )
 
     if output_type == "print":
         presenter = PrintPresenter()
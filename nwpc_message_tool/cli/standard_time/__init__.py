@@ -0,0 +1,10 @@
+import click
+from .update import update_cli
+
+
+@click.group()
+def standard_time():
+    pass
+
+
+standard_time.add_command(update_cli, name="update")
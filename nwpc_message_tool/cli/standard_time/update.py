@@ -0,0 +1,124 @@
+import pathlib
+
+import click
+from loguru import logger
+
+from nwpc_message_tool.source.production import nwpc_message
+from nwpc_message_tool.cli._util import parse_start_time
+from nwpc_message_tool.storage import EsMessageStorage, get_es_message_storage
+from nwpc_message_tool.processor import StandardTimeProcessor, StandardTimeState
+from nwpc_message_tool.server.systems_config import SystemsConfig
+
+
+@click.command("update")
+@click.option("--elastic-server", multiple=True, help="ElasticSearch servers")
+@click.option("--storage-name", help="Use storage which is set in config file. Default use ``default_storage`` key.")
+@click.option(
+    "--system",
+    multiple=True,
+    type=click.Choice(list(SystemsConfig.keys())),
+    help="system, such as grapes_gfs_gmf. Default is all systems in SystemsConfig."
+)
+@click.option("--production-stream", default="oper", help="production stream, such as oper.")
+@click.option("--production-type", default="grib2", help="production type, such as grib.")
+@click.option("--production-name", default="orig", help="production name, such as orig.")
+@click.option(
+    "--start-time",
+    required=True,
+    metavar="YYYYMMDDHH/YYYYMMDDHH",
+    help="start time range of history messages used to calculate standard time.")
+@click.option("--jobs", default=1, type=int, help="process count for bootstrap.")
+@click.option("--random-state", default=None, type=int, help="seed for bootstrap to get reproducible results.")
+@click.option(
+    "--state-dir",
+    default=None,
+    help="directory of per-group state files. "
+         "If set, only new cycles in start time range are folded into saved state "
+         "and groups without new cycles are not recalculated.")
+@click.option("--window-size", default=60, type=int, help="max number of cycles kept in each group of state.")
+@click.option("--dry-run", is_flag=True, default=False, help="calculate standard time without saving it.")
+@click.option("--config-file", default=None, help="config file path, default is ``${HOME}/.config/nwpc-oper/nwpc-message-tool.yaml``.")
+def update_cli(
+        elastic_server,
+        storage_name,
+        system,
+        production_stream,
+        production_type,
+        production_name,
+        start_time: str,
+        jobs,
+        random_state,
+        state_dir,
+        window_size,
+        dry_run,
+        config_file,
+):
+    """
+    Calculate standard time of production for systems and save them into ElasticSearch.
+    """
+    start_time = parse_start_time(start_time)
+
+    systems = system
+    if len(systems) == 0:
+        systems = list(SystemsConfig.keys())
+
+    if len(elastic_server) > 0:
+        client = EsMessageStorage(
+            hosts=elastic_server,
+            show_progress=True
+        )
+    else:
+        client = get_es_message_storage(
+            storage_name,
+            config_file=config_file,
+            show_progress=True,
+        )
+
+    for current_system in systems:
+        logger.info(f"[{current_system}] searching...")
+        table = client.get_production_table(
+            system=current_system,
+            production_stream=production_stream,
+            production_type=production_type,
+            production_name=production_name,
+            start_time=start_time,
+            engine=nwpc_message.production,
+        )
+
+        logger.info(f"[{current_system}] calculating standard time...")
+        processor = StandardTimeProcessor(
+            start_hours=SystemsConfig[current_system]["start_hours"],
+            engine="numpy",
+            random_state=random_state,
+            jobs=jobs,
+            show_progress=True,
+        )
+        if state_dir is None:
+            start_hours = processor.process_data(table)
+        else:
+            state_path = pathlib.Path(
+                state_dir,
+                f"{current_system}.{production_stream}.{production_type}.{production_name}.json"
+            )
+            state = StandardTimeState.load(state_path, window_size=window_size)
+            start_hours = processor.update_data(table, state)
+
+        if dry_run:
+            continue
+
+        logger.info(f"[{current_system}] saving standard time...")
+        client.save_production_standard_time_message(
+            system=current_system,
+            production_type=production_type,
+            production_stream=production_stream,
+            production_name=production_name,
+            start_hours=start_hours,
+        )
+
+        if state_dir is not None:
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            state.save(state_path)
+
+
+if __name__ == "__main__":
+    update_cli()
@@ -3,4 +3,5 @@ from .production import (
     ProductionEventMessage,
     ProductionStandardTimeMessage,
 )
-from .ecflow_client import EcflowClientMessage
\ No newline at end of file
+from .ecflow_client import EcflowClientMessage
+from .ecflow_client_batch import EcflowClientMessageBatch
@@ -1,14 +1,49 @@
+import functools
 import typing
 import datetime
 import pandas as pd
 
-from .event import EventMessage
+from .event import EventMessage, LazyField
+
+
+def parse_ecf_date(value: typing.Union[str, datetime.datetime]) -> pd.Timestamp:
+    """
+    Parse ECF_DATE such as ``20210101`` into a timestamp in UTC.
+    """
+    if isinstance(value, str):
+        return _parse_ecf_date_string(value)
+    value = pd.Timestamp(value)
+    if value.tzinfo is None:
+        value = value.tz_localize("UTC")
+    return value
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_ecf_date_string(value: str) -> pd.Timestamp:
+    # messages of one day share the same ECF_DATE, and Timestamp is immutable.
+    return pd.to_datetime(value, format="%Y%m%d").tz_localize("UTC")
 
 
 class EcflowClientMessage(EventMessage):
     """
     ecFlow client command message.
+
+    ``ecf_date`` is kept as raw value and parsed on first access, see ``LazyField``.
     """
+    __slots__ = (
+        "command",
+        "arguments",
+        "envs",
+        "ecflow_host",
+        "ecflow_port",
+        "node_name",
+        "node_rid",
+        "try_no",
+        "_ecf_date",
+    )
+
+    ecf_date = LazyField(parse_ecf_date, pd.Timestamp)
+
     def __init__(
             self,
             command: str = None,
@@ -36,4 +71,4 @@ class EcflowClientMessage(EventMessage):
             self.try_no = int(try_no)
         else:
             pass
-        self.ecf_date = pd.to_datetime(ecf_date, format="%Y%m%d").tz_localize('UTC')
+        self.ecf_date = ecf_date
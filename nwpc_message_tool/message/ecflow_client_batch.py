@@ -0,0 +1,220 @@
+import typing
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from .ecflow_client import EcflowClientMessage
+
+
+NANOSECONDS_PER_DAY = 86400 * 1_000_000_000
+
+
+class EcflowClientMessageBatch(object):
+    """
+    Struct-of-arrays container for fields of ``EcflowClientMessage`` used by situation analytics.
+
+    Node names and commands are stored as categorical codes into ``node_names`` and ``commands``.
+
+    Attributes
+    ----------
+    node_codes : np.ndarray
+        int32 codes into ``node_names``.
+    node_names : np.ndarray
+        unique node names.
+    command_codes : np.ndarray
+        int8 codes into ``commands``.
+    commands : np.ndarray
+        unique commands.
+    times : np.ndarray
+        int64 message times, nanoseconds since epoch in UTC.
+    ecf_dates : np.ndarray
+        int32 ECF_DATE, days since epoch.
+    """
+    def __init__(
+            self,
+            node_codes: np.ndarray,
+            node_names: np.ndarray,
+            command_codes: np.ndarray,
+            commands: np.ndarray,
+            times: np.ndarray,
+            ecf_dates: np.ndarray,
+    ):
+        self.node_codes = node_codes
+        self.node_names = node_names
+        self.command_codes = command_codes
+        self.commands = commands
+        self.times = times
+        self.ecf_dates = ecf_dates
+
+    @classmethod
+    def from_columns(
+            cls,
+            node_name: typing.Sequence[str],
+            command: typing.Sequence[str],
+            time: typing.Union[typing.Sequence, np.ndarray],
+            ecf_date: typing.Union[typing.Sequence, np.ndarray],
+    ) -> "EcflowClientMessageBatch":
+        """
+        Create batch from column values.
+
+        Parameters
+        ----------
+        node_name
+        command
+        time
+            timestamps, or int64 nanoseconds since epoch in UTC.
+        ecf_date
+            ECF_DATE strings such as ``20210101``, timestamps, or int64 nanoseconds since epoch in UTC.
+        """
+        node_codes, node_names = pd.factorize(np.asarray(node_name, dtype=object))
+        command_codes, commands = pd.factorize(np.asarray(command, dtype=object))
+        return cls(
+            node_codes=node_codes.astype(np.int32),
+            node_names=np.asarray(node_names, dtype=object),
+            command_codes=command_codes.astype(np.int8),
+            commands=np.asarray(commands, dtype=object),
+            times=_get_nanoseconds(time),
+            ecf_dates=(_get_nanoseconds(ecf_date, date_format="%Y%m%d") // NANOSECONDS_PER_DAY).astype(np.int32),
+        )
+
+    @classmethod
+    def from_messages(cls, messages: typing.Iterable[EcflowClientMessage]) -> "EcflowClientMessageBatch":
+        """
+        Create batch from message objects.
+        """
+        node_name = []
+        command = []
+        time = []
+        ecf_date = []
+        for message in messages:
+            node_name.append(message.node_name)
+            command.append(message.command)
+            time.append(message.time.value)
+            ecf_date.append(message.ecf_date.value)
+        return cls.from_columns(
+            node_name=node_name,
+            command=command,
+            time=np.array(time, dtype=np.int64),
+            ecf_date=np.array(ecf_date, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, index: typing.Union[slice, np.ndarray]) -> "EcflowClientMessageBatch":
+        """
+        Select messages by slice, boolean mask or integer indices. Categories are kept.
+        """
+        return EcflowClientMessageBatch(
+            node_codes=self.node_codes[index],
+            node_names=self.node_names,
+            command_codes=self.command_codes[index],
+            commands=self.commands,
+            times=self.times[index],
+            ecf_dates=self.ecf_dates[index],
+        )
+
+    def get_node_name(self) -> np.ndarray:
+        return self.node_names[self.node_codes]
+
+    def get_command(self) -> np.ndarray:
+        return self.commands[self.command_codes]
+
+    def get_time(self) -> pd.DatetimeIndex:
+        return pd.to_datetime(self.times, utc=True)
+
+    def get_ecf_date(self) -> pd.DatetimeIndex:
+        return pd.to_datetime(self.ecf_dates.astype(np.int64) * NANOSECONDS_PER_DAY, utc=True)
+
+    def node_mask(self, node_paths: typing.Iterable[str]) -> np.ndarray:
+        """
+        Get boolean mask of messages whose node name is in ``node_paths``.
+        """
+        return np.isin(self.node_codes, _get_codes(self.node_names, node_paths))
+
+    def command_mask(self, commands: typing.Iterable[str]) -> np.ndarray:
+        """
+        Get boolean mask of messages whose command is in ``commands``.
+        """
+        return np.isin(self.command_codes, _get_codes(self.commands, commands))
+
+    def date_mask(
+            self,
+            start_date: datetime.datetime = None,
+            end_date: datetime.datetime = None,
+    ) -> np.ndarray:
+        """
+        Get boolean mask of messages whose ECF_DATE is in [start_date, end_date).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if start_date is not None:
+            mask &= self.ecf_dates >= _get_day(start_date)
+        if end_date is not None:
+            mask &= self.ecf_dates < _get_day(end_date)
+        return mask
+
+    def filter(
+            self,
+            node_paths: typing.Iterable[str] = None,
+            commands: typing.Iterable[str] = None,
+            start_date: datetime.datetime = None,
+            end_date: datetime.datetime = None,
+    ) -> "EcflowClientMessageBatch":
+        """
+        Select messages matching all given conditions, see ``node_mask``, ``command_mask`` and ``date_mask``.
+        """
+        mask = self.date_mask(start_date, end_date)
+        if node_paths is not None:
+            mask &= self.node_mask(node_paths)
+        if commands is not None:
+            mask &= self.command_mask(commands)
+        return self[mask]
+
+    def group_by_date(self) -> typing.Dict[pd.Timestamp, "EcflowClientMessageBatch"]:
+        """
+        Split messages by ECF_DATE, keeping message order in each group.
+
+        Returns
+        -------
+        typing.Dict[pd.Timestamp, EcflowClientMessageBatch]
+            batches keyed by ECF_DATE in UTC, same as ``EcflowClientMessage.ecf_date``.
+        """
+        order = np.argsort(self.ecf_dates, kind="stable")
+        dates, starts = np.unique(self.ecf_dates[order], return_index=True)
+        return {
+            pd.Timestamp(int(date) * NANOSECONDS_PER_DAY, tz="UTC"): self[indices]
+            for date, indices in zip(dates, np.split(order, starts[1:]))
+        }
+
+    def group_by_node(self) -> typing.Dict[str, "EcflowClientMessageBatch"]:
+        """
+        Split messages by node name, keeping message order in each group.
+        """
+        order = np.argsort(self.node_codes, kind="stable")
+        codes, starts = np.unique(self.node_codes[order], return_index=True)
+        return {
+            self.node_names[code]: self[indices]
+            for code, indices in zip(codes, np.split(order, starts[1:]))
+        }
+
+
+def _get_codes(categories: np.ndarray, values: typing.Iterable[str]) -> np.ndarray:
+    values = set(values)
+    return np.array([i for i, category in enumerate(categories) if category in values], dtype=np.int64)
+
+
+def _get_nanoseconds(values, date_format: str = None) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64)
+    if date_format is not None and values.dtype.kind in "OU" and len(values) > 0 and isinstance(values[0], str):
+        return pd.to_datetime(values, format=date_format, utc=True).asi8
+    return pd.to_datetime(values, utc=True).asi8
+
+
+def _get_day(date: datetime.datetime) -> int:
+    date = pd.Timestamp(date)
+    if date.tzinfo is None:
+        date = date.tz_localize("UTC")
+    return date.value // NANOSECONDS_PER_DAY
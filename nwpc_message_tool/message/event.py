@@ -1,5 +1,8 @@
+import datetime
+import typing
 from enum import Enum
 
+import numpy as np
 import pandas as pd
 
 
@@ -13,14 +16,80 @@ class EventStatus(Enum):
     Suspended = 6
 
 
+RawTimeType = typing.Union[str, int, np.integer, datetime.datetime, pd.Timestamp]
+RawDurationType = typing.Union[str, int, np.integer, datetime.timedelta, pd.Timedelta]
+
+
+def parse_timestamp(value: RawTimeType) -> pd.Timestamp:
+    """
+    Parse raw time value. Integers are nanoseconds since epoch in UTC.
+    """
+    if isinstance(value, (int, np.integer)):
+        return pd.Timestamp(value, tz="UTC")
+    return pd.Timestamp(value)
+
+
+def parse_timedelta(value: RawDurationType) -> pd.Timedelta:
+    """
+    Parse raw duration value. Integers are nanoseconds.
+    """
+    return pd.Timedelta(value)
+
+
+class LazyField(object):
+    """
+    Attribute stored as raw value in slot ``_{name}`` and parsed on first access.
+
+    The parsed value replaces the raw value, so each field is parsed at most once.
+    Values of ``value_type`` are parsed when they are set, so ``parse`` can still normalize them,
+    such as localizing naive timestamps. ``parse`` must accept its own results.
+
+    Attributes
+    ----------
+    parse : typing.Callable
+        function to parse raw value.
+    value_type : type
+        type of parsed value. Values of this type are parsed when set instead of on access.
+    """
+    def __init__(self, parse: typing.Callable, value_type: type):
+        self.parse = parse
+        self.value_type = value_type
+        self.slot = None
+
+    def __set_name__(self, owner, name):
+        self.slot = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if value is None or isinstance(value, self.value_type):
+            return value
+        value = self.parse(value)
+        setattr(instance, self.slot, value)
+        return value
+
+    def __set__(self, instance, value):
+        if isinstance(value, self.value_type):
+            value = self.parse(value)
+        setattr(instance, self.slot, value)
+
+
 class EventMessage(object):
     """
     Base message for event.
+
+    Time fields of messages are ``LazyField``, which accept raw ISO strings or int64 nanoseconds
+    and are parsed into pandas objects on first access.
     """
+    __slots__ = ("message_type", "_time")
+
+    time = LazyField(parse_timestamp, pd.Timestamp)
+
     def __init__(
             self,
             message_type: str = None,
-            time: pd.Timestamp = None,
+            time: RawTimeType = None,
             **kwargs,
     ):
         self.message_type: str = message_type
@@ -5,13 +5,34 @@ import pandas as pd
 from nwpc_message_tool.message.event import (
     EventStatus,
     EventMessage,
+    LazyField,
+    RawTimeType,
+    RawDurationType,
+    parse_timestamp,
+    parse_timedelta,
 )
 
 
 class ProductionEventMessage(EventMessage):
     """
     Message for production event.
+
+    ``start_time`` and ``forecast_time`` are parsed on first access, see ``LazyField``.
     """
+    __slots__ = (
+        "system",
+        "stream",
+        "production_type",
+        "production_name",
+        "event",
+        "status",
+        "_start_time",
+        "_forecast_time",
+    )
+
+    start_time = LazyField(parse_timestamp, pd.Timestamp)
+    forecast_time = LazyField(parse_timedelta, pd.Timedelta)
+
     def __init__(
             self,
             system: str = None,
@@ -20,8 +41,8 @@ class ProductionEventMessage(EventMessage):
             production_name: str = None,
             event: str = None,
             status: EventStatus = EventStatus.Unknown,
-            start_time: pd.Timestamp = None,
-            forecast_time: pd.Timedelta = None,
+            start_time: RawTimeType = None,
+            forecast_time: RawDurationType = None,
             **kwargs,
     ):
         super(ProductionEventMessage, self).__init__(**kwargs)
@@ -44,6 +65,14 @@ class ProductionStandardTimeMessage(EventMessage):
     ----------
     start_hour : typing.Dict
     """
+    __slots__ = (
+        "system",
+        "stream",
+        "production_type",
+        "production_name",
+        "start_hours",
+    )
+
     def __init__(
             self,
             system: str = None,
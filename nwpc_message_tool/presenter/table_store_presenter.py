@@ -35,3 +35,24 @@ class TableStorePresenter(Presenter):
             df.to_json(self.output_file)
         else:
             raise ValueError(f"output type is not supported: {self.output_type}")
+
+    def show_frames(self, frames: typing.Iterable[pd.DataFrame]):
+        """
+        Save chunk tables from ``TableProcessor.iter_frames``.
+
+        ``csv`` files are written chunk by chunk, so rows are sorted in each chunk only.
+        ``json`` output needs the whole table, so chunks are combined before writing.
+        """
+        if self.output_type == "csv":
+            header = True
+            for df in frames:
+                df.to_csv(self.output_file, mode="w" if header else "a", header=header)
+                header = False
+            if header:
+                pd.DataFrame().to_csv(self.output_file)
+        elif self.output_type == "json":
+            frames = list(frames)
+            df = pd.concat(frames) if len(frames) > 0 else pd.DataFrame()
+            df.to_json(self.output_file)
+        else:
+            raise ValueError(f"output type is not supported: {self.output_type}")
@@ -1,2 +1,2 @@
 from .table_processor import TableProcessor
-from .standard_time_processor import StandardTimeProcessor
+from .standard_time_processor import StandardTimeProcessor, StandardTimeState
@@ -1,10 +1,17 @@
+import json
+import pathlib
 import typing
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 from tqdm.auto import tqdm
 
 
+NANOSECONDS_PER_SECOND = 1_000_000_000
+
+
 class StandardTimeProcessor(object):
     """
     Calculate standard time from production event message table using Bootstrap.
@@ -29,6 +36,18 @@ class StandardTimeProcessor(object):
         number of samples per time.
     quantile: float
         confidence interval size
+    engine: str
+        bootstrap engine:
+
+        - ``pandas``: sample clocks with ``pandas.Series.sample`` for each bootstrap.
+        - ``numpy``: draw all samples of one forecast hour at once with a
+          ``(bootstrap_count, bootstrap_sample)`` index matrix over int64 nanosecond clocks.
+    random_state: typing.Optional[int]
+        seed for random number generator to get reproducible results.
+        For ``numpy`` engine, each (start_hour, forecast_hour) group is seeded with
+        ``[random_state, start_hour, forecast_hour]``, so results do not depend on ``jobs``.
+    jobs: int
+        process count for ``numpy`` engine. Groups are computed in a process pool when larger than 1.
     """
     def __init__(
             self,
@@ -37,20 +56,139 @@ class StandardTimeProcessor(object):
             bootstrap_sample: int = 10,
             quantile: float = 0.99,
             show_progress: bool = False,
+            engine: str = "pandas",
+            random_state: typing.Optional[int] = None,
+            jobs: int = 1,
     ):
         self.start_hours = start_hours
         self.bootstrap_count = bootstrap_count
         self.bootstrap_sample = bootstrap_sample
         self.quantile = quantile
         self.show_progress = show_progress
+        if engine not in ("pandas", "numpy"):
+            raise ValueError(f"engine is not supported: {engine}")
+        self.engine = engine
+        self.random_state = random_state
+        self.jobs = jobs
 
     def process_data(
             self,
             table: pd.DataFrame,
     ) -> typing.List:
-        table["start_hour"] = table["start_time"].apply(lambda x: x.strftime("%H"))
+        table["start_hour"] = table["start_time"].dt.strftime("%H")
         table["clock"] = table["time"] - table["start_time"]
 
+        if self.engine == "numpy":
+            times = self._get_times_numpy(table)
+        else:
+            times = self._get_times_pandas(table)
+
+        return self._format_times(times)
+
+    def update_data(
+            self,
+            table: pd.DataFrame,
+            state: "StandardTimeState",
+    ) -> typing.List:
+        """
+        Fold new cycles of ``table`` into ``state`` and recompute bounds of changed groups only.
+
+        Rows whose start time is not later than the latest folded start time of their group
+        are ignored, so ``table`` only needs to cover recent cycles.
+        Bounds of groups without new cycles are reused from ``state``.
+        Bootstrap always uses ``numpy`` engine.
+
+        Parameters
+        ----------
+        table:
+            production message table, see ``TableProcessor``.
+        state:
+            per-group state from previous updates. It is updated in place.
+
+        Returns
+        -------
+        typing.List
+            standard time, same as ``process_data``.
+        """
+        table = table.sort_values("start_time", kind="mergesort")
+        start_hours = table["start_time"].dt.strftime("%H").to_numpy()
+        start_times = table["start_time"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        clocks = (table["time"] - table["start_time"]).to_numpy(dtype="timedelta64[ns]").astype(np.int64)
+        groups = pd.Series(np.arange(len(table))).groupby(
+            [start_hours, table["forecast_hour"].to_numpy()]
+        ).indices
+
+        keys = []
+        tasks = []
+        for item in self.start_hours:
+            start_hour = item["start_hour"]
+            for forecast_hour in item["forecast_hours"]:
+                key = (start_hour, forecast_hour)
+                index = groups.get(key, np.array([], dtype=np.intp))
+                new_index = index[start_times[index] > state.latest_start_time.get(key, np.iinfo(np.int64).min)]
+                if len(new_index) == 0 and key in state.bounds:
+                    continue
+                state.fold(key, clocks[new_index], start_times[new_index])
+                keys.append(key)
+                tasks.append((
+                    state.clocks.get(key, np.array([], dtype=np.int64)),
+                    forecast_hour,
+                    self._get_group_seed(start_hour, forecast_hour),
+                    self.bootstrap_count,
+                    self.bootstrap_sample,
+                    self.quantile,
+                ))
+
+        logger.info(f"recompute {len(tasks)} groups")
+        for key, bound in zip(keys, self._get_bounds(tasks)):
+            state.bounds[key] = (bound["upper_bound"].value, bound["lower_bound"].value)
+
+        times = []
+        for item in self.start_hours:
+            start_hour = item["start_hour"]
+            standard_times = []
+            for forecast_hour in item["forecast_hours"]:
+                upper_bound, lower_bound = state.bounds[(start_hour, forecast_hour)]
+                standard_times.append({
+                    "forecast_hour": forecast_hour,
+                    "upper_bound": pd.Timedelta(upper_bound, unit="ns"),
+                    "lower_bound": pd.Timedelta(lower_bound, unit="ns"),
+                })
+            times.append({
+                "start_hour": start_hour,
+                "times": standard_times,
+            })
+        return self._format_times(times)
+
+    def _format_times(
+            self,
+            times: typing.List,
+    ) -> typing.List:
+        prod_time_dfs = [
+            pd.DataFrame(a_time["times"]) for a_time in times
+        ]
+
+        for df in prod_time_dfs:
+            df["upper_duration"] = df["upper_bound"].apply(lambda x: x.isoformat())
+            df["lower_duration"] = df["lower_bound"].apply(lambda x: x.isoformat())
+
+        production_times = [
+            {
+                "start_hour": self.start_hours[index]["start_hour"],
+                "times": df[["forecast_hour", "upper_duration", "lower_duration"]].to_dict("records")
+            } for index, df in enumerate(prod_time_dfs)
+        ]
+
+        return production_times
+
+    def _get_times_pandas(
+            self,
+            table: pd.DataFrame,
+    ) -> typing.List:
+        random_state = None
+        if self.random_state is not None:
+            random_state = np.random.RandomState(self.random_state)
+
         times = []
 
         for item in self.start_hours:
@@ -62,7 +200,7 @@ class StandardTimeProcessor(object):
             if self.show_progress:
                 forecast_hours_range = tqdm(range(len(forecast_hours)), desc=f"{start_hour} hour loop")
             else:
-                forecast_hours_range = forecast_hours
+                forecast_hours_range = range(len(forecast_hours))
 
             for hour_index in forecast_hours_range:
                 forecast_hour = forecast_hours[hour_index]
@@ -72,6 +210,7 @@ class StandardTimeProcessor(object):
                     clock_df_hour,
                     bootstrap_sample=self.bootstrap_sample,
                     bootstrap_count=self.bootstrap_count,
+                    random_state=random_state,
                 )
 
                 standard_time = self._get_bound(
@@ -87,31 +226,82 @@ class StandardTimeProcessor(object):
                 "times": standard_times,
             })
 
-        prod_time_dfs = [
-            pd.DataFrame(a_time["times"]) for a_time in times
-        ]
+        return times
 
-        for df in prod_time_dfs:
-            df["upper_duration"] = df["upper_bound"].apply(lambda x: x.isoformat())
-            df["lower_duration"] = df["lower_bound"].apply(lambda x: x.isoformat())
+    def _get_times_numpy(
+            self,
+            table: pd.DataFrame,
+    ) -> typing.List:
+        clocks = table["clock"].to_numpy(dtype="timedelta64[ns]").astype(np.int64)
+        groups = pd.Series(np.arange(len(table))).groupby(
+            [table["start_hour"].to_numpy(), table["forecast_hour"].to_numpy()]
+        ).indices
 
-        production_times = [
-            {
-                "start_hour": self.start_hours[index]["start_hour"],
-                "times": df[["forecast_hour", "upper_duration", "lower_duration"]].to_dict("records")
-            } for index, df in enumerate(prod_time_dfs)
-        ]
+        tasks = []
+        for item in self.start_hours:
+            start_hour = item["start_hour"]
+            for forecast_hour in item["forecast_hours"]:
+                tasks.append((
+                    clocks[groups.get((start_hour, forecast_hour), [])],
+                    forecast_hour,
+                    self._get_group_seed(start_hour, forecast_hour),
+                    self.bootstrap_count,
+                    self.bootstrap_sample,
+                    self.quantile,
+                ))
 
-        return production_times
+        bounds = self._get_bounds(tasks)
+
+        times = []
+        position = 0
+        for item in self.start_hours:
+            count = len(item["forecast_hours"])
+            times.append({
+                "start_hour": item["start_hour"],
+                "times": bounds[position:position + count],
+            })
+            position += count
+        return times
+
+    def _get_bounds(
+            self,
+            tasks: typing.List[typing.Tuple],
+    ) -> typing.List[typing.Dict]:
+        if self.jobs > 1:
+            executor = ProcessPoolExecutor(max_workers=self.jobs)
+            bounds = executor.map(_get_bound_task, tasks, chunksize=max(1, len(tasks) // (self.jobs * 4)))
+        else:
+            executor = None
+            bounds = map(_get_bound_task, tasks)
+
+        if self.show_progress:
+            bounds = tqdm(bounds, total=len(tasks), desc="bootstrap")
+
+        try:
+            return list(bounds)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def _get_group_seed(
+            self,
+            start_hour: str,
+            forecast_hour: int
+    ) -> typing.Optional[typing.List[int]]:
+        if self.random_state is None:
+            return None
+        return [self.random_state, int(start_hour), int(forecast_hour)]
 
     def _get_mean(
             self,
             clock_df: pd.DataFrame,
             bootstrap_sample: int,
+            random_state: typing.Optional[np.random.RandomState] = None,
     ) -> pd.Timedelta:
         sampled_data = clock_df["clock"].sample(
             n=bootstrap_sample,
             replace=True,
+            random_state=random_state,
         )
         return sampled_data.mean()
 
@@ -119,11 +309,12 @@ class StandardTimeProcessor(object):
             self,
             clock_df,
             bootstrap_sample,
-            bootstrap_count
+            bootstrap_count,
+            random_state: typing.Optional[np.random.RandomState] = None,
     ) -> typing.List[pd.Timedelta]:
         means = []
         for i in range(bootstrap_count):
-            mean = self._get_mean(clock_df, bootstrap_sample)
+            mean = self._get_mean(clock_df, bootstrap_sample, random_state)
             means.append(mean)
         return means
 
@@ -149,3 +340,170 @@ class StandardTimeProcessor(object):
             "upper_bound": upper_bound[0],
             "lower_bound": lower_bound[0],
         }
+
+
+class StandardTimeState(object):
+    """
+    Per-group state of ``StandardTimeProcessor.update_data``.
+
+    Clocks of the latest ``window_size`` cycles are kept for each (start_hour, forecast_hour) group
+    with the latest folded start time and last bounds, so a refresh only bootstraps groups with new cycles.
+
+    Attributes
+    ----------
+    window_size: int
+        max number of clocks kept in each group.
+    clocks: typing.Dict[typing.Tuple[str, int], np.ndarray]
+        int64 nanosecond clocks of each group in order of start time.
+    latest_start_time: typing.Dict[typing.Tuple[str, int], int]
+        latest folded start time of each group, int64 nanoseconds.
+    bounds: typing.Dict[typing.Tuple[str, int], typing.Tuple[int, int]]
+        (upper_bound, lower_bound) of each group, int64 nanoseconds.
+    """
+    def __init__(
+            self,
+            window_size: int = 60,
+    ):
+        self.window_size = window_size
+        self.clocks = dict()
+        self.latest_start_time = dict()
+        self.bounds = dict()
+
+    def fold(
+            self,
+            key: typing.Tuple[str, int],
+            clocks: np.ndarray,
+            start_times: np.ndarray,
+    ):
+        """
+        Append clocks of new cycles to one group and drop clocks out of window.
+        """
+        if len(clocks) == 0:
+            return
+        values = np.concatenate([self.clocks.get(key, np.array([], dtype=np.int64)), clocks])
+        self.clocks[key] = values[-self.window_size:]
+        self.latest_start_time[key] = int(start_times.max())
+
+    def to_dict(self) -> typing.Dict:
+        return {
+            "window_size": self.window_size,
+            "groups": [
+                {
+                    "start_hour": start_hour,
+                    "forecast_hour": int(forecast_hour),
+                    "clocks": self.clocks.get((start_hour, forecast_hour), np.array([], dtype=np.int64)).tolist(),
+                    "latest_start_time": self.latest_start_time.get((start_hour, forecast_hour)),
+                    "bounds": list(self.bounds[(start_hour, forecast_hour)]),
+                } for (start_hour, forecast_hour) in self.bounds
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: typing.Dict) -> "StandardTimeState":
+        state = cls(window_size=data["window_size"])
+        for group in data["groups"]:
+            key = (group["start_hour"], group["forecast_hour"])
+            if len(group["clocks"]) > 0:
+                state.clocks[key] = np.array(group["clocks"], dtype=np.int64)
+            if group["latest_start_time"] is not None:
+                state.latest_start_time[key] = group["latest_start_time"]
+            state.bounds[key] = tuple(group["bounds"])
+        return state
+
+    def save(self, path: typing.Union[str, pathlib.Path]):
+        """
+        Save state into a JSON file.
+        """
+        path = pathlib.Path(path)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        temp_path.replace(path)
+
+    @classmethod
+    def load(
+            cls,
+            path: typing.Union[str, pathlib.Path],
+            window_size: int = 60,
+    ) -> "StandardTimeState":
+        """
+        Load state from a JSON file. Return an empty state with ``window_size`` if file does not exist.
+        """
+        path = pathlib.Path(path)
+        if not path.exists():
+            return cls(window_size=window_size)
+        with open(path) as f:
+            state = cls.from_dict(json.load(f))
+        state.window_size = window_size
+        return state
+
+
+def _get_nearest_quantile(sorted_values: np.ndarray, q: float):
+    """
+    Quantile of sorted values with ``nearest`` interpolation, same as ``numpy.quantile``.
+    """
+    index = int(np.around(q * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def get_bootstrap_bound(
+        clocks: np.ndarray,
+        forecast_hour: int,
+        rng: np.random.Generator,
+        bootstrap_count: int,
+        bootstrap_sample: int,
+        quantile: float,
+) -> typing.Dict:
+    """
+    Get bounds of bootstrap means for one group, same as ``_get_means`` and ``_get_bound``
+    of ``StandardTimeProcessor``.
+
+    Parameters
+    ----------
+    clocks:
+        int64 nanosecond clocks of one (start_hour, forecast_hour) group.
+    forecast_hour:
+        forecast hour
+    rng:
+        random number generator
+    bootstrap_count:
+        sampling times.
+    bootstrap_sample:
+        number of samples per time.
+    quantile:
+        confidence interval size
+
+    Returns
+    -------
+    typing.Dict
+    """
+    if len(clocks) == 0:
+        raise ValueError(f"no clock for forecast hour: {forecast_hour}")
+
+    sample_index = rng.integers(
+        0, len(clocks),
+        size=(bootstrap_count, bootstrap_sample),
+    )
+    means = clocks[sample_index].mean(axis=1).astype(np.int64)
+    means = -(-means // NANOSECONDS_PER_SECOND) * NANOSECONDS_PER_SECOND
+    means.sort()
+
+    upper_bound = _get_nearest_quantile(means, quantile + (1 - quantile) / 2)
+    lower_bound = _get_nearest_quantile(means, (1 - quantile) / 2)
+    return {
+        "forecast_hour": forecast_hour,
+        "upper_bound": pd.Timedelta(upper_bound, unit="ns"),
+        "lower_bound": pd.Timedelta(lower_bound, unit="ns"),
+    }
+
+
+def _get_bound_task(task: typing.Tuple) -> typing.Dict:
+    clocks, forecast_hour, seed, bootstrap_count, bootstrap_sample, quantile = task
+    return get_bootstrap_bound(
+        clocks,
+        forecast_hour=forecast_hour,
+        rng=np.random.default_rng(seed),
+        bootstrap_count=bootstrap_count,
+        bootstrap_sample=bootstrap_sample,
+        quantile=quantile,
+    )
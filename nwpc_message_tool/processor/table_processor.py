@@ -1,5 +1,8 @@
+import itertools
 import typing
+from array import array
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
@@ -7,6 +10,19 @@ from nwpc_message_tool._util import get_hour
 from nwpc_message_tool.message import ProductionEventMessage
 
 
+NANOSECONDS_PER_SECOND = 1_000_000_000
+NANOSECONDS_PER_HOUR = 3600 * NANOSECONDS_PER_SECOND
+
+CATEGORY_COLUMNS = (
+    "system",
+    "stream",
+    "type",
+    "name",
+    "event",
+    "status",
+)
+
+
 class TableProcessor(object):
     """
     Convert ProductionEventMessage into a table.
@@ -18,11 +34,22 @@ class TableProcessor(object):
     drop_duplicates : bool
     keep_duplicates :
         same as Pandas
+    mode : str
+        how to build the table:
+
+        - ``row``: one DataFrame per message, appended one by one.
+        - ``columnar``: collect fields into typed column buffers and build the table once.
+        - ``streaming``: consume messages in chunks of ``chunk_size``, convert each chunk to columns
+          and drop duplicates incrementally, see ``iter_frames``.
+    chunk_size : int
+        message count of one chunk in ``streaming`` mode.
     """
     def __init__(
             self,
             columns: typing.Optional[typing.List[str]] = None,
             keep_duplicates: typing.Union[bool, str] = "first",
+            mode: str = "row",
+            chunk_size: int = 10000,
     ):
         self.columns = [
             "system",
@@ -46,10 +73,20 @@ class TableProcessor(object):
             self.drop_duplicates = True
             self.keep_duplicates = keep_duplicates
 
+        if mode not in ("row", "columnar", "streaming"):
+            raise ValueError(f"mode is not supported: {mode}")
+        self.mode = mode
+        self.chunk_size = chunk_size
+
     def process_messages(
             self,
             messages: typing.Iterable[ProductionEventMessage]
     ) -> pd.DataFrame:
+        if self.mode == "columnar":
+            return self.process_columns(get_message_columns(messages))
+        elif self.mode == "streaming":
+            return self.process_frames(self.iter_frames(messages))
+
         df = pd.DataFrame(columns=self.columns)
         for result in messages:
             hours = get_hour(result)
@@ -86,3 +123,282 @@ class TableProcessor(object):
             logger.debug(f"get {len(df)} results after drop duplicates")
 
         return df
+
+    def process_columns(
+            self,
+            columns: typing.Mapping[str, np.ndarray],
+    ) -> pd.DataFrame:
+        """
+        Build the table from message columns in one pass.
+
+        Parameters
+        ----------
+        columns :
+            raw message columns, see ``get_message_columns``.
+
+        Returns
+        -------
+        pd.DataFrame
+            same table as ``process_messages`` with
+            categorical text columns and ``int16`` forecast hours.
+        """
+        df = self._get_table(columns)
+
+        logger.info(f"get {len(df)} results")
+        # stable sort keeps messages with the same index in arrival order.
+        df = df.sort_index(kind="mergesort")
+
+        if self.drop_duplicates:
+            df = df[~df.index.duplicated(keep=self.keep_duplicates)]
+            logger.debug(f"get {len(df)} results after drop duplicates")
+
+        return df
+
+    def process_summary(
+            self,
+            summary: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """
+        Build the table from production summary, without loading every message.
+
+        Messages are sorted by time in ElasticSearch, so the first duplicated message is the one with ``min_time``
+        and the last one is with ``max_time``.
+        Only ``start_time``, ``forecast_hour`` and ``time`` columns are available in summary.
+
+        Parameters
+        ----------
+        summary :
+            summary table from ``EsMessageStorage.get_production_summary``.
+
+        Returns
+        -------
+        pd.DataFrame
+            same rows as ``process_columns`` with columns in ``start_time``, ``forecast_hour`` and ``time``.
+        """
+        keep_duplicates = self.keep_duplicates if self.drop_duplicates else True
+        if keep_duplicates not in ("first", "last"):
+            raise ValueError(f"keep_duplicates is not supported for summary: {keep_duplicates}")
+
+        time_column = "min_time" if keep_duplicates == "first" else "max_time"
+        data = {
+            "start_time": summary["start_time"],
+            "forecast_hour": summary["forecast_hour"].astype(np.int16),
+            "time": summary[time_column].dt.ceil("S"),
+        }
+        columns = [column for column in self.columns if column in data]
+        df = pd.DataFrame({column: data[column] for column in columns}, columns=columns, index=summary.index)
+        logger.info(f"get {len(df)} results")
+        return df.sort_index(kind="mergesort")
+
+    def iter_frames(
+            self,
+            messages: typing.Iterable[ProductionEventMessage],
+    ) -> typing.Iterator[pd.DataFrame]:
+        """
+        Convert messages into tables chunk by chunk.
+
+        Messages are consumed in chunks of ``chunk_size``, so only one chunk of message objects is kept in memory.
+        Duplicates are dropped incrementally with a hash set of (start_time, forecast_hour):
+
+        - keep ``first``: each chunk is yielded once it is processed.
+        - keep ``last``: chunk tables are kept until all messages are consumed,
+          because a later message may replace rows of earlier chunks.
+          Replaced rows are dropped from kept tables as each chunk is processed,
+          so kept rows are no more than rows of the final table.
+
+        Parameters
+        ----------
+        messages :
+            production event messages
+
+        Returns
+        -------
+        typing.Iterator[pd.DataFrame]
+            table of each chunk sorted by index, with the same columns as ``process_columns``.
+            Use ``process_frames`` to get the whole table.
+        """
+        if self.drop_duplicates and self.keep_duplicates not in ("first", "last"):
+            raise ValueError(f"keep_duplicates is not supported in streaming mode: {self.keep_duplicates}")
+
+        messages = iter(messages)
+        seen_keys = set()
+        last_chunks = []
+        # chunk position in last_chunks of each kept key
+        key_chunks = dict()
+        while True:
+            columns = get_message_columns(itertools.islice(messages, self.chunk_size))
+            if len(columns["time"]) == 0:
+                break
+            df = self._get_table(columns)
+            if not self.drop_duplicates:
+                yield df.sort_index(kind="mergesort")
+                continue
+
+            keys = list(zip(columns["start_time"].tolist(), _get_forecast_hour(columns).tolist()))
+            if self.keep_duplicates == "first":
+                mask = np.zeros(len(keys), dtype=bool)
+                for i, key in enumerate(keys):
+                    if key not in seen_keys:
+                        seen_keys.add(key)
+                        mask[i] = True
+                yield df[mask].sort_index(kind="mergesort")
+            else:
+                # keep last row of each key in this chunk
+                mask = np.zeros(len(keys), dtype=bool)
+                chunk_keys = set()
+                for i in range(len(keys) - 1, -1, -1):
+                    if keys[i] not in chunk_keys:
+                        chunk_keys.add(keys[i])
+                        mask[i] = True
+                keys = [key for key, kept in zip(keys, mask) if kept]
+
+                # drop rows of earlier chunks replaced by this chunk
+                replaced_chunks = dict()
+                for key in keys:
+                    chunk_index = key_chunks.get(key)
+                    if chunk_index is not None:
+                        replaced_chunks.setdefault(chunk_index, set()).add(key)
+                    key_chunks[key] = len(last_chunks)
+                for chunk_index, replaced_keys in replaced_chunks.items():
+                    chunk_df, chunk_keys = last_chunks[chunk_index]
+                    chunk_mask = np.array([key not in replaced_keys for key in chunk_keys], dtype=bool)
+                    last_chunks[chunk_index] = (
+                        chunk_df[chunk_mask],
+                        [key for key, kept in zip(chunk_keys, chunk_mask) if kept],
+                    )
+
+                last_chunks.append((df[mask], keys))
+
+        for df, _ in last_chunks:
+            yield df.sort_index(kind="mergesort")
+
+    def process_frames(
+            self,
+            frames: typing.Iterable[pd.DataFrame],
+    ) -> pd.DataFrame:
+        """
+        Combine chunk tables from ``iter_frames`` with one concat.
+
+        Returns
+        -------
+        pd.DataFrame
+            same table as ``process_columns``.
+        """
+        frames = list(frames)
+        if len(frames) == 0:
+            return self.process_columns(get_message_columns([]))
+
+        df = pd.concat(frames, copy=False)
+        # categories of chunks may be different.
+        for column in CATEGORY_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype("category")
+
+        logger.info(f"get {len(df)} results")
+        df = df.sort_index(kind="mergesort")
+        return df
+
+    def _get_table(
+            self,
+            columns: typing.Mapping[str, np.ndarray],
+    ) -> pd.DataFrame:
+        start_time = columns["start_time"]
+        forecast_hour = _get_forecast_hour(columns)
+
+        data = {
+            "system": pd.Categorical(columns["system"]),
+            "stream": pd.Categorical(columns["stream"]),
+            "type": pd.Categorical(columns["type"]),
+            "name": pd.Categorical(columns["name"]),
+            "start_time": pd.to_datetime(start_time, utc=True),
+            "forecast_hour": forecast_hour,
+            "time": pd.to_datetime(columns["time"], utc=True).ceil("S"),
+            "event": pd.Categorical(columns["event"]),
+            "status": pd.Categorical(columns["status"]),
+        }
+
+        return pd.DataFrame(
+            {column: data[column] for column in self.columns},
+            columns=self.columns,
+            index=get_table_index(start_time, forecast_hour),
+        )
+
+
+def _get_forecast_hour(columns: typing.Mapping[str, np.ndarray]) -> np.ndarray:
+    return np.floor_divide(columns["forecast_time"], NANOSECONDS_PER_HOUR).astype(np.int16)
+
+
+def get_message_columns(
+        messages: typing.Iterable[ProductionEventMessage]
+) -> typing.Dict[str, np.ndarray]:
+    """
+    Collect fields of production event messages into column arrays.
+
+    Time fields are stored as int64 nanoseconds (UTC for time points).
+
+    Parameters
+    ----------
+    messages :
+        production event messages
+
+    Returns
+    -------
+    typing.Dict[str, np.ndarray]
+        columns with keys:
+
+        - ``system``, ``stream``, ``type``, ``name``, ``event``, ``status``: object arrays of str
+        - ``start_time``, ``time``: int64 nanoseconds since epoch
+        - ``forecast_time``: int64 nanoseconds
+    """
+    text_buffers = {key: [] for key in CATEGORY_COLUMNS}
+    start_time = array("q")
+    forecast_time = array("q")
+    message_time = array("q")
+
+    for message in messages:
+        text_buffers["system"].append(message.system)
+        text_buffers["stream"].append(message.stream)
+        text_buffers["type"].append(message.production_type)
+        text_buffers["name"].append(message.production_name)
+        text_buffers["event"].append(message.event)
+        text_buffers["status"].append(message.status.name)
+        start_time.append(message.start_time.value)
+        forecast_time.append(message.forecast_time.value)
+        message_time.append(message.time.value)
+
+    columns = {
+        key: np.array(value, dtype=object) for key, value in text_buffers.items()
+    }
+    columns["start_time"] = np.frombuffer(start_time, dtype=np.int64)
+    columns["forecast_time"] = np.frombuffer(forecast_time, dtype=np.int64)
+    columns["time"] = np.frombuffer(message_time, dtype=np.int64)
+    return columns
+
+
+def get_table_index(
+        start_time: np.ndarray,
+        forecast_hour: np.ndarray,
+) -> pd.Index:
+    """
+    Build ``YYYYMMDDHH+FFF`` index labels.
+
+    Labels are formatted once for each unique start time and forecast hour.
+
+    Parameters
+    ----------
+    start_time :
+        int64 nanoseconds since epoch (UTC)
+    forecast_hour :
+        forecast hours
+
+    Returns
+    -------
+    pd.Index
+    """
+    start_codes, start_uniques = pd.factorize(start_time)
+    start_labels = pd.to_datetime(start_uniques, utc=True).strftime("%Y%m%d%H").to_numpy(dtype=object)
+
+    hour_codes, hour_uniques = pd.factorize(forecast_hour)
+    hour_labels = np.array([f"+{h:03}" for h in hour_uniques], dtype=object)
+
+    return pd.Index(start_labels[start_codes] + hour_labels[hour_codes], dtype=object)
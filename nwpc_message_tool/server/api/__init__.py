@@ -1,70 +1,111 @@
 import pandas as pd
 import numpy as np
-from flask import Blueprint, request, current_app, jsonify
+from flask import Blueprint, request, current_app, abort
 from loguru import logger
 
 from nwpc_message_tool.source.production import nwpc_message
 from nwpc_message_tool.storage import EsMessageStorage
+from nwpc_message_tool.standard_time import StandardTimeRepository
+from nwpc_message_tool.server.storage import get_message_storage, get_standard_time_repository
+from nwpc_message_tool.server.cache import get_response_cache
 from nwpc_message_tool.processor import TableProcessor
 from nwpc_message_tool.server.systems_config import SystemsConfig
 
 import json
+import typing
 
 api_app = Blueprint('api_app', __name__, template_folder='template')
 
+# a day is closed after this delay since its end, when all products should have arrived,
+# and its response is cached permanently.
+CLOSED_DELAY = pd.Timedelta(days=2)
+
 
 @api_app.route('/prod/grib2', methods=['GET'])
 def get_prod_grib2():
+    """
+    Get production times of grib2 for one day.
+
+    Responses are cached by (system, date) with stale-while-revalidate, see ``ResponseCache``.
+    ``ETag`` and ``Last-Modified`` are set for conditional requests.
+    """
     system_name = request.args.get("system", "")
     query_date = request.args.get("date", "")
 
+    system = nwpc_message.fix_system_name(system_name)
+    # system is a part of cache key and cache file path, so only known systems are accepted.
+    if system not in SystemsConfig:
+        abort(400, f"system is not supported: {system}")
+    current_date = _parse_query_date(query_date)
+    if current_date is None:
+        abort(400, f"date is not supported: {query_date}")
+    query_date = current_date.strftime("%Y-%m-%d")
+    client = get_message_storage()
+    standard_time_repository = get_standard_time_repository()
+
+    cache = get_response_cache()
+    entry = cache.get(
+        key=("prod-grib2", system, current_date.strftime("%Y%m%d")),
+        loader=lambda: json.dumps(
+            _get_prod_grib2_times(client, standard_time_repository, system, query_date),
+            sort_keys=True,
+        ),
+        closed=pd.Timestamp.utcnow().tz_localize(None) > current_date + pd.Timedelta(days=1) + CLOSED_DELAY,
+    )
+
+    response = current_app.response_class(entry.body, mimetype="application/json")
+    response.set_etag(entry.etag)
+    response.last_modified = entry.last_modified
+    response.cache_control.no_cache = True
+    response.headers.add("Access-Control-Allow-Origin", "*")
+    return response.make_conditional(request)
+
+
+def _parse_query_date(query_date: str) -> typing.Optional[pd.Timestamp]:
+    """
+    Parse ``date`` argument of requests, ``None`` if it is not a naive date without time.
+    """
+    try:
+        current_date = pd.to_datetime(query_date)
+    except (ValueError, OverflowError):
+        return None
+    if pd.isna(current_date) or current_date.tzinfo is not None or current_date != current_date.normalize():
+        return None
+    return current_date
+
+
+def _get_prod_grib2_times(
+        client: EsMessageStorage,
+        standard_time_repository: StandardTimeRepository,
+        system: str,
+        query_date: str,
+) -> typing.List:
     start_time = (
         pd.to_datetime(f"{query_date} 00:00:00"),
         pd.to_datetime(f"{query_date} 23:00:00"),
     )
 
-    system = nwpc_message.fix_system_name(system_name)
-
-    hosts = current_app.config["SERVER_CONFIG"]["message_storage"]["hosts"]
-
-    client = EsMessageStorage(
-        hosts=hosts,
-        show_progress=False,
-    )
-
     # get standard times
-    standard_time_messages = list(client.get_production_standard_time_message(
+    standard_time_table = standard_time_repository.get_table(
         system=system,
         production_stream="oper",
         production_type="grib2",
         production_name="orig",
-        engine=nwpc_message.production_standard_time,
-    ))
-
-    if len(standard_time_messages) == 0:
-        standard_time_df = None
-    else:
-        standard_time_message = standard_time_messages[0]
-        standard_time_df = pd.DataFrame([
-            {**time, "start_hour": i["start_hour"]}
-            for i in standard_time_message.start_hours
-            for time in i["times"]
-        ])
-
-    results = client.get_production_messages(
+    )
+
+    # only first time of each (start time, forecast hour) is required, which is aggregated in ElasticSearch.
+    summary = client.get_production_summary(
         system=system,
         production_stream="oper",
         production_type="grib2",
         production_name="orig",
         start_time=start_time,
-        size=40,
         engine=nwpc_message.production,
     )
-
     processor = TableProcessor(
         keep_duplicates=False,
     )
-    df = processor.process_messages(results)
+    df = processor.process_summary(summary)
     logger.debug(f"[{system}] API table has {len(df)} records")
 
     result = []
@@ -87,13 +128,14 @@ def get_prod_grib2():
         #     # print(f"{system}/{start_hour}:", df_merged_na)
         #     pass
 
-        if standard_time_df is not None:
+        if standard_time_table is not None:
             current_start_clock = pd.to_datetime(f"{query_date} {start_hour}:00 UTC")
 
-            start_hour_df = standard_time_df[standard_time_df["start_hour"] == start_hour][["forecast_hour", "upper_duration"]]
-            start_hour_df_merged = pd.merge(df_merged, start_hour_df, how="left")
-            start_hour_df_merged["upper_duration"] = start_hour_df_merged["upper_duration"].apply(lambda x: pd.to_timedelta(x))
-            start_hour_df_merged["standard_time"] = start_hour_df_merged["upper_duration"] + current_start_clock
+            start_hour_df_merged = df_merged
+            upper_duration = standard_time_table["upper_duration"].reindex(
+                pd.MultiIndex.from_product([[start_hour], df_merged["forecast_hour"]])
+            )
+            start_hour_df_merged["standard_time"] = (upper_duration + current_start_clock).to_list()
 
             # ceil to minute when compare time with standard time.
             start_hour_df_merged["flag"] = np.where(
@@ -115,6 +157,4 @@ def get_prod_grib2():
             "times": current_production_times,
         })
 
-    response = jsonify(result)
-    response.headers.add("Access-Control-Allow-Origin", "*")
-    return response
+    return result
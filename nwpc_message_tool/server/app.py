@@ -5,6 +5,8 @@ from flask import Flask
 from flask.json import JSONEncoder
 
 from .config import Config
+from .storage import init_message_storage, init_standard_time_repository
+from .cache import init_response_cache
 
 
 class ServerJSONEncoder(JSONEncoder):
@@ -34,6 +36,10 @@ def create_app(config_file_path=None):
     app.config['server_config'] = app.config['SERVER_CONFIG']
     app.json_encoder = ServerJSONEncoder
 
+    init_message_storage(app)
+    init_standard_time_repository(app)
+    init_response_cache(app)
+
     with app.app_context():
         from .main import main_app
         app.register_blueprint(main_app)
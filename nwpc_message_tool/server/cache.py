@@ -0,0 +1,258 @@
+import datetime
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+import typing
+from collections import OrderedDict
+
+from flask import Flask, current_app
+from loguru import logger
+
+
+class CacheEntry(object):
+    """
+    Cached response body.
+
+    Attributes
+    ----------
+    body : str
+        response body
+    etag : str
+        hash of body
+    last_modified : datetime.datetime
+        time when body is generated, in UTC.
+    expires : float
+        timestamp after which the entry is stale, ``inf`` means never.
+    """
+    def __init__(
+            self,
+            body: str,
+            last_modified: datetime.datetime,
+            expires: float,
+            etag: str = None,
+    ):
+        self.body = body
+        if etag is None:
+            etag = hashlib.sha1(body.encode("utf-8")).hexdigest()
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+    def to_dict(self) -> typing.Dict:
+        return {
+            "body": self.body,
+            "etag": self.etag,
+            "last_modified": self.last_modified.isoformat(),
+            "expires": self.expires,
+        }
+
+    @classmethod
+    def from_dict(cls, data: typing.Dict) -> "CacheEntry":
+        return cls(
+            body=data["body"],
+            etag=data["etag"],
+            last_modified=datetime.datetime.fromisoformat(data["last_modified"]),
+            expires=data["expires"],
+        )
+
+
+# count of locks for loading entries, keys are striped over these locks.
+KEY_LOCK_COUNT = 64
+
+
+class ResponseCache(object):
+    """
+    In-process TTL cache for API responses with stale-while-revalidate.
+
+    - A fresh entry is returned directly.
+    - A stale entry within ``stale_ttl`` is returned directly, and refreshed in a background thread.
+    - Otherwise, the response is loaded in current request.
+
+    Entries of closed keys never expire. When ``cache_dir`` is set, entries are also saved as
+    JSON files which are shared by all processes of the server.
+
+    Attributes
+    ----------
+    ttl : float
+        seconds before an entry is stale.
+    stale_ttl : float
+        seconds after an entry is stale, in which the stale entry can still be returned.
+    max_entries : int
+        max entry count in memory, least recently used entries are removed.
+    cache_dir : typing.Optional[pathlib.Path]
+        directory of cache files.
+    """
+    def __init__(
+            self,
+            ttl: float = 60,
+            stale_ttl: float = 600,
+            max_entries: int = 1024,
+            cache_dir: typing.Optional[typing.Union[str, pathlib.Path]] = None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.cache_dir = None if cache_dir is None else pathlib.Path(cache_dir)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # keys come from requests, so a fixed pool of locks is used instead of one lock for each key.
+        self._key_locks = [threading.Lock() for _ in range(KEY_LOCK_COUNT)]
+        self._refreshing = set()
+
+    def get(
+            self,
+            key: typing.Tuple[str, ...],
+            loader: typing.Callable[[], str],
+            closed: bool = False,
+    ) -> CacheEntry:
+        """
+        Get cached entry of key, or load it with ``loader``.
+
+        Parameters
+        ----------
+        key :
+            cache key, items are used as path components of cache file.
+            ``ValueError`` is raised for items which are empty, ``.``, ``..`` or contain path separators
+            when ``cache_dir`` is set.
+        loader :
+            function to generate response body.
+        closed :
+            whether response of the key will not change, such as data of a past day.
+
+        Returns
+        -------
+        CacheEntry
+        """
+        now = time.time()
+        entry = self._get_entry(key)
+        if entry is not None:
+            if now < entry.expires:
+                return entry
+            if now < entry.expires + self.stale_ttl:
+                self._refresh_in_background(key, loader, closed)
+                return entry
+
+        with self._get_key_lock(key):
+            entry = self._get_entry(key)
+            if entry is not None and time.time() < entry.expires:
+                return entry
+            return self._load(key, loader, closed)
+
+    def _load(
+            self,
+            key: typing.Tuple[str, ...],
+            loader: typing.Callable[[], str],
+            closed: bool,
+    ) -> CacheEntry:
+        body = loader()
+        now = time.time()
+        entry = CacheEntry(
+            body=body,
+            last_modified=datetime.datetime.fromtimestamp(int(now), tz=datetime.timezone.utc),
+            expires=float("inf") if closed else now + self.ttl,
+        )
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None and previous.etag == entry.etag:
+                # keep validators if body is not changed.
+                entry.last_modified = previous.last_modified
+            self._put_entry(key, entry)
+        if self.cache_dir is not None:
+            self._save_file(key, entry)
+        return entry
+
+    def _refresh_in_background(
+            self,
+            key: typing.Tuple[str, ...],
+            loader: typing.Callable[[], str],
+            closed: bool,
+    ):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._get_key_lock(key):
+                    self._load(key, loader, closed)
+            except Exception as e:
+                logger.warning(f"refresh cache failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _get_entry(self, key: typing.Tuple[str, ...]) -> typing.Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if self.cache_dir is None:
+            return None
+        entry = self._load_file(key)
+        if entry is not None:
+            with self._lock:
+                self._put_entry(key, entry)
+        return entry
+
+    def _put_entry(self, key: typing.Tuple[str, ...], entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_key_lock(self, key: typing.Tuple[str, ...]) -> threading.Lock:
+        return self._key_locks[hash(key) % len(self._key_locks)]
+
+    def _get_file_path(self, key: typing.Tuple[str, ...]) -> pathlib.Path:
+        for part in key:
+            if part in ("", ".", "..") or "/" in part or os.sep in part:
+                raise ValueError(f"cache key is not supported: {key}")
+        return pathlib.Path(self.cache_dir, *key[:-1], f"{key[-1]}.json")
+
+    def _load_file(self, key: typing.Tuple[str, ...]) -> typing.Optional[CacheEntry]:
+        path = self._get_file_path(key)
+        try:
+            with open(path) as f:
+                return CacheEntry.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_file(self, key: typing.Tuple[str, ...], entry: CacheEntry):
+        path = self._get_file_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(entry.to_dict(), f)
+        os.replace(temp_path, path)
+
+
+def init_response_cache(app: Flask):
+    """
+    Create response cache from optional ``api_cache`` in server config:
+
+    .. code-block:: yaml
+
+        api_cache:
+          ttl: 60
+          stale_ttl: 600
+          max_entries: 1024
+          cache_dir: /var/cache/nwpc-message-tool
+    """
+    cache_config = app.config["SERVER_CONFIG"].get("api_cache", None)
+    if cache_config is None:
+        cache_config = dict()
+    app.extensions["response_cache"] = ResponseCache(**cache_config)
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get response cache of current app.
+    """
+    return current_app.extensions["response_cache"]
@@ -0,0 +1,63 @@
+from flask import Flask, current_app
+
+from nwpc_message_tool.storage import EsMessageStorage, get_shared_es_message_storage
+from nwpc_message_tool.standard_time import StandardTimeRepository
+
+
+def init_message_storage(app: Flask):
+    """
+    Create message storage shared by all handlers from ``message_storage`` in server config:
+
+    .. code-block:: yaml
+
+        message_storage:
+          hosts:
+            - localhost:9200
+          client:
+            maxsize: 25
+            timeout: 30
+            max_retries: 3
+            retry_on_timeout: true
+
+    ``client`` is optional, see ``client_options`` of ``EsMessageStorage``.
+    """
+    storage_config = app.config["SERVER_CONFIG"]["message_storage"]
+    app.extensions["message_storage"] = get_shared_es_message_storage(
+        hosts=storage_config["hosts"],
+        show_progress=False,
+        client_options=storage_config.get("client", None),
+    )
+
+
+def get_message_storage() -> EsMessageStorage:
+    """
+    Get message storage of current app.
+    """
+    return current_app.extensions["message_storage"]
+
+
+def init_standard_time_repository(app: Flask):
+    """
+    Create standard time repository shared by all handlers, with optional ``standard_time`` in server config:
+
+    .. code-block:: yaml
+
+        standard_time:
+          refresh_interval: 3600
+
+    Must be called after ``init_message_storage``.
+    """
+    repository_config = app.config["SERVER_CONFIG"].get("standard_time", None)
+    if repository_config is None:
+        repository_config = dict()
+    app.extensions["standard_time_repository"] = StandardTimeRepository(
+        storage=app.extensions["message_storage"],
+        **repository_config,
+    )
+
+
+def get_standard_time_repository() -> StandardTimeRepository:
+    """
+    Get standard time repository of current app.
+    """
+    return current_app.extensions["standard_time_repository"]
@@ -0,0 +1,24 @@
+import typing
+
+
+def get_source(
+        source_includes: typing.Dict[str, typing.List[str]],
+        consumer: str,
+) -> typing.Dict:
+    """
+    Get ``_source`` of search body to return only fields required by consumer.
+
+    Parameters
+    ----------
+    source_includes:
+        source fields required by each consumer, such as ``SOURCE_INCLUDES`` of engines.
+    consumer:
+        consumer of search results, key of ``source_includes``.
+
+    Returns
+    -------
+    typing.Dict
+    """
+    if consumer not in source_includes:
+        raise ValueError(f"consumer is not supported: {consumer}")
+    return {"includes": source_includes[consumer]}
@@ -6,12 +6,34 @@ import pandas as pd
 
 from nwpc_message_tool.message import EcflowClientMessage
 from nwpc_message_tool._type import StartTimeType
+from nwpc_message_tool.source._util import get_source
+
+
+# source fields required by each consumer:
+#   message: load_message
+#   situation: load_message for SituationCalculator, without args and envs.
+SOURCE_INCLUDES = {
+    "message": ["type", "time", "data"],
+    "situation": [
+        "type",
+        "time",
+        "data.command",
+        "data.ecf_host",
+        "data.ecf_port",
+        "data.ecf_name",
+        "data.ecf_rid",
+        "data.ecf_tryno",
+        "data.ecf_date",
+    ],
+}
 
 
 def load_message(doc: typing.Dict) -> EcflowClientMessage:
     """
     Get EcflowClientMessage from dict document.
 
+    ``args`` and ``envs`` are ``None`` if they are not in document, such as searching for ``situation`` consumer.
+
     Parameters
     ----------
     doc:
@@ -25,10 +47,10 @@ def load_message(doc: typing.Dict) -> EcflowClientMessage:
     data = doc["data"]
     message = EcflowClientMessage(
         message_type=doc["type"],
-        time=pd.Timestamp(doc["time"]),
+        time=doc["time"],
         command=data["command"],
-        arguments=data["args"],
-        envs=data["envs"],
+        arguments=data.get("args"),
+        envs=data.get("envs"),
         ecflow_host=data["ecf_host"],
         ecflow_port=data["ecf_port"],
         node_name=data["ecf_name"],
@@ -40,10 +62,12 @@ def load_message(doc: typing.Dict) -> EcflowClientMessage:
 
 
 def get_query_body(
-        node_name: str,
+        node_name: typing.Union[str, typing.List[str]] = None,
         ecflow_host: str = None,
         ecflow_port: str = None,
-        ecf_date: StartTimeType = None
+        ecf_date: StartTimeType = None,
+        node_path_prefix: str = None,
+        consumer: str = None,
 ) -> typing.Dict:
     """
     Get query body for ElasticSearch
@@ -51,24 +75,44 @@ def get_query_body(
     Parameters
     ----------
     node_name:
-        node path
+        node path, or list of node paths to search many nodes in one query.
     ecflow_host:
         ecflow host, such as login_b01
     ecflow_port:
         ecflow port
     ecf_date:
         search dates, filter the ``data.ecf_date`` field.
+    node_path_prefix:
+        prefix of node path, such as ``/grapes_meso_3km_v5_0/cold/00/model/``,
+        to search all nodes under a family.
+    consumer:
+        consumer of search results, see ``SOURCE_INCLUDES``.
+        Only fields required by consumer are returned if set.
 
     Returns
     -------
     typing.Dict:
         search body
     """
-    conditions = [{
-        "term": {
-            "data.ecf_name.keyword": node_name
-        }
-    }]
+    conditions = []
+    if isinstance(node_name, str):
+        conditions.append({
+            "term": {
+                "data.ecf_name.keyword": node_name
+            }
+        })
+    elif node_name is not None:
+        conditions.append({
+            "terms": {
+                "data.ecf_name.keyword": list(node_name)
+            }
+        })
+    if node_path_prefix is not None:
+        conditions.append({
+            "prefix": {
+                "data.ecf_name.keyword": node_path_prefix
+            }
+        })
     if ecflow_host is not None:
         conditions.append({
             "term": {
@@ -116,6 +160,8 @@ def get_query_body(
             }
         ]
     }
+    if consumer is not None:
+        query_body["_source"] = get_source(SOURCE_INCLUDES, consumer)
     return query_body
 
 
@@ -6,6 +6,16 @@ import pandas as pd
 
 from nwpc_message_tool.message import ProductionEventMessage, EventStatus
 from nwpc_message_tool._type import StartTimeType
+from nwpc_message_tool.source._util import get_source
+
+
+# source fields required by each consumer:
+#   message: load_message
+#   table: load_columns
+SOURCE_INCLUDES = {
+    "message": ["source", "status", "datetime", "startTime", "forecastTime"],
+    "table": ["source", "status", "datetime", "startTime", "forecastTime"],
+}
 
 
 def load_message(doc: dict) -> ProductionEventMessage:
@@ -29,6 +39,40 @@ def load_message(doc: dict) -> ProductionEventMessage:
     return message
 
 
+def load_columns(docs: typing.List[typing.Dict]) -> typing.Dict[str, np.ndarray]:
+    """
+    Get column arrays from dict documents without creating message objects.
+
+    Status "0" is converted to ``EventStatus.Complete``, others to ``EventStatus.Unknown``.
+
+    Parameters
+    ----------
+    docs:
+        documents retrieved from ElasticSearch
+
+    Returns
+    -------
+    typing.Dict[str, np.ndarray]
+        message columns, see ``nwpc_message_tool.processor.table_processor.get_message_columns``.
+    """
+    count = len(docs)
+    forecast_hours = np.array([doc["forecastTime"] for doc in docs], dtype=object)
+    return {
+        "system": np.array([doc["source"] for doc in docs], dtype=object),
+        "stream": np.full(count, "oper", dtype=object),
+        "type": np.full(count, "grib2", dtype=object),
+        "name": np.full(count, "orig", dtype=object),
+        "event": np.full(count, "before_upload", dtype=object),
+        "status": np.array([
+            EventStatus.Complete.name if doc["status"] == "0" else EventStatus.Unknown.name
+            for doc in docs
+        ], dtype=object),
+        "start_time": pd.to_datetime([doc["startTime"] for doc in docs], utc=True).asi8,
+        "forecast_time": pd.to_timedelta(forecast_hours.astype(np.int64), unit="h").asi8,
+        "time": pd.to_datetime([doc["datetime"] for doc in docs], utc=True).asi8,
+    }
+
+
 def get_index(
         start_time: StartTimeType = None
 ) -> typing.List[str]:
@@ -47,6 +91,8 @@ def get_index(
 def get_query_body(
         system: str,
         start_time: StartTimeType = None,
+        time_after: datetime.datetime = None,
+        consumer: str = None,
         # production_type: str = None,
         # production_stream: str = None,
         # production_name: str = None,
@@ -78,6 +124,15 @@ def get_query_body(
             }
         })
 
+    if time_after is not None:
+        conditions.append({
+            "range": {
+                "datetime": {
+                    "gte": time_after.isoformat(),
+                }
+            }
+        })
+
     query_body = {
         "query": {
             "bool": {
@@ -90,4 +145,76 @@ def get_query_body(
             }
         ]
     }
+    if consumer is not None:
+        query_body["_source"] = get_source(SOURCE_INCLUDES, consumer)
     return query_body
+
+
+def get_summary_aggregation(
+        size: int = 1000,
+        after: typing.Optional[typing.Dict] = None,
+) -> typing.Dict:
+    """
+    Get composite aggregation of message count and min/max time for each (start time, forecast time).
+
+    **Important**: terms sources require index mapping of ``startTime`` as ``date``
+    and ``forecastTime`` as ``numeric or keyword``, same as ``term`` conditions of ``get_query_body``.
+    Text fields without doc values are rejected by ElasticSearch.
+
+    Parameters
+    ----------
+    size:
+        bucket count of one search request.
+    after:
+        ``after_key`` of previous search response to get next buckets.
+
+    Returns
+    -------
+    typing.Dict
+        ``aggs`` of search body, buckets are in ``summary`` aggregation.
+    """
+    composite = {
+        "size": size,
+        "sources": [
+            {"start_time": {"terms": {"field": "startTime"}}},
+            {"forecast_time": {"terms": {"field": "forecastTime"}}},
+        ],
+    }
+    if after is not None:
+        composite["after"] = after
+    return {
+        "summary": {
+            "composite": composite,
+            "aggs": {
+                "min_time": {"min": {"field": "datetime"}},
+                "max_time": {"max": {"field": "datetime"}},
+            },
+        }
+    }
+
+
+def load_summary(buckets: typing.List[typing.Dict]) -> typing.Dict[str, np.ndarray]:
+    """
+    Get column arrays from buckets of ``summary`` aggregation.
+
+    Parameters
+    ----------
+    buckets:
+        buckets of composite aggregation, see ``get_summary_aggregation``.
+
+    Returns
+    -------
+    typing.Dict[str, np.ndarray]
+        ``start_time``, ``forecast_time``, ``min_time`` and ``max_time`` as int64 nanoseconds,
+        and ``count`` of messages.
+    """
+    return {
+        "start_time": pd.to_datetime([b["key"]["start_time"] for b in buckets], unit="ms", utc=True).asi8,
+        "forecast_time": pd.to_timedelta(
+            np.array([b["key"]["forecast_time"] for b in buckets], dtype=object).astype(np.int64),
+            unit="h",
+        ).asi8,
+        "count": np.array([b["doc_count"] for b in buckets], dtype=np.int64),
+        "min_time": pd.to_datetime([b["min_time"]["value"] for b in buckets], unit="ms", utc=True).asi8,
+        "max_time": pd.to_datetime([b["max_time"]["value"] for b in buckets], unit="ms", utc=True).asi8,
+    }
@@ -9,25 +9,85 @@ from nwpc_message_tool.message import (
     EventStatus,
 )
 from nwpc_message_tool._type import StartTimeType
+from nwpc_message_tool.source._util import get_source
+
+
+# source fields required by each consumer:
+#   message: load_message
+#   table: load_columns
+SOURCE_INCLUDES = {
+    "message": [
+        "type",
+        "time",
+        "data.system",
+        "data.stream",
+        "data.type",
+        "data.name",
+        "data.event",
+        "data.status",
+        "data.start_time",
+        "data.forecast_time",
+    ],
+    "table": [
+        "time",
+        "data.system",
+        "data.stream",
+        "data.type",
+        "data.name",
+        "data.event",
+        "data.status",
+        "data.start_time",
+        "data.forecast_time",
+    ],
+}
 
 
 def load_message(doc: dict) -> ProductionEventMessage:
     data = doc["data"]
     message = ProductionEventMessage(
         message_type=doc["type"],
-        time=pd.Timestamp(doc["time"]),
+        time=doc["time"],
         system=data["system"],
         stream=data["stream"],
         production_type=data["type"],
         production_name=data["name"],
         event=data["event"],
         status=EventStatus(data["status"]),
-        start_time=pd.Timestamp(data["start_time"]),
-        forecast_time=pd.Timedelta(data["forecast_time"]),
+        start_time=data["start_time"],
+        forecast_time=data["forecast_time"],
     )
     return message
 
 
+def load_columns(docs: typing.List[typing.Dict]) -> typing.Dict[str, np.ndarray]:
+    """
+    Get column arrays from dict documents without creating message objects.
+
+    Parameters
+    ----------
+    docs:
+        documents retrieved from ElasticSearch
+
+    Returns
+    -------
+    typing.Dict[str, np.ndarray]
+        message columns, see ``nwpc_message_tool.processor.table_processor.get_message_columns``.
+    """
+    data = [doc["data"] for doc in docs]
+    status_names = {status.value: status.name for status in EventStatus}
+    return {
+        "system": np.array([d["system"] for d in data], dtype=object),
+        "stream": np.array([d["stream"] for d in data], dtype=object),
+        "type": np.array([d["type"] for d in data], dtype=object),
+        "name": np.array([d["name"] for d in data], dtype=object),
+        "event": np.array([d["event"] for d in data], dtype=object),
+        "status": np.array([status_names[d["status"]] for d in data], dtype=object),
+        "start_time": pd.to_datetime([d["start_time"] for d in data], utc=True).asi8,
+        "forecast_time": pd.to_timedelta([d["forecast_time"] for d in data]).asi8,
+        "time": pd.to_datetime([doc["time"] for doc in docs], utc=True).asi8,
+    }
+
+
 def get_index(
         start_time: StartTimeType = None
 ) -> typing.List[str]:
@@ -64,6 +124,8 @@ def get_query_body(
         production_name: str = None,
         start_time: StartTimeType = None,
         forecast_time: str = None,
+        time_after: datetime.datetime = None,
+        consumer: str = None,
 ) -> typing.Dict:
     conditions = [{
         "term": {"data.system": system}
@@ -100,6 +162,15 @@ def get_query_body(
             }
         })
 
+    if time_after is not None:
+        conditions.append({
+            "range": {
+                "time": {
+                    "gte": time_after.isoformat(),
+                }
+            }
+        })
+
     query_body = {
         "query": {
             "bool": {
@@ -112,4 +183,73 @@ def get_query_body(
             }
         ]
     }
+    if consumer is not None:
+        query_body["_source"] = get_source(SOURCE_INCLUDES, consumer)
     return query_body
+
+
+def get_summary_aggregation(
+        size: int = 1000,
+        after: typing.Optional[typing.Dict] = None,
+) -> typing.Dict:
+    """
+    Get composite aggregation of message count and min/max time for each (start time, forecast time).
+
+    **Important**: terms sources require index mapping of ``data.start_time`` as ``date``
+    and ``data.forecast_time`` as ``keyword``, same as ``term`` conditions of ``get_query_body``.
+    Text fields without doc values are rejected by ElasticSearch.
+
+    Parameters
+    ----------
+    size:
+        bucket count of one search request.
+    after:
+        ``after_key`` of previous search response to get next buckets.
+
+    Returns
+    -------
+    typing.Dict
+        ``aggs`` of search body, buckets are in ``summary`` aggregation.
+    """
+    composite = {
+        "size": size,
+        "sources": [
+            {"start_time": {"terms": {"field": "data.start_time"}}},
+            {"forecast_time": {"terms": {"field": "data.forecast_time"}}},
+        ],
+    }
+    if after is not None:
+        composite["after"] = after
+    return {
+        "summary": {
+            "composite": composite,
+            "aggs": {
+                "min_time": {"min": {"field": "time"}},
+                "max_time": {"max": {"field": "time"}},
+            },
+        }
+    }
+
+
+def load_summary(buckets: typing.List[typing.Dict]) -> typing.Dict[str, np.ndarray]:
+    """
+    Get column arrays from buckets of ``summary`` aggregation.
+
+    Parameters
+    ----------
+    buckets:
+        buckets of composite aggregation, see ``get_summary_aggregation``.
+
+    Returns
+    -------
+    typing.Dict[str, np.ndarray]
+        ``start_time``, ``forecast_time``, ``min_time`` and ``max_time`` as int64 nanoseconds,
+        and ``count`` of messages.
+    """
+    return {
+        "start_time": pd.to_datetime([b["key"]["start_time"] for b in buckets], unit="ms", utc=True).asi8,
+        "forecast_time": pd.to_timedelta([b["key"]["forecast_time"] for b in buckets]).asi8,
+        "count": np.array([b["doc_count"] for b in buckets], dtype=np.int64),
+        "min_time": pd.to_datetime([b["min_time"]["value"] for b in buckets], unit="ms", utc=True).asi8,
+        "max_time": pd.to_datetime([b["max_time"]["value"] for b in buckets], unit="ms", utc=True).asi8,
+    }
@@ -1,7 +1,5 @@
 import typing
 
-import pandas as pd
-
 from nwpc_message_tool.message import ProductionStandardTimeMessage
 
 
@@ -9,7 +7,7 @@ def load_message(doc: typing.Dict) -> ProductionStandardTimeMessage:
     data = doc["data"]
     message = ProductionStandardTimeMessage(
         message_type=doc["type"],
-        time=pd.Timestamp(doc["time"]),
+        time=doc["time"],
         system=data["system"],
         stream=data["stream"],
         production_type=data["type"],
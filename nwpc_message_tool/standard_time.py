@@ -0,0 +1,149 @@
+import threading
+import typing
+
+import pandas as pd
+from loguru import logger
+
+import nwpc_message_tool.source.production.nwpc_message.production_standard_time
+from nwpc_message_tool.message import ProductionStandardTimeMessage
+from nwpc_message_tool.storage import EsMessageStorage
+
+
+StandardTimeKey = typing.Tuple[str, str, str, str]
+
+
+class StandardTimeRepository(object):
+    """
+    In-memory cache of production standard time tables keyed by (system, stream, type, name).
+
+    Tables are loaded from ``storage`` on first use, and all loaded tables are refreshed
+    in a background thread every ``refresh_interval`` seconds.
+
+    Attributes
+    ----------
+    storage : EsMessageStorage
+        storage to get standard time messages
+    refresh_interval : float
+        seconds between two refreshes
+    engine
+        source engine for standard time messages
+    """
+    def __init__(
+            self,
+            storage: EsMessageStorage,
+            refresh_interval: float = 3600,
+            engine=nwpc_message_tool.source.production.nwpc_message.production_standard_time,
+    ):
+        self.storage = storage
+        self.refresh_interval = refresh_interval
+        self.engine = engine
+        self._tables: typing.Dict[StandardTimeKey, typing.Optional[pd.DataFrame]] = dict()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def get_table(
+            self,
+            system: str,
+            production_stream: str = "oper",
+            production_type: str = "grib2",
+            production_name: str = "orig",
+    ) -> typing.Optional[pd.DataFrame]:
+        """
+        Get standard time table.
+
+        Returns
+        -------
+        typing.Optional[pd.DataFrame]
+            standard time table indexed by (start_hour, forecast_hour),
+            see ``get_standard_time_table``. ``None`` if there is no standard time message.
+        """
+        key = (system, production_stream, production_type, production_name)
+        with self._lock:
+            if key in self._tables:
+                return self._tables[key]
+
+        table = self._load(key)
+        with self._lock:
+            self._tables[key] = table
+        self._start()
+        return table
+
+    def refresh(self):
+        """
+        Reload all cached tables. Tables which fail to reload are kept.
+        """
+        with self._lock:
+            keys = list(self._tables.keys())
+        for key in keys:
+            try:
+                table = self._load(key)
+            except Exception as e:
+                logger.warning(f"refresh standard time failed for {key}: {e}")
+                continue
+            with self._lock:
+                self._tables[key] = table
+
+    def close(self):
+        """
+        Stop background refresh.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None or self._stopped.is_set():
+                return
+            self._thread = threading.Thread(target=self._run, name="standard-time-refresh", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.refresh_interval):
+            self.refresh()
+
+    def _load(self, key: StandardTimeKey) -> typing.Optional[pd.DataFrame]:
+        system, production_stream, production_type, production_name = key
+        messages = list(self.storage.get_production_standard_time_message(
+            system=system,
+            production_stream=production_stream,
+            production_type=production_type,
+            production_name=production_name,
+            engine=self.engine,
+        ))
+        if len(messages) == 0:
+            return None
+        return get_standard_time_table(messages[0])
+
+
+def get_standard_time_table(message: ProductionStandardTimeMessage) -> pd.DataFrame:
+    """
+    Flatten standard time message into a table.
+
+    Returns
+    -------
+    pd.DataFrame
+        table indexed by (start_hour, forecast_hour) with Timedelta columns ``upper_duration``
+        and ``lower_duration``.
+    """
+    start_hours = []
+    forecast_hours = []
+    upper_durations = []
+    lower_durations = []
+    for item in message.start_hours:
+        for time in item["times"]:
+            start_hours.append(item["start_hour"])
+            forecast_hours.append(time["forecast_hour"])
+            upper_durations.append(time["upper_duration"])
+            lower_durations.append(time["lower_duration"])
+
+    table = pd.DataFrame(
+        {
+            "upper_duration": pd.to_timedelta(upper_durations),
+            "lower_duration": pd.to_timedelta(lower_durations),
+        },
+        index=pd.MultiIndex.from_arrays([start_hours, forecast_hours], names=["start_hour", "forecast_hour"]),
+    )
+    return table.sort_index()
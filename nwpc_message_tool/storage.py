@@ -1,9 +1,17 @@
 import datetime
 import typing
+import heapq
+import queue
+import threading
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 
 from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import RequestError
 import numpy as np
+import pandas as pd
 from loguru import logger
 from tqdm.auto import tqdm
 
@@ -11,6 +19,8 @@ import nwpc_message_tool.source.production.nwpc_message
 import nwpc_message_tool.source.ecflow_client
 from nwpc_message_tool._type import StartTimeType
 from nwpc_message_tool._config import load_config
+from nwpc_message_tool.processor import TableProcessor
+from nwpc_message_tool.processor.table_processor import NANOSECONDS_PER_HOUR, get_table_index
 
 from nwpc_message_tool.message import (
     ProductionEventMessage,
@@ -59,17 +69,411 @@ class MessageStorage(ABC):
         pass
 
 
+MAX_PAGE_SIZE = 2000
+
+
+def get_page_size(
+        total: int,
+        min_size: int = 20,
+        max_size: int = MAX_PAGE_SIZE,
+) -> int:
+    """
+    Get page size for search requests by hit count.
+
+    Small results are fetched in one request, large results use pages of ``max_size``.
+
+    Parameters
+    ----------
+    total :
+        hit count
+    min_size :
+        min page size
+    max_size :
+        max page size
+
+    Returns
+    -------
+    int
+    """
+    return int(min(max(total, min_size), max_size))
+
+
+_END_OF_PAGES = object()
+
+
+class _PageError(object):
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch_pages(
+        pages: typing.Iterator[typing.List[typing.Dict]],
+        count: int,
+) -> typing.Iterator[typing.List[typing.Dict]]:
+    """
+    Fetch pages in a background thread while the consumer processes current page.
+
+    At most ``count`` pages are buffered in a bounded queue, so the background thread waits
+    when the consumer is slow. When the returned generator is closed, the background thread stops
+    and closes ``pages`` in that thread, which releases search contexts of the sessions.
+    Errors raised by ``pages`` are raised again in the consumer.
+
+    Parameters
+    ----------
+    pages :
+        page generator, such as ``SearchSession.pages()``.
+    count :
+        max count of pages fetched ahead.
+
+    Returns
+    -------
+    typing.Iterator[typing.List[typing.Dict]]
+    """
+    buffer = queue.Queue(maxsize=count)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for page in pages:
+                if not put(page):
+                    break
+            else:
+                put(_END_OF_PAGES)
+        except BaseException as error:
+            put(_PageError(error))
+        finally:
+            if hasattr(pages, "close"):
+                pages.close()
+
+    thread = threading.Thread(target=produce, name="prefetch-pages", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END_OF_PAGES:
+                break
+            if isinstance(item, _PageError):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
+
+
+class BaseSearchSession(object):
+    """
+    Page state of paginated search on one index, shared by ``SearchSession`` and ``AsyncSearchSession``.
+
+    Attributes
+    ----------
+    size : typing.Optional[int]
+        page size, ``None`` means ``get_page_size`` from hit count of the first page,
+        which is requested with ``MAX_PAGE_SIZE``.
+    total : typing.Optional[int]
+        hit count, available after first page.
+    fetched : int
+        count of fetched hits.
+    finished : bool
+        whether all pages are fetched.
+    """
+    def __init__(
+            self,
+            client,
+            index: str,
+            query_body: typing.Dict,
+            size: typing.Optional[int] = None,
+    ):
+        self.client = client
+        self.index = index
+        self.query_body = query_body
+        self.size = size
+        self.total = None
+        self.fetched = 0
+        self.finished = False
+
+    def _get_request_size(self) -> int:
+        if self.size is None:
+            return MAX_PAGE_SIZE
+        return self.size
+
+    def _receive_page(
+            self,
+            hits: typing.List[typing.Dict],
+            total: typing.Optional[int],
+            request_size: int,
+    ):
+        """
+        Update page state after a page of ``request_size`` is received.
+        """
+        if self.total is None:
+            self.total = total
+            if self.size is None:
+                self.size = get_page_size(total)
+        self.fetched += len(hits)
+        if len(hits) < request_size or self.fetched >= self.total:
+            self.finished = True
+
+
+def get_scroll_search_body(
+        query_body: typing.Dict,
+        size: int,
+) -> typing.Dict:
+    """
+    Get body of the first request of scroll search.
+    """
+    return {
+        "size": size,
+        **query_body,
+    }
+
+
+def get_point_in_time_search_body(
+        query_body: typing.Dict,
+        size: int,
+        pit_id: str,
+        keep_alive: str,
+        search_after: typing.Optional[typing.List] = None,
+) -> typing.Dict:
+    """
+    Get body of one request of point in time search.
+
+    ``_shard_doc`` is appended to sort fields as a tiebreaker,
+    and hit count is only tracked in the first request.
+    """
+    search_body = {
+        "size": size,
+        **query_body,
+        "sort": query_body.get("sort", []) + [{"_shard_doc": "asc"}],
+        "pit": {
+            "id": pit_id,
+            "keep_alive": keep_alive,
+        },
+        "track_total_hits": search_after is None,
+    }
+    if search_after is not None:
+        search_body["search_after"] = search_after
+    return search_body
+
+
+def get_hits_total(res: typing.Dict) -> typing.Optional[int]:
+    """
+    Get hit count from search response, ``None`` if it is not tracked.
+    """
+    total = res["hits"].get("total")
+    if total is None:
+        return None
+    return total["value"]
+
+
+class SearchSession(BaseSearchSession, ABC):
+    """
+    Paginated search on one index, which releases its search context on the server when closed.
+
+    Use as a context manager or call ``close()`` to release the context even if
+    pages are not fully consumed. See ``BaseSearchSession`` for attributes.
+    """
+    def __init__(
+            self,
+            client: Elasticsearch,
+            index: str,
+            query_body: typing.Dict,
+            size: typing.Optional[int] = None,
+    ):
+        super(SearchSession, self).__init__(
+            client=client,
+            index=index,
+            query_body=query_body,
+            size=size,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def pages(self) -> typing.Iterable[typing.List[typing.Dict]]:
+        """
+        Yield hits of each page, and close the session when exits.
+        """
+        try:
+            while not self.finished:
+                hits = self.next_page()
+                if len(hits) > 0:
+                    yield hits
+        finally:
+            self.close()
+
+    def next_page(self) -> typing.List[typing.Dict]:
+        request_size = self._get_request_size()
+        hits, total = self._search(request_size)
+        self._receive_page(hits, total, request_size)
+        if self.finished:
+            self.close()
+        return hits
+
+    @abstractmethod
+    def _search(self, size: int) -> typing.Tuple[typing.List[typing.Dict], typing.Optional[int]]:
+        """
+        Request next page.
+
+        Returns
+        -------
+        typing.Tuple[typing.List[typing.Dict], typing.Optional[int]]
+            hits and hit count, which may be ``None`` after the first page.
+        """
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class ScrollSession(SearchSession):
+    """
+    Search session using scroll API.
+    """
+    def __init__(
+            self,
+            client: Elasticsearch,
+            index: str,
+            query_body: typing.Dict,
+            size: typing.Optional[int] = None,
+            scroll: str = "1m",
+    ):
+        super(ScrollSession, self).__init__(
+            client=client,
+            index=index,
+            query_body=query_body,
+            size=size,
+        )
+        self.scroll = scroll
+        self.scroll_id = None
+        self._started = False
+
+    def _search(self, size: int) -> typing.Tuple[typing.List[typing.Dict], typing.Optional[int]]:
+        if not self._started:
+            self._started = True
+            res = self.client.search(
+                index=self.index,
+                body=get_scroll_search_body(self.query_body, size),
+                scroll=self.scroll,
+            )
+        else:
+            res = self.client.scroll(
+                scroll=self.scroll,
+                scroll_id=self.scroll_id,
+            )
+        self.scroll_id = res["_scroll_id"]
+        return res["hits"]["hits"], get_hits_total(res)
+
+    def close(self):
+        if self.scroll_id is not None:
+            scroll_id = self.scroll_id
+            self.scroll_id = None
+            self.client.clear_scroll(scroll_id=scroll_id)
+
+
+class PointInTimeSession(SearchSession):
+    """
+    Search session using point in time and ``search_after``, cheaper than scroll on the cluster.
+
+    See ``get_point_in_time_search_body`` for request body.
+    """
+    def __init__(
+            self,
+            client: Elasticsearch,
+            index: str,
+            query_body: typing.Dict,
+            size: typing.Optional[int] = None,
+            keep_alive: str = "1m",
+    ):
+        super(PointInTimeSession, self).__init__(
+            client=client,
+            index=index,
+            query_body=query_body,
+            size=size,
+        )
+        self.keep_alive = keep_alive
+        self.pit_id = None
+        self.search_after = None
+
+    def _search(self, size: int) -> typing.Tuple[typing.List[typing.Dict], typing.Optional[int]]:
+        if self.pit_id is None:
+            self.pit_id = self.client.open_point_in_time(
+                index=self.index,
+                keep_alive=self.keep_alive,
+            )["id"]
+
+        res = self.client.search(body=get_point_in_time_search_body(
+            self.query_body,
+            size,
+            pit_id=self.pit_id,
+            keep_alive=self.keep_alive,
+            search_after=self.search_after,
+        ))
+        self.pit_id = res.get("pit_id", self.pit_id)
+
+        hits = res["hits"]["hits"]
+        if len(hits) > 0:
+            self.search_after = hits[-1]["sort"]
+        return hits, get_hits_total(res)
+
+    def close(self):
+        if self.pit_id is not None:
+            pit_id = self.pit_id
+            self.pit_id = None
+            self.client.close_point_in_time(body={"id": pit_id})
+
+
 class EsMessageStorage(MessageStorage):
     def __init__(
             self,
             hosts: typing.List,
             debug: bool = True,
             show_progress: bool = False,
+            max_in_flight: int = 4,
+            prefetch: int = 0,
+            client_options: typing.Optional[typing.Dict] = None,
     ):
+        """
+        Parameters
+        ----------
+        hosts :
+            ElasticSearch hosts
+        debug :
+            print debug messages
+        show_progress :
+            show progress bar
+        max_in_flight :
+            max count of concurrent search requests in concurrent mode.
+        prefetch :
+            count of pages fetched ahead in a background thread in sequential mode, see ``prefetch_pages``.
+            Default is 0, which means next page is requested after current page is consumed.
+        client_options :
+            options of ``Elasticsearch`` client, such as:
+
+            - ``maxsize``: max connection count kept alive to each host, default is 10.
+            - ``timeout``: request timeout in seconds.
+            - ``max_retries``, ``retry_on_timeout``: retry settings of failed requests.
+        """
         super(EsMessageStorage, self).__init__()
-        self.client = Elasticsearch(hosts=hosts)
+        if client_options is None:
+            client_options = dict()
+        self.client = Elasticsearch(hosts=hosts, **client_options)
         self.debug: bool = debug
         self.show_progress: bool = show_progress
+        self.max_in_flight: int = max_in_flight
+        self.prefetch: int = prefetch
 
     def get_production_messages(
             self,
@@ -80,7 +484,10 @@ class EsMessageStorage(MessageStorage):
             start_time: StartTimeType = None,
             forecast_time: str = None,
             engine = None,
-            size: int = 20,
+            size: typing.Optional[int] = None,
+            concurrent: bool = False,
+            slices: int = 1,
+            pagination: str = "scroll",
     ) -> typing.Iterable[ProductionEventMessage]:
         """
         Get production messages from ElasticSearch.
@@ -134,6 +541,17 @@ class EsMessageStorage(MessageStorage):
             source engine
         size :
             messages count for one search request to ElasticSearch.
+            Default is ``None``, which means page size is chosen by hit count (see ``get_page_size``).
+        concurrent :
+            search all indexes concurrently and merge results in ``time`` order.
+            At most ``max_in_flight`` requests are sent at the same time.
+        slices :
+            sliced scroll count for each index, only used when ``concurrent`` is True.
+        pagination :
+            pagination method for each index:
+
+            - ``scroll``: scroll API
+            - ``search_after``: point in time with ``search_after``, cheaper than scroll.
 
         Returns
         -------
@@ -143,6 +561,192 @@ class EsMessageStorage(MessageStorage):
         if engine is None:
             engine = nwpc_message_tool.source.production.nwpc_message.production
 
+        for hits in self._get_production_pages(
+            system=system,
+            production_type=production_type,
+            production_stream=production_stream,
+            production_name=production_name,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            engine=engine,
+            size=size,
+            concurrent=concurrent,
+            slices=slices,
+            pagination=pagination,
+            consumer="message",
+        ):
+            for hit in hits:
+                yield engine.load_message(hit["_source"])
+
+    def get_production_table(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            start_time: StartTimeType = None,
+            forecast_time: str = None,
+            engine = None,
+            size: typing.Optional[int] = None,
+            processor: TableProcessor = None,
+            concurrent: bool = False,
+            slices: int = 1,
+            pagination: str = "scroll",
+    ) -> pd.DataFrame:
+        """
+        Get production message table from ElasticSearch.
+
+        Hits of each search page are converted into column arrays by ``engine.load_columns``
+        without creating ``ProductionEventMessage`` objects.
+
+        Examples
+        --------
+
+        >>> import pandas as pd
+        >>> from nwpc_message_tool import EsMessageStorage
+        >>> storage = EsMessageStorage(
+        ...    hosts=["localhost:9200"]
+        ... )
+        >>> table = storage.get_production_table(
+        ...     system="grapes_gfs_gmf",
+        ...     production_stream="oper",
+        ...     production_type="grib2",
+        ...     production_name="orig",
+        ...     start_time=pd.to_datetime("2021-04-01 00:00"),
+        ...     forecast_time="240h"
+        ... )
+        >>> table["time"]
+        2021040100+240   2021-04-01 05:21:05+00:00
+        Name: time, dtype: datetime64[ns, UTC]
+
+        Parameters
+        ----------
+        system :
+            system which generates the product, same as ``get_production_messages``.
+        production_type :
+            type of production, such as "grib2"
+        production_stream :
+            stream of production, such as "oper"
+        production_name :
+            name of production, such as "orig"
+        start_time :
+            start time of cycle, same as ``get_production_messages``.
+        forecast_time :
+            forecast time for production
+        engine :
+            source engine
+        size :
+            messages count for one search request to ElasticSearch.
+        processor :
+            processor to build the table, default is ``TableProcessor()``.
+        concurrent :
+            search all indexes concurrently, same as ``get_production_messages``.
+        slices :
+            sliced scroll count for each index, same as ``get_production_messages``.
+        pagination :
+            pagination method for each index, same as ``get_production_messages``.
+
+        Returns
+        -------
+        pd.DataFrame
+            production message table, see ``TableProcessor.process_columns``.
+        """
+        if processor is None:
+            processor = TableProcessor()
+
+        columns = self.get_production_columns(
+            system=system,
+            production_type=production_type,
+            production_stream=production_stream,
+            production_name=production_name,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            engine=engine,
+            size=size,
+            concurrent=concurrent,
+            slices=slices,
+            pagination=pagination,
+        )
+        return processor.process_columns(columns)
+
+    def get_production_columns(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            start_time: StartTimeType = None,
+            forecast_time: str = None,
+            engine = None,
+            size: typing.Optional[int] = None,
+            concurrent: bool = False,
+            slices: int = 1,
+            pagination: str = "scroll",
+            time_after: pd.Timestamp = None,
+    ) -> typing.Dict[str, np.ndarray]:
+        """
+        Get production message columns from ElasticSearch.
+
+        Parameters are same as ``get_production_table``, except:
+
+        Parameters
+        ----------
+        time_after :
+            only get messages whose time is not earlier than this time.
+
+        Returns
+        -------
+        typing.Dict[str, np.ndarray]
+            message columns, see ``nwpc_message_tool.processor.table_processor.get_message_columns``.
+        """
+        if engine is None:
+            engine = nwpc_message_tool.source.production.nwpc_message.production
+
+        pages = []
+        for hits in self._get_production_pages(
+            system=system,
+            production_type=production_type,
+            production_stream=production_stream,
+            production_name=production_name,
+            start_time=start_time,
+            forecast_time=forecast_time,
+            engine=engine,
+            size=size,
+            concurrent=concurrent,
+            slices=slices,
+            pagination=pagination,
+            time_after=time_after,
+            consumer="table",
+        ):
+            pages.append(engine.load_columns([hit["_source"] for hit in hits]))
+
+        if len(pages) == 0:
+            pages.append(engine.load_columns([]))
+        return {
+            key: np.concatenate([page[key] for page in pages])
+            for key in pages[0]
+        }
+
+    def _get_production_pages(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            start_time: StartTimeType = None,
+            forecast_time: str = None,
+            engine = None,
+            size: typing.Optional[int] = None,
+            concurrent: bool = False,
+            slices: int = 1,
+            pagination: str = "scroll",
+            time_after: pd.Timestamp = None,
+            consumer: str = None,
+    ) -> typing.Iterable[typing.List[typing.Dict]]:
+        """
+        Search production messages and yield hits of each search page.
+        Only source fields required by ``consumer`` are returned, see ``SOURCE_INCLUDES`` of engine.
+        """
         query_body = engine.get_query_body(
             system=system,
             production_stream=production_stream,
@@ -150,62 +754,285 @@ class EsMessageStorage(MessageStorage):
             production_name=production_name,
             start_time=start_time,
             forecast_time=forecast_time,
+            time_after=time_after,
+            consumer=consumer,
         )
 
+        indexes = engine.get_index(start_time)
+        indexes = sorted(set(indexes))
+
+        if concurrent:
+            sessions = []
+            for index in indexes:
+                for slice_id in range(slices):
+                    body = dict(query_body)
+                    if slices > 1:
+                        body["slice"] = {"id": slice_id, "max": slices}
+                    sessions.append(self._create_session(index, body, size, pagination))
+            yield from self._get_concurrent_pages(sessions, system=system)
+            return
+
+        sessions = [self._create_session(index, query_body, size, pagination) for index in indexes]
         pbar = None
-        scroll = "1m"
-        scroll_id = None
+        if self.show_progress:
+            pbar = tqdm(total=0)
 
-        indexes = engine.get_index(start_time)
-        indexes = set(indexes)
-
-        for index in indexes:
-            search_from = 0
-            total = np.iinfo(np.int16).max
-
-            while search_from < total:
-                if search_from == 0:
-                    res = self._get_result(
-                        index=index,
-                        query_body=query_body,
-                        search_from=search_from,
-                        search_size=size,
-                        scroll=scroll,
-                    )
-                    current_total = res['hits']['total']['value']
-                    scroll_id = res["_scroll_id"]
-                    total = current_total
-                    logger.info(f"[{system}] found results: {total}")
-                    if self.show_progress:
-                        pbar = tqdm(total=total)
-                else:
-                    res = self._get_result_scroll(
-                        scroll=scroll,
-                        scroll_id=scroll_id,
-                    )
-
-                search_from += len(res['hits']['hits'])
-                current_count = len(res["hits"]["hits"])
+        def get_pages():
+            for session in sessions:
+                for hits in session.pages():
+                    if session.fetched == len(hits):
+                        logger.info(f"[{system}] found results in {session.index}: {session.total}")
+                        if pbar is not None:
+                            pbar.total += session.total
+                            pbar.refresh()
+                    if pbar is not None:
+                        pbar.update(len(hits))
+                    yield hits
+
+        try:
+            with closing(self._prefetch_pages(get_pages())) as pages:
+                yield from pages
+        finally:
+            for session in sessions:
+                session.close()
+            if pbar is not None:
+                pbar.close()
+
+    def _prefetch_pages(
+            self,
+            pages: typing.Iterator[typing.List[typing.Dict]],
+    ) -> typing.Iterator[typing.List[typing.Dict]]:
+        if self.prefetch > 0:
+            return prefetch_pages(pages, self.prefetch)
+        return pages
+
+    def _create_session(
+            self,
+            index: str,
+            query_body: typing.Dict,
+            size: typing.Optional[int] = None,
+            pagination: str = "scroll",
+    ) -> SearchSession:
+        if pagination == "scroll":
+            return ScrollSession(self.client, index, query_body, size=size)
+        elif pagination == "search_after":
+            return PointInTimeSession(self.client, index, query_body, size=size)
+        else:
+            raise ValueError(f"pagination is not supported: {pagination}")
+
+    def _get_concurrent_pages(
+            self,
+            sessions: typing.List[SearchSession],
+            system: str = None,
+    ) -> typing.Iterable[typing.List[typing.Dict]]:
+        """
+        Fetch pages of all sessions in a thread pool and merge hits by sort values.
+
+        Each session has at most one pending request, and its next page is requested
+        as soon as current page is received. The thread pool limits requests in flight to
+        ``max_in_flight``.
+        """
+        pbar = None
+        if self.show_progress:
+            pbar = tqdm(total=0)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        futures = {}
+        buffers = {}
+        heap = []
+
+        def receive(session_id: int):
+            session = sessions[session_id]
+            hits = futures.pop(session_id).result()
+            if session.fetched == len(hits):
+                logger.info(f"[{system}] found results in {session.index}: {session.total}")
                 if pbar is not None:
-                    pbar.update(current_count)
-                for hit in res['hits']['hits']:
-                    yield engine.load_message(hit["_source"])
+                    pbar.total += session.total
+                    pbar.refresh()
+            if pbar is not None:
+                pbar.update(len(hits))
 
-        if pbar is not None:
-            pbar.close()
+            if not session.finished:
+                futures[session_id] = executor.submit(session.next_page)
+            if len(hits) > 0:
+                buffers[session_id] = deque(hits)
+                heapq.heappush(heap, (hits[0].get("sort", []), session_id))
 
-        if scroll_id is not None:
-            self.client.clear_scroll(scroll_id=scroll_id)
+        try:
+            for session_id, session in enumerate(sessions):
+                futures[session_id] = executor.submit(session.next_page)
+            for session_id in range(len(sessions)):
+                receive(session_id)
+
+            page_size = max([session.size for session in sessions], default=0)
+            page = []
+            while heap:
+                _, session_id = heapq.heappop(heap)
+                buffer = buffers[session_id]
+                page.append(buffer.popleft())
+                if len(buffer) > 0:
+                    heapq.heappush(heap, (buffer[0].get("sort", []), session_id))
+                elif session_id in futures:
+                    receive(session_id)
+
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+            if len(page) > 0:
+                yield page
+        finally:
+            for future in futures.values():
+                future.cancel()
+            executor.shutdown(wait=True)
+            for session in sessions:
+                session.close()
+            if pbar is not None:
+                pbar.close()
+
+    def get_production_summary(
+            self,
+            system: str,
+            production_type: str = None,
+            production_stream: str = None,
+            production_name: str = None,
+            start_time: StartTimeType = None,
+            forecast_time: str = None,
+            engine = None,
+            size: int = 1000,
+    ) -> pd.DataFrame:
+        """
+        Get message count and min/max time of production for each cycle and forecast hour.
+
+        Messages are aggregated inside ElasticSearch by a composite aggregation
+        (see ``get_summary_aggregation`` of engine), so only one bucket for each
+        (start time, forecast time) is transferred.
+        The aggregation requires keyword or date mappings of start time and forecast time fields,
+        ``ValueError`` is raised if ElasticSearch rejects it.
+
+        Examples
+        --------
+
+        >>> import pandas as pd
+        >>> from nwpc_message_tool import EsMessageStorage
+        >>> storage = EsMessageStorage(
+        ...    hosts=["localhost:9200"]
+        ... )
+        >>> summary = storage.get_production_summary(
+        ...     system="grapes_gfs_gmf",
+        ...     production_stream="oper",
+        ...     production_type="grib2",
+        ...     production_name="orig",
+        ...     start_time=(pd.to_datetime("2021-04-01 00:00"), pd.to_datetime("2021-04-01 23:00")),
+        ... )
+        >>> summary.loc["2021040100+240"]
+        start_time       2021-04-01 00:00:00+00:00
+        forecast_hour                          240
+        count                                    1
+        min_time         2021-04-01 05:21:04.590000+00:00
+        max_time         2021-04-01 05:21:04.590000+00:00
+        Name: 2021040100+240, dtype: object
+
+        Parameters
+        ----------
+        system :
+            system which generates the product, same as ``get_production_messages``.
+        production_type :
+            type of production, such as "grib2"
+        production_stream :
+            stream of production, such as "oper"
+        production_name :
+            name of production, such as "orig"
+        start_time :
+            start time of cycle, same as ``get_production_messages``.
+        forecast_time :
+            forecast time for production
+        engine :
+            source engine
+        size :
+            bucket count for one search request to ElasticSearch.
+
+        Returns
+        -------
+        pd.DataFrame
+            summary table indexed by ``YYYYMMDDHH+FFF`` with columns:
+
+            - ``start_time``
+            - ``forecast_hour``
+            - ``count``: message count
+            - ``min_time``: time of first message, UTC datetime with millisecond precision
+            - ``max_time``: time of last message, UTC datetime with millisecond precision
+        """
+        if engine is None:
+            engine = nwpc_message_tool.source.production.nwpc_message.production
+
+        query_body = engine.get_query_body(
+            system=system,
+            production_stream=production_stream,
+            production_type=production_type,
+            production_name=production_name,
+            start_time=start_time,
+            forecast_time=forecast_time,
+        )
+        query_body.pop("sort", None)
+        index = ",".join(sorted(set(engine.get_index(start_time))))
+
+        pages = []
+        after = None
+        while True:
+            search_body = {
+                "size": 0,
+                "aggs": engine.get_summary_aggregation(size=size, after=after),
+            }
+            search_body.update(**query_body)
+            try:
+                res = self.client.search(
+                    index=index,
+                    body=search_body,
+                    ignore_unavailable=True,
+                )
+            except RequestError as error:
+                raise ValueError(
+                    f"summary aggregation is not supported by mapping of index {index}: {error}"
+                ) from error
+            aggregation = res["aggregations"]["summary"]
+            buckets = aggregation["buckets"]
+            pages.append(engine.load_summary(buckets))
+            after = aggregation.get("after_key")
+            if after is None or len(buckets) < size:
+                break
+
+        if self.debug:
+            logger.info(f"[{system}] found buckets: {sum(len(page['count']) for page in pages)}")
+
+        columns = {
+            key: np.concatenate([page[key] for page in pages])
+            for key in pages[0]
+        }
+        forecast_hour = np.floor_divide(columns["forecast_time"], NANOSECONDS_PER_HOUR).astype(np.int16)
+        df = pd.DataFrame(
+            {
+                "start_time": pd.to_datetime(columns["start_time"], utc=True),
+                "forecast_hour": forecast_hour,
+                "count": columns["count"],
+                "min_time": pd.to_datetime(columns["min_time"], utc=True),
+                "max_time": pd.to_datetime(columns["max_time"], utc=True),
+            },
+            index=get_table_index(columns["start_time"], forecast_hour),
+        )
+        return df.sort_index(kind="mergesort")
 
     def get_ecflow_client_messages(
             self,
-            node_name: str,
+            node_name: typing.Union[str, typing.List[str]] = None,
             ecflow_host: str = None,
             ecflow_port: str = None,
             ecf_date: StartTimeType = None,
             index_ecf_date: StartTimeType = None,
             engine = None,
-            size: int = 20,
+            size: typing.Optional[int] = None,
+            pagination: str = "search_after",
+            node_path_prefix: str = None,
+            consumer: str = "message",
     ) -> typing.Iterable[EcflowClientMessage]:
         """
         Get ecflow client command messages from ElasticSearch.
@@ -227,10 +1054,19 @@ class EsMessageStorage(MessageStorage):
         >>> len(list(results))
         10
 
+        Search all tasks under a family in one query,
+        and calculate situations of them with ``SituationCalculator.get_situations_for_nodes``.
+
+        >>> results = storage.get_ecflow_client_messages(
+        ...     node_path_prefix="/grapes_meso_3km_v5_0/cold/00/model/",
+        ...     ecf_date=pd.to_datetime("2021-04-01")
+        ... )
+
         Parameters
         ----------
         node_name:
-            node path, variable ``ECF_NAME`` in ecFlow. such as "/grapes_meso_3km_v5_0/cold/00/model/fcst"
+            node path, variable ``ECF_NAME`` in ecFlow. such as "/grapes_meso_3km_v5_0/cold/00/model/fcst".
+            A list of node paths searches messages of all these nodes in one query.
         ecflow_host:
             ecflow server host, such as "login_b01"
         ecflow_port:
@@ -243,7 +1079,18 @@ class EsMessageStorage(MessageStorage):
         engine:
             source engine:
         size:
-             messages count for one search request to ElasticSearch.
+            messages count for one search request to ElasticSearch.
+            Default is ``None``, which means page size is chosen by hit count (see ``get_page_size``).
+        pagination:
+            pagination method, ``search_after`` (default) or ``scroll``.
+            ``search_after`` pages with a point in time sorted by ``time`` and ``_shard_doc``,
+            so each page costs the same and results are not limited by ``index.max_result_window``.
+        node_path_prefix:
+            prefix of node path, such as "/grapes_meso_3km_v5_0/cold/00/model/", to search all nodes under it.
+        consumer:
+            consumer of messages, which decides source fields returned by ElasticSearch,
+            see ``SOURCE_INCLUDES`` of engine.
+            Use ``situation`` for ``SituationCalculator`` to skip ``args`` and ``envs``.
 
         Returns
         -------
@@ -261,40 +1108,32 @@ class EsMessageStorage(MessageStorage):
             ecflow_host=ecflow_host,
             ecflow_port=ecflow_port,
             ecf_date=ecf_date,
+            node_path_prefix=node_path_prefix,
+            consumer=consumer,
         )
 
-        search_from = 0
-        total = np.iinfo(np.int16).max
-        pbar = None
-
         indexes = engine.get_index(index_ecf_date)
         index = ",".join(indexes)
 
-        search_from = 0
-        total = np.iinfo(np.int16).max
-        while search_from < total:
-            res = self._get_result(
-                index=index,
-                query_body=query_body,
-                search_from=search_from,
-                search_size=size,
-            )
-            current_total = res['hits']['total']['value']
-            if current_total < total:
-                total = current_total
-                if self.debug:
-                    logger.info(f"found results: {total}")
-                if self.show_progress:
-                    pbar = tqdm(total=total)
-            search_from += len(res['hits']['hits'])
-            current_count = len(res["hits"]["hits"])
+        pbar = None
+        first_page = True
+        try:
+            with self._create_session(index, query_body, size, pagination) as session, \
+                    closing(self._prefetch_pages(session.pages())) as pages:
+                for hits in pages:
+                    if first_page:
+                        first_page = False
+                        if self.debug:
+                            logger.info(f"found results: {session.total}")
+                        if self.show_progress:
+                            pbar = tqdm(total=session.total)
+                    if pbar is not None:
+                        pbar.update(len(hits))
+                    for hit in hits:
+                        yield engine.load_message(hit["_source"])
+        finally:
             if pbar is not None:
-                pbar.update(current_count)
-            for hit in res['hits']['hits']:
-                yield engine.load_message(hit["_source"])
-
-        if pbar is not None:
-            pbar.close()
+                pbar.close()
 
     def _get_result(
             self,
@@ -318,17 +1157,6 @@ class EsMessageStorage(MessageStorage):
         )
         return res
 
-    def _get_result_scroll(
-            self,
-            scroll: str,
-            scroll_id: str,
-    ) -> typing.Dict:
-        res = self.client.scroll(
-            scroll=scroll,
-            scroll_id=scroll_id
-        )
-        return res
-
     def save_production_standard_time_message(
             self,
             system: str,
@@ -442,6 +1270,8 @@ def get_es_message_storage(
 
     Default config locates in ``${USER}/.config/nwpc-oper/nwpc-message-tool.yaml``
 
+    Client options are read from ``client`` key of the storage, see ``EsMessageStorage``.
+
     Parameters
     ----------
     storage_name :
@@ -454,14 +1284,80 @@ def get_es_message_storage(
     -------
     EsMessageStorage
     """
-    config = load_config(config_file)
-    storage_map = config["storage"]
-    if storage_name is None:
-        storage_name = config["default_storage"]
-    storage_record = storage_map[storage_name]
+    storage_name, storage_record = _get_storage_record(storage_name, config_file)
 
     hosts = storage_record["auth"]["hosts"]
+    kwargs.setdefault("client_options", storage_record.get("client", None))
     return EsMessageStorage(
         hosts=hosts,
         **kwargs
     )
+
+
+_shared_storages: typing.Dict[typing.Tuple, EsMessageStorage] = dict()
+_shared_storages_lock = threading.Lock()
+
+
+def get_shared_es_message_storage(
+        storage_name: str = None,
+        hosts: typing.List = None,
+        config_file=None,
+        **kwargs
+) -> EsMessageStorage:
+    """
+    Get EsMessageStorage shared in current process, so connections of its client are reused.
+
+    Storages are keyed by ``hosts`` if set, otherwise by storage name in config file.
+    The storage is created by the first call of each key, and ``kwargs`` of later calls are ignored.
+
+    Parameters
+    ----------
+    storage_name :
+        storage name in config file, see ``get_es_message_storage``.
+    hosts :
+        ElasticSearch hosts, config file is not used if set.
+    config_file :
+        config file path
+    kwargs
+        arguments for ``EsMessageStorage``, such as ``client_options``.
+
+    Returns
+    -------
+    EsMessageStorage
+    """
+    if hosts is not None:
+        key = ("hosts", tuple(hosts))
+    else:
+        storage_name, _ = _get_storage_record(storage_name, config_file)
+        key = ("storage", storage_name)
+
+    with _shared_storages_lock:
+        storage = _shared_storages.get(key)
+        if storage is None:
+            if hosts is not None:
+                storage = EsMessageStorage(hosts=hosts, **kwargs)
+            else:
+                storage = get_es_message_storage(storage_name, config_file=config_file, **kwargs)
+            _shared_storages[key] = storage
+        return storage
+
+
+def close_shared_es_message_storages():
+    """
+    Close clients of all shared storages and remove them.
+    """
+    with _shared_storages_lock:
+        for storage in _shared_storages.values():
+            storage.client.close()
+        _shared_storages.clear()
+
+
+def _get_storage_record(
+        storage_name: str = None,
+        config_file=None,
+) -> typing.Tuple[str, typing.Dict]:
+    config = load_config(config_file)
+    storage_map = config["storage"]
+    if storage_name is None:
+        storage_name = config["default_storage"]
+    return storage_name, storage_map[storage_name]
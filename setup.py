@@ -45,7 +45,7 @@ setup(
         "pyyaml",
         "loguru",
         "click",
-        "pandas",
+        "pandas>=1.4",
         "scipy",
         "tqdm",
         "elasticsearch",
@@ -57,6 +57,8 @@ setup(
 
     extras_require={
         'test': ['pytest'],
+        'cache': ['pyarrow'],
+        'async': ['elasticsearch[async]'],
         'cov': ['pytest-cov', 'codecov']
     },
 
@@ -0,0 +1,102 @@
+import pandas as pd
+
+from nwpc_message_tool.message.ecflow_client import EcflowClientMessage
+from nwpc_message_tool.message.ecflow_client_batch import EcflowClientMessageBatch
+from nwpc_message_tool.analytics.calculator import SituationCalculator
+from nwpc_message_tool.analytics.situation_type import TaskSituationType
+from nwpc_message_tool.analytics.task_status_change_dfa import TaskStatusChangeDFA
+from nwpc_message_tool.analytics.task_status_change_fast_dfa import TaskStatusChangeFastDFA
+
+
+NODE_PATH = "/grapes_gfs_gmf/gmf_00/model/fcst"
+
+
+def _get_record(date: str, minutes: int, command: str, node_path: str = NODE_PATH) -> EcflowClientMessage:
+    return EcflowClientMessage(
+        message_type="ecflow_client",
+        time=pd.Timestamp(date, tz="UTC") + pd.Timedelta(minutes=minutes),
+        command=command,
+        node_name=node_path,
+        try_no="1",
+        ecf_date=date,
+    )
+
+
+def test_get_situations():
+    records = [
+        _get_record("20210402", 10, "submit"),
+        _get_record("20210401", 10, "submit"),
+        _get_record("20210401", 11, "init", node_path="/grapes_gfs_gmf/gmf_00/model"),
+        _get_record("20210401", 11, "init"),
+        _get_record("20210402", 11, "init"),
+        _get_record("20210401", 120, "complete"),
+    ]
+    calculator = SituationCalculator(
+        dfa_engine=TaskStatusChangeDFA,
+        stop_states=(TaskSituationType.Complete, TaskSituationType.Error, TaskSituationType.Unknown),
+    )
+    situations = calculator.get_situations(
+        records=records,
+        node_path=NODE_PATH,
+        start_date=pd.Timestamp("2021-04-01", tz="UTC"),
+        end_date=pd.Timestamp("2021-04-04", tz="UTC"),
+    )
+    assert [s.state for s in situations] == [
+        TaskSituationType.Complete,
+        TaskSituationType.Active,
+        TaskSituationType.Initial,
+    ]
+    assert situations[0].records == [records[1], records[3], records[5]]
+    assert situations[2].records == []
+
+    batch_situations = calculator.get_situations(
+        records=EcflowClientMessageBatch.from_messages(records),
+        node_path=NODE_PATH,
+        start_date=pd.Timestamp("2021-04-01", tz="UTC"),
+        end_date=pd.Timestamp("2021-04-04", tz="UTC"),
+    )
+    assert [s.state for s in batch_situations] == [s.state for s in situations]
+    assert len(batch_situations[0].records) == 3
+    for batch_situation, situation in zip(batch_situations, situations):
+        assert batch_situation.node_situation.time_points == situation.node_situation.time_points
+        assert [
+            (p.period_type, p.start_time, p.end_time) for p in batch_situation.node_situation.time_periods
+        ] == [
+            (p.period_type, p.start_time, p.end_time) for p in situation.node_situation.time_periods
+        ]
+
+
+def test_get_situations_for_nodes():
+    other_node_path = "/grapes_gfs_gmf/gmf_00/model/post"
+    records = [
+        _get_record("20210401", 10, "submit"),
+        _get_record("20210401", 12, "submit", node_path=other_node_path),
+        _get_record("20210401", 11, "init"),
+        _get_record("20210401", 120, "complete"),
+        _get_record("20210401", 13, "init", node_path=other_node_path),
+        _get_record("20210401", 14, "abort", node_path=other_node_path),
+        _get_record("20210402", 10, "submit"),
+    ]
+    calculator = SituationCalculator(
+        dfa_engine=TaskStatusChangeFastDFA,
+        stop_states=(TaskSituationType.Complete, TaskSituationType.Error, TaskSituationType.Unknown),
+    )
+    for jobs, input_records in (
+            (1, records),
+            (2, records),
+            (1, EcflowClientMessageBatch.from_messages(records)),
+            (2, EcflowClientMessageBatch.from_messages(records)),
+    ):
+        df = calculator.get_situations_for_nodes(
+            records=input_records,
+            node_paths=[NODE_PATH, other_node_path],
+            start_date=pd.Timestamp("2021-04-01", tz="UTC"),
+            end_date=pd.Timestamp("2021-04-03", tz="UTC"),
+            jobs=jobs,
+        )
+        assert df["node"].tolist() == [NODE_PATH, NODE_PATH, other_node_path, other_node_path]
+        assert df["state"].tolist() == ["complete", "submit", "error", "initial"]
+        assert df["in_all"].iloc[0] == pd.Timedelta(minutes=110)
+        assert df["in_submitted"].iloc[0] == pd.Timedelta(minutes=1)
+        assert df["in_active"].iloc[0] == pd.Timedelta(minutes=109)
+        assert df["in_all"].isna().tolist() == [False, True, True, True]
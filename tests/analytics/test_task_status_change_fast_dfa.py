@@ -0,0 +1,58 @@
+import datetime
+import itertools
+
+import pytest
+from transitions import MachineError
+
+from nwpc_message_tool.analytics.task_status_change_dfa import (
+    TaskStatusChangeDFA, StatusChangeType
+)
+from nwpc_message_tool.analytics.task_status_change_fast_dfa import TaskStatusChangeFastDFA
+
+
+class NodeData(object):
+    def __init__(self, status: StatusChangeType, date_time: datetime.datetime):
+        self.status = status
+        self.date_time = date_time
+
+
+def _run(dfa_engine, statuses):
+    dfa = dfa_engine(name="test")
+    start_time = datetime.datetime(2021, 4, 1)
+    for index, status in enumerate(statuses):
+        try:
+            dfa.trigger(
+                status.value,
+                node_data=NodeData(status, start_time + datetime.timedelta(minutes=index)),
+            )
+        except MachineError:
+            return dfa, index
+    return dfa, None
+
+
+def _get_result(dfa, error_index):
+    node_situation = dfa.node_situation
+    return (
+        dfa.state,
+        error_index,
+        node_situation.situation,
+        [(p.status, p.time) for p in node_situation.time_points],
+        [(p.period_type, p.start_time, p.end_time) for p in node_situation.time_periods],
+    )
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 4])
+def test_same_as_task_status_change_dfa(length):
+    events = [StatusChangeType.Submit, StatusChangeType.Initial, StatusChangeType.Complete, StatusChangeType.Abort]
+    for statuses in itertools.product(events, repeat=length):
+        expected = _get_result(*_run(TaskStatusChangeDFA, statuses))
+        assert _get_result(*_run(TaskStatusChangeFastDFA, statuses)) == expected
+
+
+def test_time_periods():
+    dfa, _ = _run(
+        TaskStatusChangeFastDFA,
+        [StatusChangeType.Submit, StatusChangeType.Initial, StatusChangeType.Complete]
+    )
+    assert [p.period_type.value for p in dfa.node_situation.time_periods] == ["in_all", "in_submitted", "in_active"]
+    assert dfa.node_situation.time_periods[0].end_time == datetime.datetime(2021, 4, 1, 0, 2)
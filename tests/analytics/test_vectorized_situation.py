@@ -0,0 +1,157 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nwpc_message_tool.message.ecflow_client import EcflowClientMessage
+from nwpc_message_tool.message.ecflow_client_batch import EcflowClientMessageBatch
+from nwpc_message_tool.analytics.calculator import SituationCalculator
+from nwpc_message_tool.analytics.situation_type import TaskSituationType
+from nwpc_message_tool.analytics.task_status_change_dfa import TaskStatusChangeDFA
+from nwpc_message_tool.analytics.task_status_change_fast_dfa import TaskStatusChangeFastDFA
+
+
+NODE_PATHS = [
+    "/grapes_gfs_gmf/gmf_00/model/fcst",
+    "/grapes_gfs_gmf/gmf_00/model/post",
+    "/grapes_gfs_gmf/gmf_12/model/fcst",
+]
+
+COMMANDS = ("submit", "init", "complete", "abort", "requeue")
+
+STOP_STATES = (TaskSituationType.Complete, TaskSituationType.Error, TaskSituationType.Unknown)
+
+START_DATE = pd.Timestamp("2021-04-01", tz="UTC")
+END_DATE = pd.Timestamp("2021-04-05", tz="UTC")
+
+
+def _get_record(node_path: str, date: pd.Timestamp, seconds: float, command: str) -> EcflowClientMessage:
+    return EcflowClientMessage(
+        message_type="ecflow_client",
+        time=date + pd.Timedelta(seconds=seconds),
+        command=command,
+        node_name=node_path,
+        try_no="1",
+        ecf_date=date.strftime("%Y%m%d"),
+    )
+
+
+def _generate_records(seed: int, count: int):
+    rng = np.random.default_rng(seed)
+    # include dates out of range and nodes not in query.
+    dates = pd.date_range("2021-03-31", "2021-04-05", freq="D", tz="UTC")
+    node_paths = NODE_PATHS + ["/grapes_gfs_gmf/gmf_00/model"]
+    records = []
+    for i in range(count):
+        command = COMMANDS[rng.choice(len(COMMANDS), p=[0.3, 0.3, 0.25, 0.1, 0.05])]
+        records.append(_get_record(
+            node_path=node_paths[rng.integers(len(node_paths))],
+            date=dates[rng.integers(len(dates))],
+            seconds=i * 60 + rng.random(),
+            command=command,
+        ))
+    return records
+
+
+def _get_situations(dfa_engine, records, mode: str, stop_states=STOP_STATES) -> pd.DataFrame:
+    calculator = SituationCalculator(
+        dfa_engine=dfa_engine,
+        stop_states=stop_states,
+    )
+    return calculator.get_situations_for_nodes(
+        records=records,
+        node_paths=NODE_PATHS,
+        start_date=START_DATE,
+        end_date=END_DATE,
+        mode=mode,
+    )
+
+
+@pytest.mark.parametrize("dfa_engine", [TaskStatusChangeDFA, TaskStatusChangeFastDFA])
+def test_all_sequences(dfa_engine):
+    # every sequence of up to four status changes for one node and date.
+    records = []
+    node_paths = []
+    commands = COMMANDS[:4]
+    for length in range(5):
+        for sequence in itertools.product(commands, repeat=length):
+            node_path = f"/test/{'_'.join(sequence)}"
+            node_paths.append(node_path)
+            for i, command in enumerate(sequence):
+                records.append(_get_record(node_path, START_DATE, i * 90.5, command))
+
+    calculator = SituationCalculator(
+        dfa_engine=dfa_engine,
+        stop_states=STOP_STATES,
+    )
+    expected = calculator.get_situations_for_nodes(records, node_paths, START_DATE, END_DATE)
+    for input_records in (records, EcflowClientMessageBatch.from_messages(records)):
+        result = calculator.get_situations_for_nodes(
+            input_records, node_paths, START_DATE, END_DATE, mode="vectorized",
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_records(seed):
+    records = _generate_records(seed, 300)
+    expected = _get_situations(TaskStatusChangeFastDFA, records, mode="dfa")
+    result = _get_situations(TaskStatusChangeFastDFA, EcflowClientMessageBatch.from_messages(records), mode="vectorized")
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_other_stop_states():
+    records = _generate_records(0, 100)
+    stop_states = (TaskSituationType.Active, ) + STOP_STATES
+    expected = _get_situations(TaskStatusChangeFastDFA, records, mode="dfa", stop_states=stop_states)
+    result = _get_situations(TaskStatusChangeFastDFA, records, mode="vectorized", stop_states=stop_states)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_unsupported_mode():
+    with pytest.raises(ValueError):
+        _get_situations(TaskStatusChangeFastDFA, [], mode="unknown")
+
+
+def _get_lifecycle_records(node_path: str):
+    return [
+        _get_record(node_path, START_DATE, 3600, "submit"),
+        _get_record(node_path, START_DATE, 3660, "init"),
+        _get_record(node_path, START_DATE, 3600 * 3, "complete"),
+    ]
+
+
+@pytest.mark.parametrize("mode", ["dfa", "vectorized"])
+def test_duplicated_node_paths(mode):
+    records = _get_lifecycle_records("/a") + _get_lifecycle_records("/b")
+    calculator = SituationCalculator(
+        dfa_engine=TaskStatusChangeFastDFA,
+        stop_states=STOP_STATES,
+    )
+    df = calculator.get_situations_for_nodes(
+        records, ["/a", "/b", "/a"], START_DATE, START_DATE + pd.Timedelta(days=1), mode=mode,
+    )
+    assert df["node"].tolist() == ["/a", "/b", "/a"]
+    assert df["state"].tolist() == ["complete", "complete", "complete"]
+    assert df["in_all"].tolist() == [pd.Timedelta(hours=2)] * 3
+
+
+def test_naive_dates():
+    records = _get_lifecycle_records("/a")
+    calculator = SituationCalculator(
+        dfa_engine=TaskStatusChangeFastDFA,
+        stop_states=STOP_STATES,
+    )
+    naive_start_date = START_DATE.tz_localize(None)
+    naive_end_date = naive_start_date + pd.Timedelta(days=2)
+    expected = calculator.get_situations_for_nodes(
+        records, ["/a"], START_DATE, START_DATE + pd.Timedelta(days=2),
+    )
+    assert expected["state"].tolist() == ["complete", "initial"]
+    for mode in ("dfa", "vectorized"):
+        df = calculator.get_situations_for_nodes(records, ["/a"], naive_start_date, naive_end_date, mode=mode)
+        pd.testing.assert_frame_equal(df, expected)
+
+    situations = calculator.get_situations(records, "/a", naive_start_date, naive_end_date)
+    assert [s.state for s in situations] == [TaskSituationType.Complete, TaskSituationType.Initial]
@@ -0,0 +1,2 @@
+# tests directory is added to sys.path by pytest for this file,
+# so helper modules such as ``fake_elasticsearch`` can be imported by tests in sub directories.
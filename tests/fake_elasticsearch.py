@@ -0,0 +1,209 @@
+"""
+In-memory fake of Elasticsearch client APIs used by ``EsMessageStorage`` and ``AsyncEsMessageStorage``.
+
+Each index holds a list of documents in sort order. Hits have ``sort`` values of ``[time, position]``,
+where ``time`` is milliseconds of document ``time``.
+"""
+import asyncio
+import itertools
+import threading
+import time
+
+import pandas as pd
+
+
+def get_production_doc(start_time: str, forecast_hour: int, minute: int = None) -> dict:
+    """
+    Get source of a nwpc_message production message of grapes_gfs_gmf, received at minute ``minute`` after 04:00.
+    """
+    start_time = pd.Timestamp(start_time)
+    if minute is None:
+        minute = forecast_hour
+    return {
+        "app": "nwpc-message-client",
+        "type": "production",
+        "time": (start_time + pd.Timedelta(hours=4, minutes=minute)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "data": {
+            "event": "storage",
+            "forecast_time": f"{forecast_hour:03}h",
+            "name": "orig",
+            "start_time": start_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "status": 1,
+            "stream": "oper",
+            "system": "grapes_gfs_gmf",
+            "type": "grib2"
+        }
+    }
+
+
+class FakeElasticsearch(object):
+    """
+    Attributes
+    ----------
+    requests : list
+        (api, index, size) of all requests.
+    bodies : list
+        bodies of all search requests.
+    open_scrolls : dict
+        scroll id -> (index, position, size) of scroll contexts not cleared.
+    open_pits : dict
+        pit id -> index of point in times not closed.
+    delay : float
+        seconds to sleep in each search request.
+    fail_index : str
+        search on this index raises ``RuntimeError``.
+    max_in_flight : int
+        max count of concurrent search requests.
+    """
+    def __init__(self, indexes, delay: float = 0, fail_index: str = None):
+        self.indexes = {
+            index: [
+                {
+                    "_index": index,
+                    "_source": doc,
+                    "sort": [int(pd.Timestamp(doc["time"]).value // 1_000_000), position],
+                }
+                for position, doc in enumerate(docs)
+            ]
+            for index, docs in indexes.items()
+        }
+        self.delay = delay
+        self.fail_index = fail_index
+        self.requests = []
+        self.bodies = []
+        self.open_scrolls = {}
+        self.open_pits = {}
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _request(self, api: str, index: str, size: int = None):
+        with self._lock:
+            self.requests.append((api, index, size))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if self.delay > 0:
+                time.sleep(self.delay)
+            if index == self.fail_index:
+                raise RuntimeError(f"search failed on {index}")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _response(self, hits, total: int = None, **kwargs):
+        res = {"hits": {"hits": hits}, **kwargs}
+        if total is not None:
+            res["hits"]["total"] = {"value": total, "relation": "eq"}
+        return res
+
+    def count(self, index, body):
+        self._request("count", index)
+        return {"count": len(self.indexes[index])}
+
+    def search(self, index=None, body=None, scroll=None, **kwargs):
+        self.bodies.append(body)
+        size = body.get("size", 10)
+        if "pit" in body:
+            index = self.open_pits[body["pit"]["id"]]
+            self._request("search", index, size)
+            hits = self.indexes[index]
+            if "search_after" in body:
+                hits = [hit for hit in hits if hit["sort"] > body["search_after"]]
+            total = len(self.indexes[index]) if body.get("track_total_hits", True) else None
+            return self._response(hits[:size], total, pit_id=body["pit"]["id"])
+
+        if "aggs" in body:
+            self._request("search", index, 0)
+            return self._get_summary(index, body["aggs"]["summary"]["composite"])
+
+        self._request("search", index, size)
+        hits = self.indexes[index]
+        if scroll is None:
+            return self._response(hits[:size], len(hits))
+        scroll_id = f"scroll-{next(self._ids)}"
+        self.open_scrolls[scroll_id] = (index, size, size)
+        return self._response(hits[:size], len(hits), _scroll_id=scroll_id)
+
+    def _get_summary(self, index: str, composite: dict) -> dict:
+        """
+        Composite aggregation of ``nwpc_message`` production summary on indexes separated by comma.
+        """
+        buckets = dict()
+        for name in index.split(","):
+            for hit in self.indexes.get(name, []):
+                data = hit["_source"]["data"]
+                key = (int(pd.Timestamp(data["start_time"]).value // 1_000_000), data["forecast_time"])
+                bucket = buckets.setdefault(key, {
+                    "key": {"start_time": key[0], "forecast_time": key[1]},
+                    "doc_count": 0,
+                    "min_time": {"value": None},
+                    "max_time": {"value": None},
+                })
+                value = float(hit["sort"][0])
+                bucket["doc_count"] += 1
+                bucket["min_time"]["value"] = min(value, bucket["min_time"]["value"] or value)
+                bucket["max_time"]["value"] = max(value, bucket["max_time"]["value"] or value)
+
+        keys = sorted(buckets)
+        if "after" in composite:
+            after = composite["after"]
+            keys = [key for key in keys if key > (after["start_time"], after["forecast_time"])]
+        keys = keys[:composite["size"]]
+        aggregation = {"buckets": [buckets[key] for key in keys]}
+        if len(keys) > 0:
+            aggregation["after_key"] = buckets[keys[-1]]["key"]
+        return {"hits": {"hits": []}, "aggregations": {"summary": aggregation}}
+
+    def scroll(self, scroll, scroll_id):
+        index, position, size = self.open_scrolls[scroll_id]
+        self._request("scroll", index, size)
+        hits = self.indexes[index][position:position + size]
+        self.open_scrolls[scroll_id] = (index, position + size, size)
+        return self._response(hits, len(self.indexes[index]), _scroll_id=scroll_id)
+
+    def clear_scroll(self, scroll_id):
+        self.open_scrolls.pop(scroll_id, None)
+
+    def open_point_in_time(self, index, keep_alive):
+        pit_id = f"pit-{next(self._ids)}"
+        self.open_pits[pit_id] = index
+        return {"id": pit_id}
+
+    def close_point_in_time(self, body):
+        self.open_pits.pop(body["id"], None)
+
+    def close(self):
+        pass
+
+
+class AsyncFakeElasticsearch(object):
+    """
+    Async wrapper of ``FakeElasticsearch``.
+    """
+    def __init__(self, indexes, **kwargs):
+        self.fake = FakeElasticsearch(indexes, **kwargs)
+
+    async def search(self, **kwargs):
+        await asyncio.sleep(0)
+        return self.fake.search(**kwargs)
+
+    async def scroll(self, **kwargs):
+        await asyncio.sleep(0)
+        return self.fake.scroll(**kwargs)
+
+    async def count(self, **kwargs):
+        return self.fake.count(**kwargs)
+
+    async def clear_scroll(self, **kwargs):
+        return self.fake.clear_scroll(**kwargs)
+
+    async def open_point_in_time(self, **kwargs):
+        return self.fake.open_point_in_time(**kwargs)
+
+    async def close_point_in_time(self, **kwargs):
+        return self.fake.close_point_in_time(**kwargs)
+
+    async def close(self):
+        pass
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from nwpc_message_tool.message import EcflowClientMessage, EcflowClientMessageBatch
+
+
+NODE_PATH = "/grapes_gfs_gmf/gmf_00/model/fcst"
+OTHER_NODE_PATH = "/grapes_gfs_gmf/gmf_00/model/post"
+
+
+def _get_record(date: str, minutes: int, command: str, node_path: str = NODE_PATH) -> EcflowClientMessage:
+    return EcflowClientMessage(
+        message_type="ecflow_client",
+        time=pd.Timestamp(date, tz="UTC") + pd.Timedelta(minutes=minutes),
+        command=command,
+        node_name=node_path,
+        try_no="1",
+        ecf_date=date,
+    )
+
+
+def test_from_messages():
+    records = [
+        _get_record("20210401", 10, "submit"),
+        _get_record("20210401", 11, "init", node_path=OTHER_NODE_PATH),
+        _get_record("20210402", 120, "complete"),
+    ]
+    batch = EcflowClientMessageBatch.from_messages(records)
+    assert len(batch) == 3
+    assert batch.node_codes.dtype == np.int32
+    assert batch.ecf_dates.dtype == np.int32
+    assert batch.get_node_name().tolist() == [NODE_PATH, OTHER_NODE_PATH, NODE_PATH]
+    assert batch.get_command().tolist() == ["submit", "init", "complete"]
+    assert batch.get_time().tolist() == [r.time for r in records]
+    assert batch.get_ecf_date().tolist() == [r.ecf_date for r in records]
+
+    columns_batch = EcflowClientMessageBatch.from_columns(
+        node_name=[r.node_name for r in records],
+        command=[r.command for r in records],
+        time=[r.time.isoformat() for r in records],
+        ecf_date=["20210401", "20210401", "20210402"],
+    )
+    assert np.array_equal(columns_batch.times, batch.times)
+    assert np.array_equal(columns_batch.ecf_dates, batch.ecf_dates)
+
+
+def test_filter_and_group():
+    records = [
+        _get_record("20210402", 10, "submit"),
+        _get_record("20210401", 10, "submit"),
+        _get_record("20210401", 11, "init", node_path=OTHER_NODE_PATH),
+        _get_record("20210401", 11, "init"),
+        _get_record("20210401", 12, "requeue"),
+        _get_record("20210403", 10, "submit"),
+    ]
+    batch = EcflowClientMessageBatch.from_messages(records)
+
+    selected = batch.filter(
+        node_paths=[NODE_PATH],
+        commands=["submit", "init"],
+        start_date=pd.Timestamp("2021-04-01", tz="UTC"),
+        end_date=pd.Timestamp("2021-04-03", tz="UTC"),
+    )
+    assert selected.get_time().tolist() == [records[i].time for i in (0, 1, 3)]
+
+    groups = selected.group_by_date()
+    assert list(groups.keys()) == [pd.Timestamp("2021-04-01", tz="UTC"), pd.Timestamp("2021-04-02", tz="UTC")]
+    assert groups[pd.Timestamp("2021-04-01", tz="UTC")].get_command().tolist() == ["submit", "init"]
+
+    node_groups = batch.group_by_node()
+    assert sorted(node_groups.keys()) == [NODE_PATH, OTHER_NODE_PATH]
+    assert len(node_groups[OTHER_NODE_PATH]) == 1
+    assert len(batch.filter(node_paths=["/not/exist"])) == 0
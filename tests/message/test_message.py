@@ -0,0 +1,71 @@
+import pickle
+
+import pandas as pd
+
+from nwpc_message_tool.message import (
+    EventStatus,
+    ProductionEventMessage,
+    EcflowClientMessage,
+)
+
+
+def test_production_event_message_lazy_fields():
+    message = ProductionEventMessage(
+        message_type="production",
+        time="2021-01-01T04:10:00+00:00",
+        system="grapes_gfs_gmf",
+        status=EventStatus.Complete,
+        start_time="2021-01-01T00:00:00+00:00",
+        forecast_time="3h",
+    )
+    assert not hasattr(message, "__dict__")
+    assert message._time == "2021-01-01T04:10:00+00:00"
+
+    assert message.time == pd.Timestamp("2021-01-01 04:10:00", tz="UTC")
+    assert message.start_time == pd.Timestamp("2021-01-01 00:00:00", tz="UTC")
+    assert message.forecast_time == pd.Timedelta(hours=3)
+    assert isinstance(message._time, pd.Timestamp)
+
+
+def test_production_event_message_int64():
+    start_time = pd.Timestamp("2021-01-01 00:00:00", tz="UTC")
+    message = ProductionEventMessage(
+        time=start_time.value,
+        start_time=start_time,
+        forecast_time=pd.Timedelta(hours=3).value,
+    )
+    assert message.time == start_time
+    assert message.start_time is start_time
+    assert message.forecast_time == pd.Timedelta(hours=3)
+
+
+def test_ecflow_client_message():
+    message = EcflowClientMessage(
+        message_type="ecflow_client",
+        time="2021-01-01T00:10:00+00:00",
+        command="submit",
+        node_name="/grapes_gfs_gmf/gmf_00/model/fcst",
+        try_no="1",
+        ecf_date="20210101",
+    )
+    assert message.try_no == 1
+    assert message.ecf_date == pd.Timestamp("2021-01-01", tz="UTC")
+
+    loaded = pickle.loads(pickle.dumps(message))
+    assert loaded.node_name == message.node_name
+    assert loaded.time == message.time
+    assert loaded.ecf_date == message.ecf_date
+
+
+def test_ecflow_client_message_naive_ecf_date():
+    for ecf_date in (pd.Timestamp("2021-04-01"), pd.Timestamp("2021-04-01").to_pydatetime(), "20210401"):
+        message = EcflowClientMessage(
+            command="submit",
+            try_no="1",
+            ecf_date=ecf_date,
+        )
+        assert message.ecf_date == pd.Timestamp("2021-04-01", tz="UTC")
+        assert str(message.ecf_date.tz) == "UTC"
+
+    message.ecf_date = pd.Timestamp("2021-04-02")
+    assert message.ecf_date == pd.Timestamp("2021-04-02", tz="UTC")
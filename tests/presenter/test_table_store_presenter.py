@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from nwpc_message_tool.message import ProductionEventMessage, EventStatus
+from nwpc_message_tool.processor import TableProcessor
+from nwpc_message_tool.presenter import TableStorePresenter
+
+
+def _get_messages():
+    return [
+        ProductionEventMessage(
+            message_type="production",
+            time=pd.Timestamp("2021-04-22T04:00:00Z") + pd.Timedelta(minutes=i),
+            system="grapes_meso_3km",
+            stream="oper",
+            production_type="grib2",
+            production_name="orig",
+            event="storage",
+            status=EventStatus.Complete,
+            start_time=pd.Timestamp("2021-04-22T00:00:00Z"),
+            forecast_time=pd.Timedelta(f"{forecast_hour:03}h"),
+        )
+        for i, forecast_hour in enumerate((3, 0, 1, 2, 3))
+    ]
+
+
+@pytest.mark.parametrize("output_type", ["csv", "json"])
+def test_show_frames(tmp_path, output_type):
+    processor = TableProcessor(keep_duplicates="last", mode="streaming", chunk_size=2)
+    output_file = tmp_path / f"table.{output_type}"
+    presenter = TableStorePresenter(output_type=output_type, output_file=str(output_file))
+    presenter.show_frames(processor.iter_frames(_get_messages()))
+
+    if output_type == "csv":
+        table = pd.read_csv(output_file, index_col=0)
+    else:
+        table = pd.read_json(output_file, convert_dates=["start_time", "time"])
+    assert sorted(table.index) == [
+        "2021042200+000",
+        "2021042200+001",
+        "2021042200+002",
+        "2021042200+003",
+    ]
+    assert table["forecast_hour"].tolist() == [int(index[-3:]) for index in table.index]
+    # last duplicated message is kept
+    assert pd.to_datetime(table["time"], utc=True)["2021042200+003"] == pd.Timestamp("2021-04-22T04:04:00Z")
+
+
+@pytest.mark.parametrize("output_type", ["csv", "json"])
+def test_show_frames_empty(tmp_path, output_type):
+    output_file = tmp_path / f"table.{output_type}"
+    presenter = TableStorePresenter(output_type=output_type, output_file=str(output_file))
+    presenter.show_frames(iter([]))
+    assert output_file.exists()
+
+
+def test_show_frames_output_type(tmp_path):
+    presenter = TableStorePresenter(output_type="xml", output_file=str(tmp_path / "table.xml"))
+    with pytest.raises(ValueError):
+        presenter.show_frames(iter([]))
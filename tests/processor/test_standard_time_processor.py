@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from nwpc_message_tool.processor import StandardTimeProcessor, StandardTimeState
+from nwpc_message_tool.processor.standard_time_processor import _get_nearest_quantile
+
+
+def _get_table():
+    rng = np.random.default_rng(0)
+    records = []
+    for start_time in pd.date_range("2021-04-01", "2021-04-20", freq="12H", tz="UTC"):
+        for forecast_hour in (0, 3, 6):
+            records.append({
+                "start_time": start_time,
+                "forecast_hour": forecast_hour,
+                "time": start_time + pd.Timedelta(hours=4 + forecast_hour / 60, seconds=int(rng.integers(0, 600))),
+            })
+    return pd.DataFrame(records)
+
+
+START_HOURS = [
+    {"start_hour": "00", "forecast_hours": np.array([0, 3, 6])},
+    {"start_hour": "12", "forecast_hours": np.array([0, 3])},
+]
+
+
+def test_process_data_numpy():
+    processor = StandardTimeProcessor(
+        start_hours=START_HOURS,
+        engine="numpy",
+        random_state=1,
+    )
+    times = processor.process_data(_get_table())
+    assert times == processor.process_data(_get_table())
+
+    pandas_times = StandardTimeProcessor(
+        start_hours=START_HOURS,
+        random_state=1,
+    ).process_data(_get_table())
+
+    assert [t["start_hour"] for t in times] == [t["start_hour"] for t in pandas_times]
+    for item, pandas_item in zip(times, pandas_times):
+        assert [t["forecast_hour"] for t in item["times"]] == [t["forecast_hour"] for t in pandas_item["times"]]
+        for t, pandas_t in zip(item["times"], pandas_item["times"]):
+            assert set(t.keys()) == {"forecast_hour", "upper_duration", "lower_duration"}
+            assert t["upper_duration"].startswith("P0DT4H")
+            # bootstrap bounds of both engines are close.
+            difference = pd.Timedelta(t["upper_duration"]) - pd.Timedelta(pandas_t["upper_duration"])
+            assert abs(difference) < pd.Timedelta(minutes=2)
+
+
+def test_process_data_numpy_constant_clock():
+    table = _get_table()
+    table["time"] = table["start_time"] + pd.Timedelta(hours=4, microseconds=1)
+    times = StandardTimeProcessor(start_hours=START_HOURS, engine="numpy").process_data(table)
+    pandas_times = StandardTimeProcessor(start_hours=START_HOURS).process_data(_get_table().assign(time=table["time"]))
+    assert times == pandas_times
+    assert times[0]["times"][0]["upper_duration"] == "P0DT4H0M1S"
+
+
+def test_get_nearest_quantile():
+    values = np.sort(np.random.default_rng(0).integers(0, 10000, size=1000))
+    for q in (0.005, 0.5, 0.995):
+        assert _get_nearest_quantile(values, q) == pd.Series(values).quantile(q, interpolation="nearest")
+
+
+def test_process_data_numpy_jobs():
+    times = StandardTimeProcessor(
+        start_hours=START_HOURS,
+        engine="numpy",
+        random_state=1,
+    ).process_data(_get_table())
+
+    parallel_times = StandardTimeProcessor(
+        start_hours=START_HOURS,
+        engine="numpy",
+        random_state=1,
+        jobs=2,
+    ).process_data(_get_table())
+
+    assert parallel_times == times
+
+
+def test_update_data(tmp_path):
+    table = _get_table()
+    processor = StandardTimeProcessor(start_hours=START_HOURS, engine="numpy", random_state=1)
+    expected = processor.process_data(_get_table())
+
+    state = StandardTimeState(window_size=100)
+    middle = pd.Timestamp("2021-04-10", tz="UTC")
+    processor.update_data(table[table["start_time"] < middle], state)
+    state.save(tmp_path / "state.json")
+
+    state = StandardTimeState.load(tmp_path / "state.json", window_size=100)
+    # overlapped cycles are folded only once.
+    times = processor.update_data(table[table["start_time"] >= middle - pd.Timedelta(days=2)], state)
+    assert times == expected
+    assert len(state.clocks[("00", 3)]) == len(table[(table["start_time"].dt.hour == 0) & (table["forecast_hour"] == 3)])
+
+    # groups without new cycles keep their bounds.
+    bounds = dict(state.bounds)
+    state.bounds[("12", 0)] = (1, 0)
+    table = table[(table["start_time"].dt.hour == 0) | (table["forecast_hour"] != 0)]
+    times = processor.update_data(table, state)
+    assert pd.Timedelta(times[1]["times"][0]["upper_duration"]) == pd.Timedelta(1, unit="ns")
+    assert state.bounds[("00", 0)] == bounds[("00", 0)]
+
+
+def test_state_window():
+    state = StandardTimeState(window_size=3)
+    state.fold(("00", 0), np.array([1, 2]), np.array([10, 20]))
+    state.fold(("00", 0), np.array([3, 4]), np.array([30, 40]))
+    assert state.clocks[("00", 0)].tolist() == [2, 3, 4]
+    assert state.latest_start_time[("00", 0)] == 40
@@ -0,0 +1,139 @@
+import pandas as pd
+import pytest
+
+from nwpc_message_tool.message import ProductionEventMessage, EventStatus
+from nwpc_message_tool.processor import TableProcessor
+
+
+def _get_messages():
+    messages = []
+    for start_time in ("2021-04-22T12:00:00Z", "2021-04-22T00:00:00Z"):
+        for forecast_hour in (3, 0, 1):
+            messages.append(ProductionEventMessage(
+                message_type="production",
+                time=pd.Timestamp(start_time) + pd.Timedelta(hours=4, minutes=forecast_hour, microseconds=1),
+                system="grapes_meso_3km",
+                stream="oper",
+                production_type="grib2",
+                production_name="orig",
+                event="storage",
+                status=EventStatus.Complete,
+                start_time=pd.Timestamp(start_time),
+                forecast_time=pd.Timedelta(f"{forecast_hour:03}h"),
+            ))
+    # duplicated message for 2021042200+003
+    messages.append(ProductionEventMessage(
+        message_type="production",
+        time=pd.Timestamp("2021-04-22T05:00:00Z"),
+        system="grapes_meso_3km",
+        stream="oper",
+        production_type="grib2",
+        production_name="orig",
+        event="storage",
+        status=EventStatus.Complete,
+        start_time=pd.Timestamp("2021-04-22T00:00:00Z"),
+        forecast_time=pd.Timedelta("003h"),
+    ))
+    return messages
+
+
+def test_process_messages_columnar():
+    messages = _get_messages()
+
+    for keep_duplicates in ("first", "last", True):
+        row_table = TableProcessor(keep_duplicates=keep_duplicates).process_messages(messages)
+        table = TableProcessor(keep_duplicates=keep_duplicates, mode="columnar").process_messages(messages)
+
+        assert list(table.index) == list(row_table.index)
+        assert list(table.columns) == list(row_table.columns)
+        assert table["forecast_hour"].dtype == "int16"
+        assert table["system"].dtype == "category"
+        for column in ("start_time", "forecast_hour", "time"):
+            assert list(table[column]) == list(row_table[column])
+        for column in ("system", "stream", "type", "name", "event", "status"):
+            assert list(table[column].astype(str)) == list(row_table[column])
+
+    table = TableProcessor(mode="columnar").process_messages(messages)
+    assert table.loc["2021042200+003", "time"] == pd.Timestamp("2021-04-22T04:03:01Z")
+    assert list(table.index) == [
+        "2021042200+000",
+        "2021042200+001",
+        "2021042200+003",
+        "2021042212+000",
+        "2021042212+001",
+        "2021042212+003",
+    ]
+
+    table = TableProcessor(keep_duplicates="last", mode="columnar").process_messages(messages)
+    assert table.loc["2021042200+003", "time"] == pd.Timestamp("2021-04-22T05:00:00Z")
+
+
+def test_process_messages_columnar_empty():
+    processor = TableProcessor(columns=["start_time", "forecast_hour", "time"], mode="columnar")
+    table = processor.process_messages([])
+    assert len(table) == 0
+    assert list(table.columns) == ["start_time", "forecast_hour", "time"]
+
+
+def test_process_messages_streaming():
+    messages = _get_messages()
+
+    for keep_duplicates in ("first", "last", True):
+        columnar_table = TableProcessor(keep_duplicates=keep_duplicates, mode="columnar").process_messages(messages)
+        for chunk_size in (1, 2, 3, 100):
+            table = TableProcessor(
+                keep_duplicates=keep_duplicates,
+                mode="streaming",
+                chunk_size=chunk_size,
+            ).process_messages(iter(messages))
+            pd.testing.assert_frame_equal(table, columnar_table)
+
+
+def test_iter_frames():
+    messages = _get_messages()
+    processor = TableProcessor(mode="streaming", chunk_size=4)
+
+    frames = list(processor.iter_frames(messages))
+    assert [len(frame) for frame in frames] == [4, 2]
+    assert list(frames[0].index) == [
+        "2021042200+003",
+        "2021042212+000",
+        "2021042212+001",
+        "2021042212+003",
+    ]
+
+    processor = TableProcessor(keep_duplicates="last", mode="streaming", chunk_size=4)
+    frames = list(processor.iter_frames(messages))
+    assert [len(frame) for frame in frames] == [3, 3]
+    assert frames[1].loc["2021042200+003", "time"] == pd.Timestamp("2021-04-22T05:00:00Z")
+
+
+def test_process_messages_streaming_empty():
+    processor = TableProcessor(columns=["start_time", "forecast_hour", "time"], mode="streaming")
+    table = processor.process_messages([])
+    assert len(table) == 0
+    assert list(table.columns) == ["start_time", "forecast_hour", "time"]
+
+
+def test_process_summary():
+    messages = _get_messages()
+    columns = ["start_time", "forecast_hour", "time"]
+    df = TableProcessor(keep_duplicates=True, mode="columnar").process_messages(messages)
+    grouped = df.groupby(level=0)
+    summary = pd.DataFrame({
+        "start_time": grouped["start_time"].first(),
+        "forecast_hour": grouped["forecast_hour"].first(),
+        "count": grouped.size(),
+        "min_time": grouped["time"].min(),
+        "max_time": grouped["time"].max(),
+    })
+
+    for keep_duplicates in ("first", "last"):
+        processor = TableProcessor(columns=columns, keep_duplicates=keep_duplicates, mode="columnar")
+        pd.testing.assert_frame_equal(
+            processor.process_summary(summary),
+            processor.process_messages(messages),
+        )
+
+    with pytest.raises(ValueError):
+        TableProcessor(keep_duplicates=True).process_summary(summary)
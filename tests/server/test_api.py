@@ -0,0 +1,32 @@
+from fake_elasticsearch import FakeElasticsearch, get_production_doc
+from nwpc_message_tool.storage import EsMessageStorage
+from nwpc_message_tool.server.api import _get_prod_grib2_times
+
+
+class StubStandardTimeRepository(object):
+    def get_table(self, **kwargs):
+        return None
+
+
+def test_get_prod_grib2_times():
+    client = FakeElasticsearch({
+        "2021-04": [
+            get_production_doc("2021-04-01 00:00", 3, minute=1),
+            get_production_doc("2021-04-01 00:00", 0, minute=2),
+            # duplicated message arrives later
+            get_production_doc("2021-04-01 00:00", 3, minute=5),
+        ],
+    })
+    storage = EsMessageStorage(hosts=["localhost:9200"], debug=False)
+    storage.client = client
+
+    result = _get_prod_grib2_times(storage, StubStandardTimeRepository(), "grapes_gfs_gmf", "2021-04-01")
+    assert [item["start_hour"] for item in result] == ["00", "06", "12", "18"]
+    times = {t["forecast_hour"]: t["time"] for t in result[0]["times"]}
+    assert times[0] == "2021-04-01T04:02:00.000Z"
+    assert times[3] == "2021-04-01T04:01:00.000Z"
+    assert times[6] is None
+    assert all(t["time"] is None for t in result[1]["times"])
+    # times are aggregated in ElasticSearch, messages are not fetched.
+    assert [r[0] for r in client.requests] == ["search"]
+    assert "aggs" in client.bodies[0]
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from nwpc_message_tool.server.cache import ResponseCache, KEY_LOCK_COUNT
+from nwpc_message_tool.server.api import api_app
+
+
+class Loader(object):
+    def __init__(self):
+        self.count = 0
+        self.loaded = threading.Event()
+
+    def __call__(self) -> str:
+        self.count += 1
+        self.loaded.set()
+        return f'{{"count": {self.count}}}'
+
+
+def test_ttl_and_stale_while_revalidate():
+    cache = ResponseCache(ttl=0.05, stale_ttl=10)
+    loader = Loader()
+    entry = cache.get(("prod-grib2", "grapes_gfs_gmf", "20210401"), loader)
+    assert entry.body == '{"count": 1}'
+    assert cache.get(("prod-grib2", "grapes_gfs_gmf", "20210401"), loader) is entry
+
+    time.sleep(0.1)
+    loader.loaded.clear()
+    # stale entry is returned and refreshed in background.
+    assert cache.get(("prod-grib2", "grapes_gfs_gmf", "20210401"), loader) is entry
+    assert loader.loaded.wait(5)
+    for _ in range(50):
+        new_entry = cache.get(("prod-grib2", "grapes_gfs_gmf", "20210401"), loader)
+        if new_entry is not entry:
+            break
+        time.sleep(0.01)
+    assert new_entry.body == '{"count": 2}'
+    assert new_entry.etag != entry.etag
+
+
+def test_closed_and_cache_dir(tmp_path):
+    loader = Loader()
+    entry = ResponseCache(ttl=0, stale_ttl=0, cache_dir=tmp_path).get(("prod-grib2", "s", "20210401"), loader, closed=True)
+    assert (tmp_path / "prod-grib2" / "s" / "20210401.json").exists()
+
+    # another process reads shared cache file.
+    cached = ResponseCache(ttl=0, stale_ttl=0, cache_dir=tmp_path).get(("prod-grib2", "s", "20210401"), loader)
+    assert loader.count == 1
+    assert cached.etag == entry.etag
+    assert cached.last_modified == entry.last_modified
+
+
+@pytest.mark.parametrize("system", ["..", "../x", "a/b", ""])
+def test_cache_dir_key(tmp_path, system):
+    cache_dir = tmp_path / "cache"
+    loader = Loader()
+    with pytest.raises(ValueError):
+        ResponseCache(cache_dir=cache_dir).get(("prod-grib2", system, "20210401"), loader)
+    assert loader.count == 0
+    assert list(tmp_path.rglob("*.json")) == []
+
+
+def test_key_locks():
+    cache = ResponseCache()
+    loader = Loader()
+    for day in range(KEY_LOCK_COUNT * 2):
+        cache.get(("prod-grib2", "grapes_gfs_gmf", f"{day}"), loader)
+    # locks are not created for each key.
+    assert len(cache._key_locks) == KEY_LOCK_COUNT
+    key = ("prod-grib2", "grapes_gfs_gmf", "20210401")
+    assert cache._get_key_lock(key) is cache._get_key_lock(tuple(list(key)))
+
+
+@pytest.mark.parametrize("system,date", [
+    ("../x", "2021-04-01"),
+    ("grapes_gfs_gmf", "abc"),
+    ("grapes_gfs_gmf", ""),
+    ("grapes_gfs_gmf", "2021-04-01T12:00"),
+])
+def test_prod_grib2_bad_request(system, date):
+    app = Flask(__name__)
+    app.register_blueprint(api_app, url_prefix="/api/v1")
+    response = app.test_client().get("/api/v1/prod/grib2", query_string={"system": system, "date": date})
+    assert response.status_code == 400
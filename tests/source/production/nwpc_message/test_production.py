@@ -2,8 +2,12 @@ import pandas as pd
 
 from nwpc_message_tool.source.production.nwpc_message.production import (
     load_message,
+    load_columns,
     get_query_body,
-    get_index
+    get_index,
+    SOURCE_INCLUDES,
+    get_summary_aggregation,
+    load_summary,
 )
 from nwpc_message_tool.message import (
     EventStatus,
@@ -42,6 +46,58 @@ def test_load_message():
     assert message.status == EventStatus.Complete
 
 
+def test_load_columns():
+    docs = [
+        {
+            "app": "nwpc-message-client",
+            "type": "production",
+            "time": "2021-04-22T05:52:38.591782905Z",
+            "data": {
+                "event": "storage",
+                "forecast_time": "036h",
+                "name": "orig",
+                "start_time": "2021-04-22T00:00:00Z",
+                "status": 1,
+                "stream": "oper",
+                "system": "grapes_meso_3km",
+                "type": "grib2"
+            }
+        },
+        {
+            "app": "nwpc-message-client",
+            "type": "production",
+            "time": "2021-04-22T17:03:01.000000001Z",
+            "data": {
+                "event": "storage",
+                "forecast_time": "003h",
+                "name": "orig",
+                "start_time": "2021-04-22T12:00:00Z",
+                "status": 3,
+                "stream": "oper",
+                "system": "grapes_meso_3km",
+                "type": "grib2"
+            }
+        },
+    ]
+
+    columns = load_columns(docs)
+
+    for index, doc in enumerate(docs):
+        message = load_message(doc)
+        assert columns["system"][index] == message.system
+        assert columns["stream"][index] == message.stream
+        assert columns["type"][index] == message.production_type
+        assert columns["name"][index] == message.production_name
+        assert columns["event"][index] == message.event
+        assert columns["status"][index] == message.status.name
+        assert columns["start_time"][index] == message.start_time.value
+        assert columns["forecast_time"][index] == message.forecast_time.value
+        assert columns["time"][index] == message.time.value
+
+    columns = load_columns([])
+    assert len(columns["time"]) == 0
+
+
 def test_get_index():
     start_time = pd.to_datetime("2021-04-23 00:00")
     index_list = get_index(start_time)
@@ -230,3 +286,81 @@ def test_get_query_body_start_time_tuple():
         },
         "sort": [{"time": "asc"}]
     }
+
+
+def test_get_query_body_time_after():
+    system = "grapes_gfs_gmf"
+    time_after = pd.to_datetime("2021-04-23 04:00:00+00:00")
+
+    body = get_query_body(
+        system=system,
+        time_after=time_after,
+    )
+
+    assert body == {
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"data.system": system}},
+                    {"range": {"time": {"gte": time_after.isoformat()}}},
+                ]
+            },
+        },
+        "sort": [{"time": "asc"}]
+    }
+
+
+def _filter_source(doc, includes):
+    result = {}
+    for field in includes:
+        keys = field.split(".")
+        source, target = doc, result
+        for key in keys[:-1]:
+            source = source[key]
+            target = target.setdefault(key, {})
+        target[keys[-1]] = source[keys[-1]]
+    return result
+
+
+def test_source_includes():
+    doc = {
+        "app": "nwpc-message-client",
+        "type": "production",
+        "time": "2021-04-22T05:52:38.591782905Z",
+        "data": {
+            "event": "storage",
+            "forecast_time": "036h",
+            "name": "orig",
+            "start_time": "2021-04-22T00:00:00Z",
+            "status": 1,
+            "stream": "oper",
+            "system": "grapes_meso_3km",
+            "type": "grib2"
+        }
+    }
+    message = load_message(_filter_source(doc, SOURCE_INCLUDES["message"]))
+    assert message.forecast_time == pd.Timedelta(hours=36)
+    columns = load_columns([_filter_source(doc, SOURCE_INCLUDES["table"])])
+    assert columns["system"].tolist() == ["grapes_meso_3km"]
+
+    body = get_query_body(system="grapes_meso_3km", consumer="table")
+    assert body["_source"] == {"includes": SOURCE_INCLUDES["table"]}
+    assert "_source" not in get_query_body(system="grapes_meso_3km")
+
+
+def test_summary():
+    aggs = get_summary_aggregation(size=10, after={"start_time": 1617235200000, "forecast_time": "000h"})
+    assert aggs["summary"]["composite"]["size"] == 10
+    assert aggs["summary"]["composite"]["after"] == {"start_time": 1617235200000, "forecast_time": "000h"}
+
+    columns = load_summary([{
+        "key": {"start_time": 1617235200000, "forecast_time": "036h"},
+        "doc_count": 2,
+        "min_time": {"value": 1617249600000.0},
+        "max_time": {"value": 1617249601500.0},
+    }])
+    assert columns["start_time"][0] == pd.Timestamp("2021-04-01 00:00", tz="UTC").value
+    assert columns["forecast_time"][0] == pd.Timedelta(hours=36).value
+    assert columns["count"].tolist() == [2]
+    assert columns["max_time"][0] == pd.Timestamp("2021-04-01 04:00:01.5", tz="UTC").value
+    assert len(load_summary([])["start_time"]) == 0
@@ -2,8 +2,10 @@ import pandas as pd
 
 from nwpc_message_tool.source.production.nmc_monitor.production import (
     load_message,
+    load_columns,
     get_index,
-    get_query_body
+    get_query_body,
+    load_summary,
 )
 from nwpc_message_tool.message import EventStatus
 
@@ -50,6 +52,31 @@ def test_load_message():
         hours=1,
     )
 
+
+def test_load_columns():
+    doc = {
+        "source": "nwpc_grapes_meso_10km",
+        "type": "prod_grib",
+        "status": "0",
+        "datetime": "2020-03-04T11:37:04+08:00",
+        "fileName": "rmf.gra.2020030400001.grb2",
+        "startTime": "2020-03-04T00:00:00Z",
+        "forecastTime": "001"
+    }
+
+    columns = load_columns([doc])
+    message = load_message(doc)
+
+    assert columns["system"][0] == message.system
+    assert columns["stream"][0] == message.stream
+    assert columns["type"][0] == message.production_type
+    assert columns["name"][0] == message.production_name
+    assert columns["event"][0] == message.event
+    assert columns["status"][0] == message.status.name
+    assert columns["start_time"][0] == message.start_time.value
+    assert columns["forecast_time"][0] == message.forecast_time.value
+    assert columns["time"][0] == message.time.value
+
 def test_get_index():
     start_time = pd.to_datetime("2021-04-23 00:00")
     index_list = get_index(start_time)
@@ -178,3 +205,36 @@ def test_get_query_body_start_time_tuple():
         },
         "sort": [{"datetime": "asc"}]
     }
+
+
+def test_get_query_body_time_after():
+    system = "grapes_gfs_gmf"
+    time_after = pd.to_datetime("2021-04-23 04:00:00+00:00")
+
+    body = get_query_body(
+        system=system,
+        time_after=time_after,
+    )
+
+    assert body == {
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"source": system}},
+                    {"range": {"datetime": {"gte": time_after.isoformat()}}},
+                ]
+            },
+        },
+        "sort": [{"datetime": "asc"}]
+    }
+
+
+def test_load_summary():
+    columns = load_summary([{
+        "key": {"start_time": 1617235200000, "forecast_time": "36"},
+        "doc_count": 1,
+        "min_time": {"value": 1617249600000.0},
+        "max_time": {"value": 1617249600000.0},
+    }])
+    assert columns["forecast_time"][0] == pd.Timedelta(hours=36).value
+    assert columns["min_time"][0] == pd.Timestamp("2021-04-01 04:00", tz="UTC").value
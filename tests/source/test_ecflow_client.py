@@ -3,7 +3,8 @@ import pandas as pd
 from nwpc_message_tool.source.ecflow_client import (
     load_message,
     get_query_body,
-    get_index
+    get_index,
+    SOURCE_INCLUDES,
 )
 
 
@@ -187,3 +188,48 @@ def test_get_index():
         "ecflow-client-2021-04-22",
         "ecflow-client-2021-04-23"
     ]
+
+
+def test_get_query_body_many_nodes():
+    ecf_date = pd.to_datetime("2021-04-23")
+
+    body = get_query_body(
+        ["/s1/f1/t1", "/s1/f1/t2"],
+        ecf_date=ecf_date
+    )
+    assert body["query"]["bool"]["filter"] == [
+        {"terms": {"data.ecf_name.keyword": ["/s1/f1/t1", "/s1/f1/t2"]}},
+        {"term": {"data.ecf_date": "20210423"}},
+    ]
+
+    body = get_query_body(
+        node_path_prefix="/s1/f1/",
+        ecf_date=ecf_date
+    )
+    assert body["query"]["bool"]["filter"] == [
+        {"prefix": {"data.ecf_name.keyword": "/s1/f1/"}},
+        {"term": {"data.ecf_date": "20210423"}},
+    ]
+
+
+def test_get_query_body_consumer():
+    body = get_query_body("/s1/f1/t1", consumer="situation")
+    assert body["_source"] == {"includes": SOURCE_INCLUDES["situation"]}
+    assert "data.envs" not in body["_source"]["includes"]
+
+    doc = {
+        "type": "ecflow-client",
+        "time": "2021-04-22T08:36:01.292320923Z",
+        "data": {
+            "command": "complete",
+            "ecf_date": "20210422",
+            "ecf_host": "login_b06",
+            "ecf_name": "/service_checker/ecflow/check_watchman",
+            "ecf_port": "31071",
+            "ecf_rid": "0.0",
+            "ecf_tryno": "1",
+        }
+    }
+    message = load_message(doc)
+    assert message.arguments is None
+    assert message.envs is None
@@ -0,0 +1,10 @@
+import pytest
+
+from nwpc_message_tool.source._util import get_source
+
+
+def test_get_source():
+    source_includes = {"message": ["type", "time", "data"]}
+    assert get_source(source_includes, "message") == {"includes": ["type", "time", "data"]}
+    with pytest.raises(ValueError):
+        get_source(source_includes, "table")
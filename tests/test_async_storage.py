@@ -0,0 +1,158 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from nwpc_message_tool.async_storage import AsyncEsMessageStorage, AsyncPointInTimeSession
+from nwpc_message_tool.storage import get_page_size
+
+from fake_elasticsearch import AsyncFakeElasticsearch, get_production_doc
+
+
+def _get_doc(forecast_hour: int):
+    return {
+        "app": "nwpc-message-client",
+        "type": "production",
+        "time": f"2021-04-01T04:{forecast_hour:02}:00Z",
+        "data": {
+            "event": "storage",
+            "forecast_time": f"{forecast_hour:03}h",
+            "name": "orig",
+            "start_time": "2021-04-01T00:00:00Z",
+            "status": 1,
+            "stream": "oper",
+            "system": "grapes_gfs_gmf",
+            "type": "grib2"
+        }
+    }
+
+
+class FakeAsyncClient(object):
+    def __init__(self, docs, size):
+        self.docs = docs
+        self.size = size
+        self.requests = []
+        self.cleared = []
+
+    def _page(self, position):
+        hits = [{"_source": doc} for doc in self.docs[position:position + self.size]]
+        return {
+            "_scroll_id": str(position + self.size),
+            "hits": {"hits": hits, "total": {"value": len(self.docs)}},
+        }
+
+    async def search(self, index, body, scroll=None):
+        self.requests.append(("search", body.get("_source")))
+        return self._page(0)
+
+    async def scroll(self, scroll, scroll_id):
+        self.requests.append(("scroll", scroll_id))
+        await asyncio.sleep(0)
+        return self._page(int(scroll_id))
+
+    async def clear_scroll(self, scroll_id):
+        self.cleared.append(scroll_id)
+
+    async def close(self):
+        pass
+
+
+def _get_storage(client):
+    storage = AsyncEsMessageStorage(hosts=["localhost:9200"], debug=False)
+    storage.client = client
+    return storage
+
+
+def test_get_production_table():
+    client = FakeAsyncClient([_get_doc(h) for h in range(5)], size=2)
+    storage = _get_storage(client)
+    table = asyncio.run(storage.get_production_table(
+        system="grapes_gfs_gmf",
+        start_time=pd.Timestamp("2021-04-01 00:00"),
+        size=2,
+    ))
+    assert table["forecast_hour"].tolist() == [0, 1, 2, 3, 4]
+    assert [r[0] for r in client.requests] == ["search", "scroll", "scroll"]
+    assert client.requests[0][1] is not None
+
+
+def test_get_production_messages_close():
+    client = FakeAsyncClient([_get_doc(h) for h in range(10)], size=2)
+    storage = _get_storage(client)
+
+    async def get_first_message():
+        messages = storage.get_production_messages(
+            system="grapes_gfs_gmf",
+            start_time=pd.Timestamp("2021-04-01 00:00"),
+            size=2,
+        )
+        message = await messages.__anext__()
+        await messages.aclose()
+        return message
+
+    message = asyncio.run(get_first_message())
+    assert message.forecast_time == pd.Timedelta(hours=0)
+    # next page is prefetched and scroll is cleared when generator is closed.
+    assert len(client.requests) <= 2
+    assert len(client.cleared) == 1
+
+
+def test_get_production_table_search_after():
+    client = AsyncFakeElasticsearch({
+        "2021-04": [get_production_doc("2021-04-01 00:00", h) for h in range(5)],
+    })
+    storage = _get_storage(client)
+    table = asyncio.run(storage.get_production_table(
+        system="grapes_gfs_gmf",
+        start_time=pd.Timestamp("2021-04-01 00:00"),
+        size=2,
+        pagination="search_after",
+    ))
+    assert table["forecast_hour"].tolist() == [0, 1, 2, 3, 4]
+    bodies = client.fake.bodies
+    assert all("pit" in body for body in bodies)
+    assert [body["sort"][-1] for body in bodies] == [{"_shard_doc": "asc"}] * 3
+    assert [body["track_total_hits"] for body in bodies] == [True, False, False]
+    assert client.fake.open_pits == {}
+
+
+def test_point_in_time_session_auto_size():
+    client = AsyncFakeElasticsearch({
+        "2021-04": [get_production_doc("2021-04-01 00:00", h) for h in range(30)],
+    })
+
+    async def get_pages():
+        async with AsyncPointInTimeSession(client, "2021-04", {}) as session:
+            return session, [hits async for hits in session.pages()]
+
+    session, pages = asyncio.run(get_pages())
+    assert [len(hits) for hits in pages] == [30]
+    assert session.size == get_page_size(30)
+    # size is chosen by hit count of the first page, without count requests.
+    assert [r[0] for r in client.fake.requests] == ["search"]
+    assert client.fake.open_pits == {}
+
+
+def test_get_production_messages_search_after_close():
+    client = AsyncFakeElasticsearch({
+        "2021-04": [get_production_doc("2021-04-01 00:00", h) for h in range(10)],
+    })
+    storage = _get_storage(client)
+
+    async def get_first_message():
+        messages = storage.get_production_messages(
+            system="grapes_gfs_gmf",
+            start_time=pd.Timestamp("2021-04-01 00:00"),
+            size=2,
+            pagination="search_after",
+        )
+        message = await messages.__anext__()
+        await messages.aclose()
+        return message
+
+    message = asyncio.run(get_first_message())
+    assert message.forecast_time == pd.Timedelta(hours=0)
+    assert len(client.fake.requests) <= 2
+    assert client.fake.open_pits == {}
@@ -0,0 +1,128 @@
+import pandas as pd
+import pytest
+
+from nwpc_message_tool.cache import ProductionTableCache
+from nwpc_message_tool.source.production.nwpc_message import production
+
+
+pytest.importorskip("pyarrow")
+
+
+def _get_doc(start_time: str, forecast_hour: int, time: str):
+    return {
+        "app": "nwpc-message-client",
+        "type": "production",
+        "time": time,
+        "data": {
+            "event": "storage",
+            "forecast_time": f"{forecast_hour:03}h",
+            "name": "orig",
+            "start_time": start_time,
+            "status": 1,
+            "stream": "oper",
+            "system": "grapes_gfs_gmf",
+            "type": "grib2"
+        }
+    }
+
+
+class StubStorage(object):
+    def __init__(self, docs):
+        self.docs = docs
+        self.requests = []
+
+    def get_production_columns(self, start_time, time_after=None, engine=None, **kwargs):
+        self.requests.append((start_time, time_after))
+        docs = [
+            doc for doc in self.docs
+            if start_time[0] <= pd.Timestamp(doc["data"]["start_time"]).tz_localize(None) <= start_time[1]
+            and (time_after is None or pd.Timestamp(doc["time"]) >= time_after)
+        ]
+        return engine.load_columns(docs)
+
+
+def test_closed_month(tmp_path):
+    storage = StubStorage([
+        _get_doc("2021-04-01T00:00:00Z", 0, "2021-04-01T04:00:00Z"),
+        _get_doc("2021-04-01T00:00:00Z", 3, "2021-04-01T04:10:00Z"),
+        _get_doc("2021-04-02T00:00:00Z", 0, "2021-04-02T04:00:00Z"),
+        _get_doc("2021-05-01T00:00:00Z", 0, "2021-05-01T04:00:00Z"),
+    ])
+    cache = ProductionTableCache(storage, tmp_path)
+
+    table = cache.get_production_table(
+        system="grapes_gfs_gmf",
+        start_time=(pd.Timestamp("2021-04-01"), pd.Timestamp("2021-04-30")),
+        engine=production,
+    )
+    assert list(table.index) == ["2021040100+000", "2021040100+003", "2021040200+000"]
+    assert len(storage.requests) == 1
+    assert (tmp_path / "nwpc_message/grapes_gfs_gmf/_all/_all/_all/2021-04.parquet").exists()
+
+    table = cache.get_production_table(
+        system="grapes_gfs_gmf",
+        start_time=pd.Timestamp("2021-04-01"),
+        forecast_time="003h",
+        engine=production,
+    )
+    assert list(table.index) == ["2021040100+003"]
+    assert len(storage.requests) == 1
+
+
+def test_open_month(tmp_path):
+    now = pd.Timestamp.utcnow().floor("D")
+    start_time = now.strftime("%Y-%m-%dT00:00:00Z")
+    storage = StubStorage([
+        _get_doc(start_time, 0, (now + pd.Timedelta(hours=4)).isoformat()),
+    ])
+    cache = ProductionTableCache(storage, tmp_path, overlap=pd.Timedelta(0))
+
+    table = cache.get_production_table(
+        system="grapes_gfs_gmf",
+        start_time=now.tz_localize(None),
+        engine=production,
+    )
+    assert len(table) == 1
+
+    storage.docs.append(_get_doc(start_time, 3, (now + pd.Timedelta(hours=5)).isoformat()))
+    table = cache.get_production_table(
+        system="grapes_gfs_gmf",
+        start_time=now.tz_localize(None),
+        engine=production,
+    )
+    assert list(table["forecast_hour"]) == [0, 3]
+    assert storage.requests[-1][1] == now + pd.Timedelta(hours=4)
+
+
+def test_evict(tmp_path):
+    storage = StubStorage([
+        _get_doc("2021-04-01T00:00:00Z", 0, "2021-04-01T04:00:00Z"),
+        _get_doc("2021-05-01T00:00:00Z", 0, "2021-05-01T04:00:00Z"),
+    ])
+    cache = ProductionTableCache(storage, tmp_path)
+    cache.get_production_table(
+        system="grapes_gfs_gmf",
+        start_time=pd.Timestamp("2021-04-01"),
+        engine=production,
+    )
+    cache.max_size = 1
+    cache.evict()
+    assert list(tmp_path.rglob("*.parquet")) == []
+
+
+def test_cross_month_range(tmp_path):
+    storage = StubStorage([
+        _get_doc("2021-04-30T18:00:00Z", 0, "2021-04-30T22:00:00Z"),
+        _get_doc("2021-05-01T06:00:00Z", 0, "2021-05-01T10:00:00Z"),
+        _get_doc("2021-05-01T12:00:00Z", 0, "2021-05-01T16:00:00Z"),
+    ])
+    cache = ProductionTableCache(storage, tmp_path)
+
+    table = cache.get_production_table(
+        system="grapes_gfs_gmf",
+        start_time=(pd.Timestamp("2021-04-30 18:00"), pd.Timestamp("2021-05-01 06:00")),
+        engine=production,
+    )
+    assert list(table.index) == ["2021043018+000", "2021050106+000"]
+    assert len(storage.requests) == 2
+    assert (tmp_path / "nwpc_message/grapes_gfs_gmf/_all/_all/_all/2021-05.parquet").exists()
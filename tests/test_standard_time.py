@@ -0,0 +1,70 @@
+import pandas as pd
+
+from nwpc_message_tool.message import ProductionStandardTimeMessage
+from nwpc_message_tool.standard_time import StandardTimeRepository, get_standard_time_table
+
+
+def create_message(upper_duration: str) -> ProductionStandardTimeMessage:
+    return ProductionStandardTimeMessage(
+        system="grapes_gfs_gmf",
+        stream="oper",
+        production_type="grib2",
+        production_name="orig",
+        start_hours=[
+            {
+                "start_hour": "12",
+                "times": [
+                    {"forecast_hour": "003", "upper_duration": upper_duration, "lower_duration": "PT3H"},
+                    {"forecast_hour": "000", "upper_duration": "PT4H", "lower_duration": "PT3H"},
+                ]
+            },
+            {
+                "start_hour": "00",
+                "times": [
+                    {"forecast_hour": "000", "upper_duration": "PT4H", "lower_duration": "PT3H30M"},
+                ]
+            },
+        ]
+    )
+
+
+class StubStorage(object):
+    def __init__(self, messages):
+        self.messages = messages
+        self.calls = 0
+
+    def get_production_standard_time_message(self, **kwargs):
+        self.calls += 1
+        return iter(self.messages)
+
+
+def test_get_standard_time_table():
+    table = get_standard_time_table(create_message("PT4H10M"))
+    assert list(table.index) == [("00", "000"), ("12", "000"), ("12", "003")]
+    assert table.loc[("12", "003"), "upper_duration"] == pd.Timedelta(hours=4, minutes=10)
+    assert table.loc[("00", "000"), "lower_duration"] == pd.Timedelta(hours=3, minutes=30)
+
+
+def test_repository_get_table():
+    storage = StubStorage([create_message("PT4H10M")])
+    repository = StandardTimeRepository(storage, refresh_interval=3600)
+    try:
+        first = repository.get_table("grapes_gfs_gmf")
+        second = repository.get_table("grapes_gfs_gmf")
+        assert first is second
+        assert storage.calls == 1
+
+        storage.messages = [create_message("PT5H")]
+        repository.refresh()
+        assert storage.calls == 2
+        assert repository.get_table("grapes_gfs_gmf").loc[("12", "003"), "upper_duration"] == pd.Timedelta(hours=5)
+    finally:
+        repository.close()
+
+
+def test_repository_missing_message():
+    repository = StandardTimeRepository(StubStorage([]), refresh_interval=3600)
+    try:
+        assert repository.get_table("grapes_gfs_gmf") is None
+    finally:
+        repository.close()
@@ -0,0 +1,329 @@
+import threading
+
+import pandas as pd
+import pytest
+from elasticsearch.exceptions import RequestError
+
+from nwpc_message_tool.storage import (
+    EsMessageStorage,
+    ScrollSession,
+    PointInTimeSession,
+    MAX_PAGE_SIZE,
+    get_page_size,
+    prefetch_pages,
+    get_shared_es_message_storage,
+    close_shared_es_message_storages,
+)
+
+
+from fake_elasticsearch import FakeElasticsearch, get_production_doc
+
+
+class PageSource(object):
+    def __init__(self, count: int, error_at: int = None):
+        self.count = count
+        self.error_at = error_at
+        self.produced = 0
+        self.closed = threading.Event()
+
+    def pages(self):
+        try:
+            for i in range(self.count):
+                if i == self.error_at:
+                    raise RuntimeError("search failed")
+                self.produced += 1
+                yield [{"_id": i}]
+        finally:
+            self.closed.set()
+
+
+def test_prefetch_pages():
+    source = PageSource(10)
+    assert [page[0]["_id"] for page in prefetch_pages(source.pages(), 2)] == list(range(10))
+    assert source.closed.is_set()
+
+
+def test_prefetch_pages_close():
+    source = PageSource(100)
+    pages = prefetch_pages(source.pages(), 2)
+    assert next(pages)[0]["_id"] == 0
+    pages.close()
+    assert source.closed.is_set()
+    # queue is bounded: consumed page, buffered pages and one page waiting to be put.
+    assert source.produced <= 4
+
+
+def test_prefetch_pages_error():
+    source = PageSource(10, error_at=3)
+    pages = prefetch_pages(source.pages(), 2)
+    assert [next(pages)[0]["_id"] for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(RuntimeError):
+        next(pages)
+
+
+def test_get_shared_es_message_storage(tmp_path):
+    config_file = tmp_path / "nwpc-message-tool.yaml"
+    config_file.write_text(
+        "default_storage: es-storage-1\n"
+        "storage:\n"
+        "  es-storage-1:\n"
+        "    type: elasticsearch\n"
+        "    auth:\n"
+        "      hosts:\n"
+        "        - localhost:9200\n"
+        "    client:\n"
+        "      maxsize: 25\n"
+    )
+    try:
+        storage = get_shared_es_message_storage(config_file=config_file)
+        assert get_shared_es_message_storage("es-storage-1", config_file=config_file) is storage
+        assert storage.client.transport.kwargs["maxsize"] == 25
+
+        hosts_storage = get_shared_es_message_storage(hosts=["localhost:9200"])
+        assert hosts_storage is not storage
+        assert get_shared_es_message_storage(hosts=["localhost:9200"]) is hosts_storage
+    finally:
+        close_shared_es_message_storages()
+
+
+def _get_storage(client, **kwargs) -> EsMessageStorage:
+    storage = EsMessageStorage(hosts=["localhost:9200"], debug=False, **kwargs)
+    storage.client = client
+    return storage
+
+
+def _get_client(**kwargs) -> FakeElasticsearch:
+    return FakeElasticsearch({
+        "2021-03": [get_production_doc("2021-03-31 00:00", h) for h in range(5)],
+        "2021-04": [get_production_doc("2021-04-01 00:00", h) for h in range(5)],
+    }, **kwargs)
+
+
+def test_get_page_size():
+    assert get_page_size(0) == 20
+    assert get_page_size(500) == 500
+    assert get_page_size(MAX_PAGE_SIZE + 1) == MAX_PAGE_SIZE
+
+
+@pytest.mark.parametrize("session_class", [ScrollSession, PointInTimeSession])
+@pytest.mark.parametrize("total,page_sizes", [
+    (30, [30]),
+    (MAX_PAGE_SIZE + 1, [MAX_PAGE_SIZE, 1]),
+])
+def test_search_session_auto_size(session_class, total, page_sizes):
+    client = FakeElasticsearch({
+        "2021-04": [get_production_doc("2021-04-01 00:00", 0) for _ in range(total)],
+    })
+    session = session_class(client, "2021-04", {})
+    assert [len(hits) for hits in session.pages()] == page_sizes
+    assert session.size == get_page_size(total)
+    # size is chosen by hit count of the first page, without count requests.
+    assert [r[0] for r in client.requests if r[0] == "count"] == []
+    assert len(client.requests) == len(page_sizes)
+    assert client.open_scrolls == {}
+    assert client.open_pits == {}
+
+
+@pytest.mark.parametrize("session_class", [ScrollSession, PointInTimeSession])
+@pytest.mark.parametrize("total,page_sizes", [
+    (10, [4, 4, 2]),
+    (8, [4, 4]),
+])
+def test_search_session_size(session_class, total, page_sizes):
+    client = FakeElasticsearch({
+        "2021-04": [get_production_doc("2021-04-01 00:00", h) for h in range(total)],
+    })
+    with session_class(client, "2021-04", {}, size=4) as session:
+        pages = list(session.pages())
+    assert [len(hits) for hits in pages] == page_sizes
+    assert [hit["_source"] for hits in pages for hit in hits] == [
+        get_production_doc("2021-04-01 00:00", h) for h in range(total)
+    ]
+    assert [r[2] for r in client.requests] == [4] * len(page_sizes)
+    assert client.open_scrolls == {}
+    assert client.open_pits == {}
+
+
+@pytest.mark.parametrize("pagination", ["scroll", "search_after"])
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_get_production_messages_multi_index(pagination, prefetch):
+    client = _get_client()
+    storage = _get_storage(client, prefetch=prefetch)
+    messages = list(storage.get_production_messages(
+        system="grapes_gfs_gmf",
+        start_time=(pd.Timestamp("2021-03-31 00:00"), pd.Timestamp("2021-04-01 00:00")),
+        size=2,
+        pagination=pagination,
+    ))
+    assert [(m.start_time.strftime("%Y%m%d"), m.forecast_time.components.hours) for m in messages] == [
+        ("20210331", h) for h in range(5)
+    ] + [
+        ("20210401", h) for h in range(5)
+    ]
+    assert [r[1] for r in client.requests] == ["2021-03"] * 3 + ["2021-04"] * 3
+    assert client.open_scrolls == {}
+    assert client.open_pits == {}
+
+
+@pytest.mark.parametrize("pagination", ["scroll", "search_after"])
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_get_production_messages_close(pagination, prefetch):
+    client = _get_client()
+    storage = _get_storage(client, prefetch=prefetch)
+    messages = storage.get_production_messages(
+        system="grapes_gfs_gmf",
+        start_time=(pd.Timestamp("2021-03-31 00:00"), pd.Timestamp("2021-04-01 00:00")),
+        size=2,
+        pagination=pagination,
+    )
+    message = next(messages)
+    assert message.forecast_time == pd.Timedelta(hours=0)
+    messages.close()
+    assert len(client.requests) < 6
+    assert client.open_scrolls == {}
+    assert client.open_pits == {}
+
+
+def _get_interleaved_client(**kwargs) -> FakeElasticsearch:
+    return FakeElasticsearch({
+        "2021-03": [get_production_doc("2021-04-01 00:00", h, minute=2 * h) for h in range(0, 10, 2)],
+        "2021-04": [get_production_doc("2021-04-01 00:00", h, minute=2 * h) for h in range(1, 10, 2)],
+    }, **kwargs)
+
+
+@pytest.mark.parametrize("pagination", ["scroll", "search_after"])
+def test_get_production_messages_concurrent(pagination):
+    client = _get_interleaved_client()
+    storage = _get_storage(client)
+    messages = list(storage.get_production_messages(
+        system="grapes_gfs_gmf",
+        start_time=(pd.Timestamp("2021-03-31 00:00"), pd.Timestamp("2021-04-01 00:00")),
+        size=2,
+        concurrent=True,
+        pagination=pagination,
+    ))
+    assert [m.forecast_time.components.hours for m in messages] == list(range(10))
+    assert [m.time for m in messages] == sorted(m.time for m in messages)
+    assert client.open_scrolls == {}
+    assert client.open_pits == {}
+
+
+def test_get_production_messages_concurrent_max_in_flight():
+    client = _get_interleaved_client(delay=0.02)
+    storage = _get_storage(client, max_in_flight=2)
+    messages = list(storage.get_production_messages(
+        system="grapes_gfs_gmf",
+        start_time=(pd.Timestamp("2021-03-31 00:00"), pd.Timestamp("2021-04-01 00:00")),
+        size=2,
+        concurrent=True,
+        slices=3,
+    ))
+    # fake client ignores slices, so each slice returns all messages of its index.
+    assert len(messages) == 30
+    assert client.max_in_flight <= 2
+
+
+@pytest.mark.parametrize("pagination", ["scroll", "search_after"])
+def test_get_production_messages_concurrent_error(pagination):
+    client = _get_interleaved_client(fail_index="2021-04")
+    storage = _get_storage(client)
+    with pytest.raises(RuntimeError):
+        list(storage.get_production_messages(
+            system="grapes_gfs_gmf",
+            start_time=(pd.Timestamp("2021-03-31 00:00"), pd.Timestamp("2021-04-01 00:00")),
+            size=2,
+            concurrent=True,
+            pagination=pagination,
+        ))
+    assert client.open_scrolls == {}
+    assert client.open_pits == {}
+
+
+@pytest.mark.parametrize("pagination", ["scroll", "search_after"])
+def test_get_production_messages_concurrent_close(pagination):
+    client = _get_interleaved_client(delay=0.01)
+    storage = _get_storage(client)
+    messages = storage.get_production_messages(
+        system="grapes_gfs_gmf",
+        start_time=(pd.Timestamp("2021-03-31 00:00"), pd.Timestamp("2021-04-01 00:00")),
+        size=2,
+        concurrent=True,
+        pagination=pagination,
+    )
+    assert next(messages).forecast_time == pd.Timedelta(hours=0)
+    messages.close()
+    assert len(client.requests) < 6
+    assert client.open_scrolls == {}
+    assert client.open_pits == {}
+
+
+def _get_ecflow_doc(command: str, minute: int) -> dict:
+    return {
+        "type": "ecflow_client",
+        "time": f"2021-04-01T04:{minute:02}:00Z",
+        "data": {
+            "command": command,
+            "ecf_host": "login_b01",
+            "ecf_port": "31071",
+            "ecf_name": "/grapes_meso_3km_v5_0/cold/00/model/fcst",
+            "ecf_rid": "1234",
+            "ecf_tryno": "1",
+            "ecf_date": "20210401",
+        }
+    }
+
+
+def test_get_ecflow_client_messages_search_after():
+    commands = ["submit", "init", "complete", "submit", "init"]
+    client = FakeElasticsearch({
+        "ecflow-client-2021-04-01": [_get_ecflow_doc(command, i) for i, command in enumerate(commands)],
+    })
+    storage = _get_storage(client)
+    messages = list(storage.get_ecflow_client_messages(
+        node_name="/grapes_meso_3km_v5_0/cold/00/model/fcst",
+        ecf_date=pd.Timestamp("2021-04-01"),
+        size=2,
+    ))
+    assert [m.command for m in messages] == commands
+    # pages with point in time and search_after in default, not scroll.
+    assert [r[0] for r in client.requests] == ["search"] * 3
+    assert all("pit" in body for body in client.bodies)
+    assert [body["sort"][-1] for body in client.bodies] == [{"_shard_doc": "asc"}] * 3
+    assert ["search_after" in body for body in client.bodies] == [False, True, True]
+    assert client.open_scrolls == {}
+    assert client.open_pits == {}
+
+
+class SummaryClient(object):
+    def __init__(self, error: Exception = None):
+        self.error = error
+
+    def search(self, index, body, ignore_unavailable):
+        if self.error is not None:
+            raise self.error
+        return {"aggregations": {"summary": {"buckets": [{
+            "key": {"start_time": 1617235200000, "forecast_time": "036h"},
+            "doc_count": 2,
+            "min_time": {"value": 1617249600000.0},
+            "max_time": {"value": 1617249601500.0},
+        }]}}}
+
+
+def test_get_production_summary():
+    storage = _get_storage(SummaryClient())
+    summary = storage.get_production_summary(
+        system="grapes_gfs_gmf",
+        start_time=pd.Timestamp("2021-04-01 00:00"),
+    )
+    assert summary.index.tolist() == ["2021040100+036"]
+    assert summary["count"].tolist() == [2]
+
+
+def test_get_production_summary_mapping_error():
+    error = RequestError(400, "search_phase_execution_exception", "Fielddata is disabled on text fields")
+    storage = _get_storage(SummaryClient(error))
+    with pytest.raises(ValueError, match="mapping"):
+        storage.get_production_summary(
+            system="grapes_gfs_gmf",
+            start_time=pd.Timestamp("2021-04-01 00:00"),
+        )